@@ -0,0 +1,114 @@
+import re
+import unicodedata
+from decimal import Decimal, InvalidOperation
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+from config import Config
+
+ALIAS_SEPARATOR = '|'
+
+_UNITS = ['zero', 'one', 'two', 'three', 'four', 'five', 'six', 'seven', 'eight', 'nine', 'ten',
+          'eleven', 'twelve', 'thirteen', 'fourteen', 'fifteen', 'sixteen', 'seventeen', 'eighteen', 'nineteen']
+_TENS = ['', '', 'twenty', 'thirty', 'forty', 'fifty', 'sixty', 'seventy', 'eighty', 'ninety']
+NUMBER_WORDS: Dict[str, str] = {word: str(value) for value, word in enumerate(_UNITS)}
+for _tens in range(2, 10):
+    NUMBER_WORDS[_TENS[_tens]] = str(_tens * 10)
+    for _unit in range(1, 10):
+        NUMBER_WORDS[f"{_TENS[_tens]} {_UNITS[_unit]}"] = str(_tens * 10 + _unit)
+NUMBER_WORDS['one hundred'] = '100'
+
+_PUNCTUATION = re.compile(r"[^\w\s.:/-]")
+_THOUSANDS = re.compile(r"(?<=\d),(?=\d{3}\b)")
+_HYPHENS = re.compile(r"(?<=\w)-(?=\w)")
+_ARTICLES = re.compile(r"^(the|a|an) ")
+
+
+def normalize(text: str) -> str:
+    """Case-fold, strip accents and punctuation, and canonicalize numbers so that
+    'Zürich', 'zurich', '12.0', '12' and 'twelve' compare equal to their peers."""
+    text = unicodedata.normalize('NFKD', str(text))
+    text = ''.join(char for char in text if not unicodedata.combining(char)).casefold()
+    text = _THOUSANDS.sub('', text)
+    text = _HYPHENS.sub(' ', _PUNCTUATION.sub(' ', text))
+    text = _ARTICLES.sub('', ' '.join(text.split()))
+
+    text = NUMBER_WORDS.get(text, text)
+    try:
+        number = Decimal(text)
+    except InvalidOperation:
+        return text
+    if not number.is_finite():
+        return text
+    number = number.normalize()
+    if number != number.to_integral():
+        return format(number, 'f')
+    try:
+        return format(number.quantize(Decimal(1)), 'f')
+    except InvalidOperation:
+        # Integers past the context's 28 digits, like '1e100', cannot be quantized.
+        return text
+
+
+def _fuzzy_limit(answer: str) -> int:
+    if any(char.isdigit() for char in answer) or len(answer) <= 3:
+        return 0
+    return min(Config.ANSWER_FUZZY_MAX_DISTANCE, 1 if len(answer) <= 7 else 2)
+
+
+def within_distance(a: str, b: str, limit: int) -> bool:
+    """Levenshtein distance <= limit, computed only inside the diagonal band."""
+    if abs(len(a) - len(b)) > limit:
+        return False
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i] + [limit + 1] * len(b)
+        for j in range(max(1, i - limit), min(len(b), i + limit) + 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != b[j - 1]))
+        if min(current) > limit:
+            return False
+        previous = current
+    return previous[-1] <= limit
+
+
+class AnswerIndex:
+    """Accepted answers per challenge, normalized once at load time. A check is a set
+    lookup, with a bounded edit-distance fallback over that challenge's few aliases."""
+
+    def __init__(self):
+        self._accepted: Dict[int, FrozenSet[str]] = {}
+        self._fuzzy: Dict[int, Tuple[Tuple[str, int], ...]] = {}
+        self._display: Dict[int, str] = {}
+
+    def add(self, key: int, answers: Iterable[str], fuzzy: bool):
+        answers = [alias.strip() for answer in answers for alias in str(answer).split(ALIAS_SEPARATOR)]
+        accepted = frozenset(normalize(answer) for answer in answers if answer)
+        self._accepted[key] = accepted
+        self._display[key] = answers[0] if answers else ""
+        if fuzzy:
+            limits = ((answer, _fuzzy_limit(answer)) for answer in accepted)
+            self._fuzzy[key] = tuple((answer, limit) for answer, limit in limits if limit)
+
+    def check(self, key: int, given: str) -> bool:
+        given = normalize(given)
+        if given in self._accepted.get(key, ()):
+            return True
+        return any(within_distance(given, answer, limit) for answer, limit in self._fuzzy.get(key, ()))
+
+    def display(self, key: int) -> str:
+        return self._display.get(key, "")
+
+
+def _serializer() -> URLSafeTimedSerializer:
+    return URLSafeTimedSerializer(Config.SECRET_KEY, salt='challenge')
+
+
+def issue_token(session_id: int, cursor: int, entry: int) -> str:
+    return _serializer().dumps([session_id, cursor, entry])
+
+
+def read_token(token: str) -> Optional[Tuple[int, int, int]]:
+    try:
+        session_id, cursor, entry = _serializer().loads(token, max_age=Config.CHALLENGE_TOKEN_MAX_AGE)
+    except (BadSignature, TypeError, ValueError):
+        return None
+    return session_id, cursor, entry
@@ -1,7 +1,27 @@
-import random
+import threading
+from dataclasses import asdict
+from typing import Callable, TypeVar
+from answers import read_token
 from config import Config
-from data import Difficulty, ChallengeType, OpenQuestion, MultipleChoiceQuestion, Result, ResultNoValue, SessionStatus
-from models import DatabaseConnection, Airport, Player, GameSession, Challenge, Country
+from data import ChallengeDto, Difficulty, Result, ResultNoValue, SessionStatus
+from models import DatabaseConnection, Airport, Player, GameSession, Challenge
+from catalog import catalog_loaded, get_catalog, reload_catalog
+from question_bank import get_question_bank, reload_question_bank
+from proximity import get_proximity_engine
+from sampler import get_sampler, reload_sampler
+from spatial_index import get_airport_index
+from http_cache import EncodedPayload, encode_payload
+from leaderboard import BOARDS, get_leaderboard, leaderboard_loaded, reload_leaderboard, start_refresh
+from statement_cache import statement_cache_stats
+
+AIRPORT_FIELDS = ('id', 'icao_code', 'iata_code', 'name', 'city', 'country_code',
+                  'latitude', 'longitude', 'elevation_ft', 'continent', 'is_major_hub', 'created_at')
+DEFAULT_AIRPORT_FIELDS = tuple(field for field in AIRPORT_FIELDS if field != 'created_at')
+
+_airport_payloads: dict[tuple[str, ...], EncodedPayload] = {}
+_airport_payloads_lock = threading.Lock()
+
+T = TypeVar('T')
 
 
 def _connect_to_db() -> Result[DatabaseConnection]:
@@ -12,21 +32,123 @@ def _connect_to_db() -> Result[DatabaseConnection]:
     return Result.success(db)
 
 
-def get_available_airports() -> Result[list]:
+def preload_reference_data() -> ResultNoValue:
     db = _connect_to_db()
     if db.is_error():
-        return Result.failure(db.error)
+        return ResultNoValue.failure(db.error)
+    db = db.value
+
+    try:
+        get_catalog(db)
+        get_question_bank(db)
+        get_sampler(db)
+        get_proximity_engine(db)
+        get_airport_index(db)
+        get_leaderboard(db)
+        return ResultNoValue.success()
+    except Exception as ex:
+        return ResultNoValue.failure(f"Error loading reference data: {ex}")
+    finally:
+        db.disconnect()
+
+
+def reload_reference_data() -> ResultNoValue:
+    db = _connect_to_db()
+    if db.is_error():
+        return ResultNoValue.failure(db.error)
     db = db.value
 
     try:
-        airports = Airport(db).get_all_airports()
-        return Result.success(airports)
+        reload_catalog(db)
+        reload_question_bank(db)
+        reload_sampler(db)
+        get_proximity_engine(db)
+        get_airport_index(db)
+        with _airport_payloads_lock:
+            _airport_payloads.clear()
+        return ResultNoValue.success()
     except Exception as ex:
-        return Result.failure(f"Error retrieving airports: {ex}")
+        return ResultNoValue.failure(f"Error reloading reference data: {ex}")
     finally:
         db.disconnect()
 
 
+def get_pool_stats() -> Result[dict]:
+    try:
+        return Result.success({**asdict(DatabaseConnection.pool_stats()), 'statements': statement_cache_stats()})
+    except Exception as ex:
+        return Result.failure(f"Error retrieving pool stats: {ex}")
+
+
+def _reference_lookup(loaded: bool, lookup: Callable[[DatabaseConnection | None], T], error: str) -> Result[T]:
+    """Runs ``lookup`` on the preloaded in-memory data with ``db=None``; a connection is
+    only borrowed when that data still has to be loaded."""
+    db = None
+    if not loaded:
+        db = _connect_to_db()
+        if db.is_error():
+            return Result.failure(db.error)
+        db = db.value
+
+    try:
+        return Result.success(lookup(db))
+    except Exception as ex:
+        return Result.failure(f"{error}: {ex}")
+    finally:
+        if db is not None:
+            db.disconnect()
+
+
+def get_available_airports() -> Result[list]:
+    return _reference_lookup(catalog_loaded(), lambda db: Airport(db).get_all_airports(),
+                             "Error retrieving airports")
+
+
+def get_airports_payload(fields: list[str] | None = None) -> Result[EncodedPayload]:
+    if fields:
+        unknown = set(fields) - set(AIRPORT_FIELDS)
+        if unknown:
+            return Result.failure(f"Unknown airport fields: {', '.join(sorted(unknown))}")
+        fields = tuple(field for field in AIRPORT_FIELDS if field in fields)
+    else:
+        fields = DEFAULT_AIRPORT_FIELDS
+
+    payload = _airport_payloads.get(fields)
+    if payload is not None:
+        return Result.success(payload)
+
+    airports = get_available_airports()
+    if airports.is_error():
+        return Result.failure(airports.error)
+
+    payload = encode_payload([{field: row[field] for field in fields} for row in airports.value])
+    with _airport_payloads_lock:
+        _airport_payloads[fields] = payload
+    return Result.success(payload)
+
+
+def _airports_with_distance(db: DatabaseConnection | None, matches: list) -> list[dict]:
+    catalog = get_catalog(db)
+    return [{'airport': catalog.get_airport(airport_id), 'distance_km': round(distance, 1)}
+            for airport_id, distance in matches]
+
+
+def find_nearest_airports(latitude: float, longitude: float, k: int) -> Result[list]:
+    k = min(k, Config.SPATIAL_MAX_RESULTS)
+    return _reference_lookup(
+        catalog_loaded(),
+        lambda db: _airports_with_distance(db, get_airport_index(db).nearest(latitude, longitude, k)),
+        "Error finding nearest airports")
+
+
+def find_airports_within(latitude: float, longitude: float, radius_km: float) -> Result[list]:
+    return _reference_lookup(
+        catalog_loaded(),
+        lambda db: _airports_with_distance(
+            db, get_airport_index(db).within(latitude, longitude, radius_km)[:Config.SPATIAL_MAX_RESULTS]),
+        "Error finding airports within radius")
+
+
 def configure_new_game(difficulty: str, player_name: str) -> Result[int]:
     try:
         difficulty = Difficulty(difficulty.strip().lower())
@@ -63,37 +185,34 @@ def configure_new_game(difficulty: str, player_name: str) -> Result[int]:
         db.disconnect()
 
 
-def get_challenge(session_id: int) -> Result[OpenQuestion | MultipleChoiceQuestion]:
+def get_challenge(session_id: int) -> Result[ChallengeDto]:
     db = _connect_to_db()
     if db.is_error():
         return Result.failure(db.error)
     db = db.value
 
-    game_session = GameSession(db)
-    if not game_session.load_session(session_id):
-        db.disconnect()
-        return Result.failure("Invalid game session ID")
+    try:
+        game_session = GameSession(db)
+        if not game_session.load_session(session_id):
+            return Result.failure("Invalid game session ID")
+        if game_session.status is not SessionStatus.ACTIVE:
+            return Result.failure("Game session is not active")
 
-    difficulty = game_session.difficulty_level
-    challenge_model = Challenge(db)
-    challenge_type = random.choice([ChallengeType.OPEN_QUESTION, ChallengeType.MULTIPLE_CHOICE])
+        challenge = Challenge(db).get_next_for_session(game_session)
+        if challenge is None:
+            return Result.failure("No challenges available for this difficulty")
 
-    try:
-        match challenge_type:
-            case ChallengeType.OPEN_QUESTION:
-                c = challenge_model.get_random_open_question(difficulty)
-                return Result.success(c)
-            case ChallengeType.MULTIPLE_CHOICE:
-                c = challenge_model.get_random_multiple_choice(difficulty)
-                return Result.success(c)
-        return Result.failure("Invalid challenge type")
+        commit_result = game_session.commit()
+        if commit_result.is_error():
+            return Result.failure(commit_result.error)
+        return Result.success(challenge)
     except Exception as ex:
         return Result.failure(f"Error retrieving challenge: {ex}")
     finally:
         db.disconnect()
 
 
-def update_game_state(game_id: int, current_airport_id: int, passed_challenge: bool) -> Result[dict]:
+def update_game_state(game_id: int, current_airport_id: int) -> Result[dict]:
     db = _connect_to_db()
     if db.is_error():
         return Result.failure(db.error)
@@ -105,17 +224,16 @@ def update_game_state(game_id: int, current_airport_id: int, passed_challenge: b
             return Result.failure("Invalid game session ID")
 
         airport = Airport(db).get_airport_by_id(current_airport_id)
-        country = Country(db).get_country_by_code(airport.country_code)
+        if airport is None:
+            return Result.failure("Invalid airport ID")
 
-        game_session.update_current_airport(airport)
-        game_session.increment_puzzles_solved()
-        game_session.add_guessed_country(country)
+        move_result = game_session.apply_move(airport)
+        if move_result.is_error():
+            return Result.failure(move_result.error)
 
-        match passed_challenge:
-            case True:
-                game_session.add_battery(Config.get_battery_reward(game_session.difficulty_level))
-            case False:
-                game_session.deduct_battery(Config.get_battery_penalty(game_session.difficulty_level))
+        commit_result = game_session.commit()
+        if commit_result.is_error():
+            return Result.failure(commit_result.error)
 
         state = game_session.get_game_state()
         return Result.success(state)
@@ -125,6 +243,78 @@ def update_game_state(game_id: int, current_airport_id: int, passed_challenge: b
         db.disconnect()
 
 
+def make_move(session_id: int, airport_id: int) -> Result[dict]:
+    db = _connect_to_db()
+    if db.is_error():
+        return Result.failure(db.error)
+    db = db.value
+
+    try:
+        with db.transaction():
+            game_session = GameSession(db)
+            if not game_session.load_session(session_id):
+                return Result.failure("Invalid game session ID")
+
+            airport = Airport(db).get_airport_by_id(airport_id)
+            if airport is None:
+                return Result.failure("Invalid airport ID")
+
+            move_result = game_session.apply_move(airport)
+            if move_result.is_error():
+                return Result.failure(move_result.error)
+            challenge = None
+            if not game_session.has_reached_end():
+                challenge = Challenge(db).get_next_for_session(game_session)
+
+            commit_result = game_session.commit()
+            if commit_result.is_error():
+                return Result.failure(commit_result.error)
+
+        return Result.success({'state': game_session.get_game_state(), 'challenge': challenge})
+    except Exception as ex:
+        return Result.failure(f"Error making move: {ex}")
+    finally:
+        db.disconnect()
+
+
+def answer_challenge(session_id: int, token: str, answer: str) -> Result[dict]:
+    issued = read_token(token)
+    if issued is None or issued[0] != session_id:
+        return Result.failure("Invalid or expired challenge token")
+    _, cursor, entry = issued
+
+    db = _connect_to_db()
+    if db.is_error():
+        return Result.failure(db.error)
+    db = db.value
+
+    try:
+        with db.transaction():
+            game_session = GameSession(db)
+            if not game_session.load_session(session_id):
+                return Result.failure("Invalid game session ID")
+
+            bank = get_question_bank(db)
+            correct = bank.answers.check(entry, answer)
+            answer_result = game_session.record_answer(cursor, correct)
+            if answer_result.is_error():
+                return Result.failure(answer_result.error)
+
+            commit_result = game_session.commit()
+            if commit_result.is_error():
+                return Result.failure(commit_result.error)
+
+        return Result.success({
+            'correct': correct,
+            'correct_answer': bank.answers.display(entry),
+            'state': game_session.get_game_state(),
+        })
+    except Exception as ex:
+        return Result.failure(f"Error checking answer: {ex}")
+    finally:
+        db.disconnect()
+
+
 def get_game_state(session_id: int) -> Result[dict]:
     db = _connect_to_db()
     if db.is_error():
@@ -144,6 +334,76 @@ def get_game_state(session_id: int) -> Result[dict]:
         db.disconnect()
 
 
+def get_game_states(session_ids: list[int] | None = None, status: str | None = None,
+                    difficulty: str | None = None, cursor: int = 0, limit: int | None = None) -> Result[dict]:
+    try:
+        status = SessionStatus(status.strip().lower()) if status else None
+    except ValueError:
+        return Result.failure("Invalid session status, choose from : 'active', 'won', 'lost', 'abandoned'")
+    try:
+        difficulty = Difficulty(difficulty.strip().lower()) if difficulty else None
+    except ValueError:
+        return Result.failure("Invalid difficulty level. Choose from: 'easy', 'medium', 'hard'")
+
+    limit = min(limit or Config.GAME_STATES_PAGE_SIZE, Config.GAME_STATES_MAX_PAGE_SIZE)
+
+    db = _connect_to_db()
+    if db.is_error():
+        return Result.failure(db.error)
+    db = db.value
+
+    try:
+        # One extra row tells whether another page follows without a COUNT query.
+        sessions = GameSession.load_page(db, session_ids, status, difficulty, cursor, limit + 1)
+        next_cursor = sessions[limit - 1].id if len(sessions) > limit else None
+        return Result.success({
+            'states': [game_session.get_game_state() for game_session in sessions[:limit]],
+            'next_cursor': next_cursor
+        })
+    except Exception as ex:
+        return Result.failure(f"Error retrieving game states: {ex}")
+    finally:
+        db.disconnect()
+
+
+def record_game_result(db: DatabaseConnection, game_session: GameSession):
+    won = game_session.status is SessionStatus.WON
+    # Raising rolls back the status change committed in the same transaction.
+    if not Player(db).record_game_result(game_session.player_id, game_session.score, won):
+        raise RuntimeError(f"Player {game_session.player_id} not found, game result not recorded")
+
+
+def _refresh_leaderboard():
+    db = _connect_to_db()
+    if db.is_error():
+        raise RuntimeError(db.error)
+    try:
+        reload_leaderboard(db.value)
+    finally:
+        db.value.disconnect()
+
+
+def _leaderboard(db: DatabaseConnection | None):
+    start_refresh(_refresh_leaderboard)
+    return get_leaderboard(db)
+
+
+def rank_game_result(db: DatabaseConnection, game_session: GameSession):
+    _leaderboard(db).record(game_session.player_id, game_session.player_name,
+                            game_session.difficulty_level.value, game_session.score, game_session.completed_at)
+
+
+def get_leaderboard_standings(board: str = 'global', limit: int | None = None,
+                              player_id: int | None = None) -> Result[dict]:
+    board = board.strip().lower()
+    if board not in BOARDS:
+        return Result.failure(f"Invalid leaderboard, choose from : {', '.join(repr(name) for name in BOARDS)}")
+    limit = min(limit or Config.LEADERBOARD_PAGE_SIZE, Config.LEADERBOARD_MAX_PAGE_SIZE)
+
+    return _reference_lookup(leaderboard_loaded(), lambda db: _leaderboard(db).standings(board, limit, player_id),
+                             "Error retrieving leaderboard")
+
+
 def update_session_status(session_id: int, status: str) -> ResultNoValue:
     try:
         status = SessionStatus(status.strip().lower())
@@ -159,24 +419,30 @@ def update_session_status(session_id: int, status: str) -> ResultNoValue:
     db = db.value
 
     try:
-        game_session = GameSession(db)
-        if not game_session.load_session(session_id):
-            return ResultNoValue.failure("Invalid game session ID")
+        # The status change and the player's totals commit together or not at all; a commit that
+        # finishes the session writes through the session cache so it lands in this transaction.
+        with db.transaction():
+            game_session = GameSession(db)
+            if not game_session.load_session(session_id):
+                return ResultNoValue.failure("Invalid game session ID")
 
-        game_session.update_status(status)
-        return ResultNoValue.success()
+            if status is SessionStatus.WON and game_session.current_airport_id != game_session.boss_airport_id:
+                return ResultNoValue.failure("Game session has not reached the boss airport")
+
+            status_result = game_session.update_status(status)
+            if status_result.is_error():
+                return status_result
+
+            commit_result = game_session.commit()
+            if commit_result.is_error():
+                return commit_result
+            if game_session.has_result():
+                record_game_result(db, game_session)
+
+        if game_session.has_result():
+            rank_game_result(db, game_session)
+        return commit_result
     except Exception as ex:
         return ResultNoValue.failure(f"Error updating session status: {ex}")
     finally:
         db.disconnect()
-
-
-if __name__ == '__main__':
-    sesh_id = 76
-    print(f"New game session ID: {sesh_id}")
-    challenge = get_challenge(sesh_id)
-    print(f"Challenge: {challenge}")
-    game_state = get_game_state(sesh_id)
-    print(f"Game State: {game_state}")
-    new_state = update_game_state(str(sesh_id), '4', False)
-    print(f"Updated Game State: {new_state}")
@@ -0,0 +1,353 @@
+from answers import read_token
+from config import Config
+from data import ChallengeDto, Difficulty, Result, ResultNoValue, SessionStatus
+from async_db import AsyncDatabaseConnection
+from leaderboard import get_leaderboard
+from models import Airport, Challenge, GameSession, Player, get_session_cache
+from question_bank import get_question_bank
+
+# Reference data (catalog, question bank, sampler, proximity engine) is process-wide and
+# must be preloaded before serving: the session models below run against ``db=None`` and
+# only ever touch those in-memory structures, while all I/O goes through the async connection.
+
+
+async def _connect_to_db() -> Result[AsyncDatabaseConnection]:
+    db = AsyncDatabaseConnection()
+    connection_result = await db.connect()
+    if not connection_result.is_success():
+        return Result.failure(f"Database connection failed: {connection_result.error}")
+    return Result.success(db)
+
+
+async def _load_session(db: AsyncDatabaseConnection, session_id: int) -> GameSession | None:
+    game_session = GameSession(None)
+    if game_session.load_cached(session_id):
+        return game_session
+
+    result = await db.execute_query(f"{GameSession.SESSION_SELECT} WHERE gs.id = %s", (session_id,))
+    if not result:
+        return None
+    game_session.set_loaded(result[0])
+    return game_session
+
+
+async def _commit_session(db: AsyncDatabaseConnection, game_session: GameSession) -> ResultNoValue:
+    statement = game_session.pending_update()
+    if statement is None:
+        return ResultNoValue.success()
+
+    cache = get_session_cache()
+    if cache is not None and game_session.is_finishing():
+        detached = cache.detach(game_session.id, game_session.version)
+        if detached.is_error():
+            return ResultNoValue.failure(detached.error)
+        entry = detached.value
+        async with db.transaction():
+            if entry is not None:
+                db.on_rollback(lambda: cache.restore(entry))
+            updated = await db.execute_update(*game_session.write_through_update(entry))
+        return game_session.mark_committed(updated)
+
+    cached = game_session.commit_cached()
+    if cached is not None:
+        return cached
+
+    async with db.transaction():
+        updated = await db.execute_update(*statement)
+    return game_session.mark_committed(updated)
+
+
+async def _create_or_get_player(db: AsyncDatabaseConnection, name: str, difficulty: Difficulty) -> int | None:
+    result = await db.execute_query("SELECT id FROM player WHERE name = %s", (name,))
+    if not result:
+        query = """INSERT INTO player (name, battery_level, difficulty_level)
+                   VALUES (%s, %s, %s)"""
+        if not await db.execute_update(query, (name, Config.DEFAULT_BATTERY, 'easy')):
+            return None
+        result = await db.execute_query("SELECT id FROM player WHERE name = %s", (name,))
+        if not result:
+            return None
+
+    player_id = result[0]['id']
+    battery = max(0, min(100, Config.get_starting_battery(difficulty)))
+    query = "UPDATE player SET battery_level = %s, difficulty_level = %s WHERE id = %s"
+    await db.execute_update(query, (battery, difficulty.value, player_id))
+    return player_id
+
+
+async def configure_new_game(difficulty: str, player_name: str) -> Result[int]:
+    try:
+        difficulty = Difficulty(difficulty.strip().lower())
+    except ValueError:
+        difficulty = None
+
+    if difficulty is None:
+        return Result.failure("Invalid difficulty level. Choose from: 'easy', 'medium', 'hard'")
+
+    db = await _connect_to_db()
+    if db.is_error():
+        return Result.failure(db.error)
+    db = db.value
+
+    try:
+        player_id = await _create_or_get_player(db, player_name, difficulty)
+        if player_id is None:
+            return Result.failure("Failed to create or retrieve player")
+
+        boss_airport = Airport(None).get_random_airport()
+        game_session = GameSession(None)
+        statement = game_session.prepare_new_session(player_id, difficulty, boss_airport)
+        if statement is None or not await db.execute_update(*statement):
+            return Result.failure("Failed to create game session")
+
+        query = f"{GameSession.SESSION_SELECT} WHERE gs.player_id = %s ORDER BY gs.id DESC LIMIT 1"
+        result = await db.execute_query(query, (player_id,))
+        if not result:
+            return Result.failure("Failed to create game session")
+        game_session.set_loaded(result[0])
+
+        return Result.success(game_session.id)
+    except Exception as ex:
+        return Result.failure(f"Error configuring new game: {ex}")
+    finally:
+        await db.disconnect()
+
+
+async def get_challenge(session_id: int) -> Result[ChallengeDto]:
+    db = await _connect_to_db()
+    if db.is_error():
+        return Result.failure(db.error)
+    db = db.value
+
+    try:
+        game_session = await _load_session(db, session_id)
+        if game_session is None:
+            return Result.failure("Invalid game session ID")
+        if game_session.status is not SessionStatus.ACTIVE:
+            return Result.failure("Game session is not active")
+
+        challenge = Challenge(None).get_next_for_session(game_session)
+        if challenge is None:
+            return Result.failure("No challenges available for this difficulty")
+
+        commit_result = await _commit_session(db, game_session)
+        if commit_result.is_error():
+            return Result.failure(commit_result.error)
+        return Result.success(challenge)
+    except Exception as ex:
+        return Result.failure(f"Error retrieving challenge: {ex}")
+    finally:
+        await db.disconnect()
+
+
+async def update_game_state(game_id: int, current_airport_id: int) -> Result[dict]:
+    db = await _connect_to_db()
+    if db.is_error():
+        return Result.failure(db.error)
+    db = db.value
+
+    try:
+        game_session = await _load_session(db, game_id)
+        if game_session is None:
+            return Result.failure("Invalid game session ID")
+
+        airport = Airport(None).get_airport_by_id(current_airport_id)
+        if airport is None:
+            return Result.failure("Invalid airport ID")
+
+        move_result = game_session.apply_move(airport)
+        if move_result.is_error():
+            return Result.failure(move_result.error)
+
+        commit_result = await _commit_session(db, game_session)
+        if commit_result.is_error():
+            return Result.failure(commit_result.error)
+
+        return Result.success(game_session.get_game_state())
+    except Exception as ex:
+        return Result.failure(f"Error updating game state: {ex}")
+    finally:
+        await db.disconnect()
+
+
+async def make_move(session_id: int, airport_id: int) -> Result[dict]:
+    db = await _connect_to_db()
+    if db.is_error():
+        return Result.failure(db.error)
+    db = db.value
+
+    try:
+        async with db.transaction():
+            game_session = await _load_session(db, session_id)
+            if game_session is None:
+                return Result.failure("Invalid game session ID")
+
+            airport = Airport(None).get_airport_by_id(airport_id)
+            if airport is None:
+                return Result.failure("Invalid airport ID")
+
+            move_result = game_session.apply_move(airport)
+            if move_result.is_error():
+                return Result.failure(move_result.error)
+            challenge = None
+            if not game_session.has_reached_end():
+                challenge = Challenge(None).get_next_for_session(game_session)
+
+            commit_result = await _commit_session(db, game_session)
+            if commit_result.is_error():
+                return Result.failure(commit_result.error)
+
+        return Result.success({'state': game_session.get_game_state(), 'challenge': challenge})
+    except Exception as ex:
+        return Result.failure(f"Error making move: {ex}")
+    finally:
+        await db.disconnect()
+
+
+async def answer_challenge(session_id: int, token: str, answer: str) -> Result[dict]:
+    issued = read_token(token)
+    if issued is None or issued[0] != session_id:
+        return Result.failure("Invalid or expired challenge token")
+    _, cursor, entry = issued
+
+    db = await _connect_to_db()
+    if db.is_error():
+        return Result.failure(db.error)
+    db = db.value
+
+    try:
+        async with db.transaction():
+            game_session = await _load_session(db, session_id)
+            if game_session is None:
+                return Result.failure("Invalid game session ID")
+
+            bank = get_question_bank(None)
+            correct = bank.answers.check(entry, answer)
+            answer_result = game_session.record_answer(cursor, correct)
+            if answer_result.is_error():
+                return Result.failure(answer_result.error)
+
+            commit_result = await _commit_session(db, game_session)
+            if commit_result.is_error():
+                return Result.failure(commit_result.error)
+
+        return Result.success({
+            'correct': correct,
+            'correct_answer': bank.answers.display(entry),
+            'state': game_session.get_game_state(),
+        })
+    except Exception as ex:
+        return Result.failure(f"Error checking answer: {ex}")
+    finally:
+        await db.disconnect()
+
+
+async def get_game_state(session_id: int) -> Result[dict]:
+    db = await _connect_to_db()
+    if db.is_error():
+        return Result.failure(db.error)
+    db = db.value
+
+    try:
+        game_session = await _load_session(db, session_id)
+        if game_session is None:
+            return Result.failure("Invalid game session ID")
+
+        return Result.success(game_session.get_game_state())
+    except Exception as ex:
+        return Result.failure(f"Error retrieving game state: {ex}")
+    finally:
+        await db.disconnect()
+
+
+async def get_game_states(session_ids: list[int] | None = None, status: str | None = None,
+                          difficulty: str | None = None, cursor: int = 0, limit: int | None = None) -> Result[dict]:
+    try:
+        status = SessionStatus(status.strip().lower()) if status else None
+    except ValueError:
+        return Result.failure("Invalid session status, choose from : 'active', 'won', 'lost', 'abandoned'")
+    try:
+        difficulty = Difficulty(difficulty.strip().lower()) if difficulty else None
+    except ValueError:
+        return Result.failure("Invalid difficulty level. Choose from: 'easy', 'medium', 'hard'")
+
+    limit = min(limit or Config.GAME_STATES_PAGE_SIZE, Config.GAME_STATES_MAX_PAGE_SIZE)
+    # One extra row tells whether another page follows without a COUNT query.
+    statement = GameSession.prepare_page(session_ids, status, difficulty, cursor, limit + 1)
+    if statement is None:
+        return Result.success({'states': [], 'next_cursor': None})
+
+    db = await _connect_to_db()
+    if db.is_error():
+        return Result.failure(db.error)
+    db = db.value
+
+    try:
+        rows = await db.execute_query(*statement)
+        if rows is None:
+            raise RuntimeError("Failed to load game sessions")
+        sessions = GameSession.sessions_from_rows(None, rows)
+        next_cursor = sessions[limit - 1].id if len(sessions) > limit else None
+        return Result.success({
+            'states': [game_session.get_game_state() for game_session in sessions[:limit]],
+            'next_cursor': next_cursor
+        })
+    except Exception as ex:
+        return Result.failure(f"Error retrieving game states: {ex}")
+    finally:
+        await db.disconnect()
+
+
+async def _record_game_result(db: AsyncDatabaseConnection, game_session: GameSession):
+    won = game_session.status is SessionStatus.WON
+    updated = await db.execute_update(*Player.prepare_game_result(game_session.player_id, game_session.score, won))
+    if updated != 1:
+        raise RuntimeError(f"Player {game_session.player_id} not found, game result not recorded")
+
+
+def _rank_game_result(game_session: GameSession):
+    get_leaderboard(None).record(game_session.player_id, game_session.player_name,
+                                 game_session.difficulty_level.value, game_session.score, game_session.completed_at)
+
+
+async def update_session_status(session_id: int, status: str) -> ResultNoValue:
+    try:
+        status = SessionStatus(status.strip().lower())
+    except ValueError:
+        status = None
+
+    if status is None:
+        return ResultNoValue.failure("Invalid session status, choose from : 'active', 'won', 'lost', 'abandoned'")
+
+    db = await _connect_to_db()
+    if db.is_error():
+        return ResultNoValue.failure(db.error)
+    db = db.value
+
+    try:
+        # The status change and the player's totals commit together or not at all.
+        async with db.transaction():
+            game_session = await _load_session(db, session_id)
+            if game_session is None:
+                return ResultNoValue.failure("Invalid game session ID")
+
+            if status is SessionStatus.WON and game_session.current_airport_id != game_session.boss_airport_id:
+                return ResultNoValue.failure("Game session has not reached the boss airport")
+
+            status_result = game_session.update_status(status)
+            if status_result.is_error():
+                return status_result
+
+            commit_result = await _commit_session(db, game_session)
+            if commit_result.is_error():
+                return commit_result
+            if game_session.has_result():
+                await _record_game_result(db, game_session)
+
+        if game_session.has_result():
+            _rank_game_result(game_session)
+        return commit_result
+    except Exception as ex:
+        return ResultNoValue.failure(f"Error updating session status: {ex}")
+    finally:
+        await db.disconnect()
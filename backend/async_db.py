@@ -0,0 +1,120 @@
+import asyncio
+import logging
+import time
+import aiomysql
+from contextlib import asynccontextmanager
+from typing import Callable
+from config import Config
+from data import ResultNoValue
+from instrumentation import record_query
+
+logger = logging.getLogger(__name__)
+
+_pool: aiomysql.Pool | None = None
+_pool_lock = asyncio.Lock()
+
+
+async def get_async_pool() -> aiomysql.Pool:
+    global _pool
+    if _pool is None:
+        async with _pool_lock:
+            if _pool is None:
+                _pool = await aiomysql.create_pool(
+                    host=Config.DB_HOST,
+                    port=Config.DB_PORT,
+                    user=Config.DB_USER,
+                    password=Config.DB_PASSWORD,
+                    db=Config.DB_NAME,
+                    charset='utf8mb4',
+                    autocommit=True,
+                    minsize=1,
+                    maxsize=Config.ASYNC_DB_POOL_SIZE,
+                    pool_recycle=int(Config.DB_POOL_IDLE_TIMEOUT),
+                )
+    return _pool
+
+
+async def close_async_pool():
+    global _pool
+    if _pool is not None:
+        _pool.close()
+        await _pool.wait_closed()
+        _pool = None
+
+
+class AsyncDatabaseConnection:
+    """Coroutine counterpart of ``models.DatabaseConnection`` on an aiomysql pool:
+    a request awaiting the database parks its task instead of holding a thread."""
+
+    def __init__(self):
+        self.connection: aiomysql.Connection | None = None
+        self._in_transaction: bool = False
+        self._on_rollback: list[Callable[[], None]] = []
+
+    async def connect(self) -> ResultNoValue:
+        try:
+            pool = await get_async_pool()
+            self.connection = await asyncio.wait_for(pool.acquire(), Config.DB_POOL_TIMEOUT)
+            return ResultNoValue().success()
+        except asyncio.TimeoutError:
+            return ResultNoValue.failure(
+                f"Database connection error: no connection available within {Config.DB_POOL_TIMEOUT}s")
+        except aiomysql.Error as e:
+            return ResultNoValue.failure(f"Database connection error: {e}")
+
+    async def disconnect(self, broken: bool = False):
+        if self.connection is not None and _pool is not None:
+            if broken or self._in_transaction:
+                self.connection.close()
+            _pool.release(self.connection)
+        self.connection = None
+
+    async def execute_query(self, query: str, params: tuple = None):
+        started = time.perf_counter()
+        try:
+            async with self.connection.cursor(aiomysql.DictCursor) as cursor:
+                await cursor.execute(query, params)
+                return await cursor.fetchall()
+        except aiomysql.Error as e:
+            logger.error("Query exec error: %s", e)
+            return None
+        finally:
+            record_query(query, time.perf_counter() - started)
+
+    async def execute_update(self, query: str, params: tuple = None):
+        started = time.perf_counter()
+        try:
+            async with self.connection.cursor() as cursor:
+                await cursor.execute(query, params)
+                return cursor.rowcount
+        except aiomysql.Error as e:
+            if self._in_transaction:
+                raise
+            logger.error("Update execution error: %s", e)
+            return 0
+        finally:
+            record_query(query, time.perf_counter() - started)
+
+    @asynccontextmanager
+    async def transaction(self):
+        if self._in_transaction:
+            yield self
+            return
+
+        await self.connection.begin()
+        self._in_transaction = True
+        try:
+            yield self
+            await self.connection.commit()
+        except Exception:
+            await self.connection.rollback()
+            for callback in self._on_rollback:
+                callback()
+            raise
+        finally:
+            self._in_transaction = False
+            self._on_rollback.clear()
+
+    def on_rollback(self, callback: Callable[[], None]):
+        """Call ``callback`` if the enclosing transaction rolls back."""
+        self._on_rollback.append(callback)
@@ -0,0 +1,72 @@
+"""Compare the JSON and compact encodings of countries_guessed and game saves:
+bytes per row and encode/decode time. Needs no database.
+
+    python benchmarks/bench_codec.py [--iterations 20000] [--countries 0 5 20 60]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import timeit
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from codec import decode_countries, encode_countries, pack_save, unpack_save
+
+ALL_CODES = [chr(first) + chr(second) for first in range(ord('A'), ord('Z') + 1)
+             for second in range(ord('A'), ord('Z') + 1)]
+
+
+def sample_save(codes: list) -> dict:
+    return {
+        'session_id': 4812, 'difficulty_level': 'hard', 'starting_airport_id': 110, 'boss_airport_id': 26,
+        'boss_country_code': 'HU', 'current_airport_id': 34, 'battery_level': 85,
+        'puzzles_solved': len(codes), 'countries_guessed': codes, 'status': 'active', 'score': 0,
+        'save_timestamp': datetime(2025, 10, 7, 13, 15, 50).isoformat(),
+    }
+
+
+def per_call_us(statement, iterations: int) -> float:
+    return min(timeit.repeat(statement, number=iterations, repeat=3)) / iterations * 1e6
+
+
+def row(label: str, size: int, encode_us: float, decode_us: float):
+    print(f"{label:<22} {size:>7} {encode_us:>11.2f} {decode_us:>11.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--iterations', type=int, default=20000)
+    parser.add_argument('--countries', type=int, nargs='+', default=[0, 5, 20, 60])
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'encoding':<22} {'bytes':>7} {'encode us':>11} {'decode us':>11}")
+    for count in args.countries:
+        codes = rng.sample(ALL_CODES, count)
+        save = sample_save(codes)
+        as_json, as_bits = json.dumps(codes), encode_countries(codes)
+        save_json, save_packed = json.dumps(save), pack_save(save)
+        assert sorted(json.loads(as_json)) == decode_countries(as_bits)
+        assert unpack_save(save_packed) == {**save, 'countries_guessed': sorted(codes)}
+
+        print(f"-- {count} countries")
+        row('countries json', len(as_json.encode()),
+            per_call_us(lambda: json.dumps(codes), args.iterations),
+            per_call_us(lambda: json.loads(as_json), args.iterations))
+        row('countries bitset', len(as_bits),
+            per_call_us(lambda: encode_countries(codes), args.iterations),
+            per_call_us(lambda: decode_countries(as_bits), args.iterations))
+        row('save json', len(save_json.encode()),
+            per_call_us(lambda: json.dumps(save), args.iterations),
+            per_call_us(lambda: json.loads(save_json), args.iterations))
+        row('save packed', len(save_packed),
+            per_call_us(lambda: pack_save(save), args.iterations),
+            per_call_us(lambda: unpack_save(save_packed), args.iterations))
+
+
+if __name__ == '__main__':
+    main()
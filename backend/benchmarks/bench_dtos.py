@@ -0,0 +1,93 @@
+"""Memory per 10k airports and construction throughput of the frozen, slotted
+AirportDto built through the bulk from_rows against the previous plain dataclass
+built through AirportDto.create. Needs no database.
+
+    python benchmarks/bench_dtos.py [--airports 10000]
+"""
+import argparse
+import os
+import sys
+import timeit
+import tracemalloc
+from dataclasses import dataclass
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data import AirportDto, Result
+
+
+@dataclass
+class LegacyAirportDto:
+    """AirportDto as it was before it became frozen and slotted."""
+    id: int
+    icao_code: str
+    iata_code: str
+    name: str
+    city: str
+    country_code: str
+    latitude: float
+    longitude: float
+    elevation_ft: int
+    continent: str
+
+    @classmethod
+    def create(cls, Dict):
+        id = Dict.get('id', 0)
+        icao_code = Dict.get('icao_code', '')
+        iata_code = Dict.get('iata_code', '')
+        name = Dict.get('name', '')
+        city = Dict.get('city', '')
+        country_code = Dict.get('country_code', '')
+        latitude = Dict.get('latitude', 0.0)
+        longitude = Dict.get('longitude', 0.0)
+        elevation_ft = Dict.get('elevation_ft', 0)
+        continent = Dict.get('continent', '')
+
+        if not id or not icao_code or not iata_code or not name or not city or not country_code or not continent:
+            raise ValueError("Invalid airport data")
+
+        return cls(id=id, icao_code=icao_code, iata_code=iata_code, name=name, city=city,
+                   country_code=country_code, latitude=latitude, longitude=longitude,
+                   elevation_ft=elevation_ft, continent=continent)
+
+
+def sample_rows(count: int) -> list:
+    return [(index + 1, f"E{index:03X}", f"{index % 1000:03d}", f"Airport {index}", f"City {index % 500}",
+             'FI', 60.0 + index / 1e4, 24.0 + index / 1e4, index % 3000, 'EU') for index in range(count)]
+
+
+def allocated_bytes(build) -> int:
+    tracemalloc.start()
+    built = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del built
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--airports', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    rows = sample_rows(args.airports)
+    dicts = [dict(zip(AirportDto.__dataclass_fields__, row)) for row in rows]
+    # The strings belong to the rows either way; only the DTO objects themselves are counted.
+    paths = {
+        'legacy create': lambda: [LegacyAirportDto.create(row) for row in dicts],
+        'from_rows': lambda: AirportDto.from_rows(rows),
+    }
+
+    print(f"{args.airports} airports")
+    print(f"{'path':<15} {'KiB':>8} {'ms':>8} {'airports/s':>12}")
+    for label, build in paths.items():
+        memory = allocated_bytes(build)
+        seconds = min(timeit.repeat(build, number=1, repeat=args.repeat))
+        print(f"{label:<15} {memory / 1024:>8.0f} {seconds * 1000:>8.2f} {args.airports / seconds:>12,.0f}")
+
+    print(f"\nResult: {allocated_bytes(lambda: [Result.success(row) for row in rows]) / len(rows):.0f} bytes each")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""Time JSON serialization of the /game_state and /airports payloads with Flask's
+default provider (dataclasses.asdict per DTO, sorted keys) against serialization.dumps
+(compiled per-DTO encoders, orjson when installed). Reads the configured database.
+
+    python benchmarks/bench_serialization.py [--iterations 2000] [--session-id 1]
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+from datetime import date, datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask.json.provider import DefaultJSONProvider
+
+import api
+import serialization
+from catalog import get_catalog
+from models import DatabaseConnection
+
+
+def flask_default(value) -> bytes:
+    return json.dumps(value, default=DefaultJSONProvider.default, ensure_ascii=True, sort_keys=True,
+                      separators=(',', ':')).encode('utf-8')
+
+
+def iso_datetimes(value):
+    """Flask writes datetimes as HTTP dates and serialization.dumps as ISO 8601, so the
+    payloads are compared with datetimes already in ISO form."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, dict):
+        return {key: iso_datetimes(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [iso_datetimes(item) for item in value]
+    return value
+
+
+def per_call_us(function, payload, iterations: int) -> float:
+    return min(timeit.repeat(lambda: function(payload), number=iterations, repeat=3)) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--iterations', type=int, default=2000)
+    parser.add_argument('--session-id', type=int)
+    args = parser.parse_args()
+
+    preload_result = api.preload_reference_data()
+    if preload_result.is_error():
+        sys.exit(preload_result.error)
+
+    session_id = args.session_id
+    if session_id is None:
+        created = api.configure_new_game('easy', 'bench-serialization')
+        if created.is_error():
+            sys.exit(created.error)
+        session_id = created.value
+    state = api.get_game_state(session_id)
+    airports = api.get_available_airports()
+    if state.is_error() or airports.is_error():
+        sys.exit(state.error or airports.error)
+
+    db = DatabaseConnection()
+    catalog = get_catalog(db)
+    payloads = {
+        '/game_state': (state.value, args.iterations),
+        '/airports rows': (airports.value, max(1, args.iterations // 50)),
+        '/airports DTOs': ([catalog.get_airport(row['id']) for row in airports.value], max(1, args.iterations // 50)),
+    }
+
+    print(f"fast path: {'orjson' if serialization.orjson is not None else 'json + compiled encoders'}")
+    print(f"{'payload':<16} {'bytes':>8} {'flask us':>10} {'fast us':>10} {'speedup':>8}")
+    for label, (payload, iterations) in payloads.items():
+        assert json.loads(flask_default(iso_datetimes(payload))) == json.loads(serialization.dumps(payload))
+        baseline = per_call_us(flask_default, payload, iterations)
+        fast = per_call_us(serialization.dumps, payload, iterations)
+        print(f"{label:<16} {len(serialization.dumps(payload)):>8} {baseline:>10.1f} {fast:>10.1f} "
+              f"{baseline / fast:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
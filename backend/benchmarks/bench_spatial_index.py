@@ -0,0 +1,62 @@
+"""Compare SpatialIndex queries against a brute-force Haversine scan.
+
+    python benchmarks/bench_spatial_index.py [--sizes 1000,10000,50000] [--queries 500]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from geo import haversine_km
+from spatial_index import SpatialIndex
+
+
+def brute_force_nearest(points, lat, lon, k):
+    return sorted((haversine_km(lat, lon, p_lat, p_lon), p_id) for p_id, p_lat, p_lon in points)[:k]
+
+
+def brute_force_within(points, lat, lon, radius_km):
+    return [p_id for p_id, p_lat, p_lon in points if haversine_km(lat, lon, p_lat, p_lon) <= radius_km]
+
+
+def timed(fn, queries):
+    start = time.perf_counter()
+    for lat, lon in queries:
+        fn(lat, lon)
+    return (time.perf_counter() - start) / len(queries) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', default='113,1000,10000,50000')
+    parser.add_argument('--queries', type=int, default=300)
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--radius-km', type=float, default=500.0)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'airports':>9} {'build ms':>9} {'knn idx us':>11} {'knn scan us':>12} "
+          f"{'radius idx us':>14} {'radius scan us':>15}")
+    for size in (int(s) for s in args.sizes.split(',')):
+        points = [(i, rng.uniform(-60, 70), rng.uniform(-180, 180)) for i in range(size)]
+        queries = [(rng.uniform(-60, 70), rng.uniform(-180, 180)) for _ in range(args.queries)]
+        scan_queries = queries[:max(1, min(len(queries), 2_000_000 // max(size, 1)))]
+
+        start = time.perf_counter()
+        index = SpatialIndex(points)
+        build_ms = (time.perf_counter() - start) * 1e3
+
+        knn_index = timed(lambda lat, lon: index.nearest(lat, lon, args.k), queries)
+        knn_scan = timed(lambda lat, lon: brute_force_nearest(points, lat, lon, args.k), scan_queries)
+        radius_index = timed(lambda lat, lon: index.within(lat, lon, args.radius_km), queries)
+        radius_scan = timed(lambda lat, lon: brute_force_within(points, lat, lon, args.radius_km), scan_queries)
+        print(f"{size:>9} {build_ms:>9.1f} {knn_index:>11.1f} {knn_scan:>12.1f} "
+              f"{radius_index:>14.1f} {radius_scan:>15.1f}")
+
+
+if __name__ == '__main__':
+    main()
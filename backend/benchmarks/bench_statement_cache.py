@@ -0,0 +1,106 @@
+"""Time the GameSession hot path (load, move, commit) with and without the
+per-connection prepared statement cache, against the configured database.
+
+    python benchmarks/bench_statement_cache.py [--iterations 500] [--session-id 1]
+
+Without --session-id a throwaway game is created first. Needs MySQL/MariaDB (DB_HOST
+etc.); it exits on the SQLite backend, which has no server-side statements to cache.
+It also checks that both protocols return the session row with the same values and
+types (str, not bytearray), which DB_STATEMENT_CACHE_SIZE relies on.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import api
+from config import Config
+from models import Airport, DatabaseConnection, GameSession, reset_pool
+from statement_cache import statement_cache_stats
+from storage import get_storage
+
+
+def hot_path(session_id: int, airport_ids: list, iterations: int, rng: random.Random) -> float:
+    db = DatabaseConnection()
+    connection_result = db.connect()
+    if connection_result.is_error():
+        sys.exit(connection_result.error)
+    try:
+        airports = Airport(db)
+        start = time.perf_counter()
+        for _ in range(iterations):
+            game_session = GameSession(db)
+            game_session.load_session(session_id)
+            game_session.apply_move(airports.get_airport_by_id(rng.choice(airport_ids)))
+            game_session.commit()
+        return (time.perf_counter() - start) / iterations * 1e6
+    finally:
+        db.disconnect()
+
+
+def session_row(session_id: int) -> dict:
+    db = DatabaseConnection()
+    connection_result = db.connect()
+    if connection_result.is_error():
+        sys.exit(connection_result.error)
+    try:
+        rows = db.execute_query("SELECT * FROM game_session WHERE id = %s", (session_id,))
+        return {column: (type(value), value) for column, value in rows[0].items()}
+    finally:
+        db.disconnect()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--iterations', type=int, default=500)
+    parser.add_argument('--session-id', type=int)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    if not get_storage().supports_prepared:
+        sys.exit(f"The {get_storage().name} backend has no server-side prepared statements, so both runs "
+                 f"would use the text protocol. Run against MySQL/MariaDB (DB_BACKEND=mysql).")
+
+    Config.SESSION_CACHE_ENABLED = False
+    preload_result = api.preload_reference_data()
+    if preload_result.is_error():
+        sys.exit(preload_result.error)
+
+    session_id = args.session_id
+    if session_id is None:
+        created = api.configure_new_game('easy', 'bench-statement-cache')
+        if created.is_error():
+            sys.exit(created.error)
+        session_id = created.value
+
+    db = DatabaseConnection()
+    db.connect()
+    airport_ids = [airport['id'] for airport in Airport(db).get_all_airports()]
+    db.disconnect()
+
+    cache_size = Config.DB_STATEMENT_CACHE_SIZE or 64
+    print(f"backend {get_storage().name}, session {session_id}, {args.iterations} iterations")
+    rows = {}
+    for label, size in (('text protocol', 0), ('prepared cache', cache_size)):
+        Config.DB_STATEMENT_CACHE_SIZE = size
+        reset_pool()
+        rows[label] = session_row(session_id)
+        before = statement_cache_stats()
+        hot_path(session_id, airport_ids, min(50, args.iterations), random.Random(args.seed))
+        per_iteration = hot_path(session_id, airport_ids, args.iterations, random.Random(args.seed))
+        after = statement_cache_stats()
+        print(f"{label:<15} {per_iteration:>9.1f} us/iteration  "
+              f"hits {after['hits'] - before['hits']:>6}  misses {after['misses'] - before['misses']:>4}")
+
+    differing = [column for column in rows['text protocol']
+                 if rows['text protocol'][column] != rows['prepared cache'].get(column)]
+    if differing:
+        sys.exit(f"Row types or values differ between protocols in: {', '.join(differing)}")
+    print("session row identical under both protocols")
+
+
+if __name__ == '__main__':
+    main()
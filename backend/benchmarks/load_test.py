@@ -0,0 +1,153 @@
+"""Drive N concurrent players through a full game against a running API and report
+latency percentiles, throughput and DB queries per request (read from Server-Timing).
+
+Start the API against a local MySQL/MariaDB seeded from db.sql, for example
+
+    docker run -d -p 3306:3306 -e MARIADB_ROOT_PASSWORD=pw -e MARIADB_DATABASE=project_03 \\
+        -v "$PWD/db.sql:/docker-entrypoint-initdb.d/db.sql" mariadb:11
+    DB_HOST=127.0.0.1 DB_PASSWORD=pw python run_api.py
+
+then run
+
+    python benchmarks/load_test.py [--players 20] [--moves 10] [--combined] [--base-url http://127.0.0.1:5000]
+
+Each player calls /new_game, then --moves times /challenge + /answer + /update_state (or
+/move + /answer with --combined), then /update_status. Use the same --seed to compare runs.
+"""
+import argparse
+import http.client
+import json
+import random
+import re
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+SERVER_TIMING_DB = re.compile(r'db;dur=[\d.]+;desc="(\d+) queries"')
+
+
+class Client:
+    def __init__(self, base_url: str, samples: list, lock: threading.Lock):
+        parts = urlsplit(base_url)
+        self.connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+        self.prefix = parts.path.rstrip('/')
+        self.samples = samples
+        self.lock = lock
+
+    def request(self, label: str, method: str, path: str, body: dict | None = None):
+        payload = json.dumps(body).encode('utf-8') if body is not None else None
+        headers = {'Content-Type': 'application/json'} if payload is not None else {}
+
+        start = time.perf_counter()
+        self.connection.request(method, self.prefix + path, body=payload, headers=headers)
+        response = self.connection.getresponse()
+        data = response.read()
+        elapsed = time.perf_counter() - start
+
+        match = SERVER_TIMING_DB.search(response.getheader('Server-Timing') or '')
+        with self.lock:
+            self.samples.append((label, elapsed, response.status, int(match.group(1)) if match else None))
+        return response.status, json.loads(data) if data else None
+
+    def close(self):
+        self.connection.close()
+
+
+def answer_challenge(client: Client, rng: random.Random, session_id: int, challenge: dict | None):
+    if challenge:
+        answer = rng.choice(challenge['options']) if challenge.get('options') else str(rng.randint(0, 100))
+        client.request('/answer', 'POST', '/answer', {
+            'session_id': session_id, 'token': challenge['token'], 'answer': answer})
+
+
+def play(client: Client, rng: random.Random, airport_ids: list, args) -> None:
+    status, body = client.request('/new_game', 'POST', '/new_game', {
+        'difficulty': args.difficulty,
+        'player_name': f"loadtest-{rng.getrandbits(32):08x}",
+    })
+    if status != 201:
+        return
+    session_id = body['session_id']
+
+    for _ in range(args.moves):
+        airport_id = rng.choice(airport_ids)
+        if args.combined:
+            status, body = client.request('/move', 'POST', '/move', {
+                'session_id': session_id, 'current_airport_id': airport_id})
+            answer_challenge(client, rng, session_id, body.get('challenge') if status == 200 else None)
+        else:
+            # Answer before moving on: a move forfeits any challenge still unanswered.
+            status, challenge = client.request('/challenge', 'GET', f'/challenge/{session_id}')
+            answer_challenge(client, rng, session_id, challenge if status == 200 else None)
+            client.request('/update_state', 'POST', '/update_state', {
+                'session_id': session_id, 'current_airport_id': airport_id})
+
+    client.request('/update_status', 'POST', f'/update_status/{session_id}', {'new_status': 'abandoned'})
+
+
+def percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def report(samples: list, wall_time: float):
+    by_route = defaultdict(list)
+    for sample in samples:
+        by_route[sample[0]].append(sample)
+    by_route['all'] = samples
+
+    print(f"{'route':<15} {'requests':>8} {'errors':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries/req':>12}")
+    for route, route_samples in by_route.items():
+        latencies = [elapsed * 1000 for _, elapsed, _, _ in route_samples]
+        errors = sum(1 for _, _, status, _ in route_samples if status >= 400)
+        queries = [count for _, _, _, count in route_samples if count is not None]
+        per_request = f"{sum(queries) / len(queries):.1f}" if queries else "n/a"
+        print(f"{route:<15} {len(route_samples):>8} {errors:>7} {percentile(latencies, 0.50):>8.1f} "
+              f"{percentile(latencies, 0.95):>8.1f} {percentile(latencies, 0.99):>8.1f} {per_request:>12}")
+    print(f"\n{len(samples)} requests in {wall_time:.2f}s: {len(samples) / wall_time:.1f} req/s")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--base-url', default='http://127.0.0.1:5000')
+    parser.add_argument('--players', type=int, default=20)
+    parser.add_argument('--moves', type=int, default=10)
+    parser.add_argument('--difficulty', default='easy', choices=('easy', 'medium', 'hard'))
+    parser.add_argument('--combined', action='store_true', help="use POST /move instead of /challenge + /update_state")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    samples: list = []
+    lock = threading.Lock()
+
+    setup = Client(args.base_url, [], lock)
+    status, airports = setup.request('/airports', 'GET', '/airports?fields=id')
+    setup.close()
+    if status != 200 or not airports:
+        print(f"Could not load airports from {args.base_url} (HTTP {status})", file=sys.stderr)
+        sys.exit(1)
+    airport_ids = [airport['id'] for airport in airports]
+
+    def run_player(index: int):
+        client = Client(args.base_url, samples, lock)
+        try:
+            play(client, random.Random(f"{args.seed}:{index}"), airport_ids, args)
+        finally:
+            client.close()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.players) as executor:
+        list(executor.map(run_player, range(args.players)))
+    wall_time = time.perf_counter() - start
+
+    if not samples:
+        print("No requests completed", file=sys.stderr)
+        sys.exit(1)
+    report(samples, wall_time)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+import threading
+from types import MappingProxyType
+from typing import Dict, Iterable, Mapping, Optional, Tuple
+from data import AirportDto, CountryDto
+
+
+class Catalog:
+    """Read-only snapshot of the ``airport`` and ``country`` reference tables."""
+
+    def __init__(self, airport_rows: Iterable[Dict], country_rows: Iterable[Dict]):
+        countries = CountryDto.from_rows((row['code'], row['name'], row['continent']) for row in country_rows)
+        countries.sort(key=lambda c: c.name)
+        self.countries: Tuple[CountryDto, ...] = tuple(countries)
+        self.countries_by_code: Mapping[str, CountryDto] = MappingProxyType({c.code: c for c in countries})
+        self._countries_by_name = {c.name.lower(): c for c in countries}
+
+        rows = list(airport_rows)
+        airports = AirportDto.from_rows(self._airport_values(row) for row in rows)
+        hubs = [airport for airport, row in zip(airports, rows) if row.get('is_major_hub')]
+
+        self.airport_rows: Tuple[Dict, ...] = tuple(rows)
+        self.airports: Tuple[AirportDto, ...] = tuple(airports)
+        self.hub_airports: Tuple[AirportDto, ...] = tuple(hubs)
+        self.airports_by_id: Mapping[int, AirportDto] = MappingProxyType({a.id: a for a in airports})
+        self.airports_by_icao: Mapping[str, AirportDto] = MappingProxyType({a.icao_code: a for a in airports})
+        self.airports_by_iata: Mapping[str, AirportDto] = MappingProxyType({a.iata_code: a for a in airports})
+        self._airports_by_name = {a.name.lower(): a for a in airports}
+
+        hub_ids = {a.id for a in hubs}
+        by_country: Dict[str, list] = {}
+        for airport in airports:
+            by_country.setdefault(airport.country_code, []).append(airport)
+        self.airports_by_country: Mapping[str, Tuple[AirportDto, ...]] = MappingProxyType({
+            code: tuple(sorted(group, key=lambda a: (a.id not in hub_ids, a.name)))
+            for code, group in by_country.items()
+        })
+
+    def _airport_values(self, row: Dict) -> tuple:
+        country = self.countries_by_code.get(row['country_code'])
+        return (row['id'], row['icao_code'], row['iata_code'], row['name'], row['city'], row['country_code'],
+                row['latitude'], row['longitude'], row['elevation_ft'], country.continent if country else row['continent'])
+
+    def get_airport(self, airport_id: int) -> Optional[AirportDto]:
+        return self.airports_by_id.get(airport_id)
+
+    def get_airport_by_name(self, name: str) -> Optional[AirportDto]:
+        return self._airports_by_name.get(name.lower())
+
+    def get_country(self, code: str) -> Optional[CountryDto]:
+        return self.countries_by_code.get(code)
+
+    def get_country_by_name(self, name: str) -> Optional[CountryDto]:
+        return self._countries_by_name.get(name.lower())
+
+
+_catalog: Catalog | None = None
+_catalog_lock = threading.Lock()
+
+
+def _read_catalog(db) -> Catalog:
+    # Catalog consumes countries before airports, so each unbuffered cursor is drained before the next opens.
+    country_rows = db.iter_query("SELECT code, name, continent FROM country")
+    airport_rows = db.iter_query("SELECT * FROM airport ORDER BY id")
+    return Catalog(airport_rows, country_rows)
+
+
+def get_catalog(db) -> Catalog:
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = _read_catalog(db)
+    return _catalog
+
+
+def catalog_loaded() -> bool:
+    return _catalog is not None
+
+
+def reload_catalog(db) -> Catalog:
+    global _catalog
+    catalog = _read_catalog(db)
+    with _catalog_lock:
+        _catalog = catalog
+    return catalog
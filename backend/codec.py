@@ -0,0 +1,177 @@
+"""Compact, versioned encodings for game_session.countries_bitset and
+game_save.game_data_packed, plus converters to and from the JSON they replace.
+
+    python codec.py migrate [--batch-size 500]
+
+backfills the binary columns from the JSON ones for rows written before
+migration 004.
+"""
+import argparse
+import json
+import struct
+import sys
+from datetime import datetime
+from typing import Dict, Iterable, List
+
+# First byte of an encoded country set. A sparse set is its sorted bit positions as
+# uint16s, a dense one a little-endian bitmap; the encoder picks the smaller.
+COUNTRIES_SPARSE = 1
+COUNTRIES_DENSE = 2
+
+SAVE_VERSION = 1
+DIFFICULTY_CODES = ('easy', 'medium', 'hard')
+STATUS_CODES = ('active', 'won', 'lost', 'abandoned')
+
+# version, difficulty, status, session, starting/boss/current airport, battery,
+# puzzles solved, score, saved at (unix seconds), boss country code
+_SAVE_HEADER = struct.Struct('<BBBxIIIIhHiq2s')
+
+# Country codes are two letters A-Z, so every possible code has a fixed bit in a
+# 26 * 26 = 676 bit space. Unlike catalog positions, that never shifts when the
+# country table changes.
+_ALPHABET = 26
+_A = ord('A')
+_CODES = tuple(chr(_A + bit // _ALPHABET) + chr(_A + bit % _ALPHABET) for bit in range(_ALPHABET * _ALPHABET))
+_BITS = {code: bit for bit, code in enumerate(_CODES)}
+_BYTE_BITS = tuple(tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256))
+_DENSE_SIZE = (len(_CODES) + 7) // 8
+
+
+def _country_bit(code: str) -> int:
+    bit = _BITS.get(code)
+    if bit is None:
+        raise ValueError(f"Invalid country code {code!r}")
+    return bit
+
+
+def encode_countries(codes: Iterable[str]) -> bytes:
+    bits = sorted({_country_bit(code) for code in codes})
+    if 2 * len(bits) < _DENSE_SIZE:
+        return struct.pack(f'<B{len(bits)}H', COUNTRIES_SPARSE, *bits)
+    bitmap = bytearray(_DENSE_SIZE)
+    for bit in bits:
+        bitmap[bit >> 3] |= 1 << (bit & 7)
+    return bytes([COUNTRIES_DENSE]) + bytes(bitmap).rstrip(b'\0')
+
+
+def decode_countries(data: bytes) -> List[str]:
+    """Country codes in alphabetical order."""
+    if not data:
+        return []
+    if data[0] == COUNTRIES_SPARSE:
+        return [_CODES[bit] for bit in struct.unpack_from(f'<{(len(data) - 1) // 2}H', data, 1)]
+    if data[0] == COUNTRIES_DENSE:
+        return [_CODES[index << 3 | bit]
+                for index, value in enumerate(data[1:]) if value
+                for bit in _BYTE_BITS[value]]
+    raise ValueError(f"Unsupported countries encoding version {data[0]}")
+
+
+def countries_from_json(text: str | None) -> bytes:
+    return encode_countries(json.loads(text) if text else [])
+
+
+def countries_to_json(data: bytes) -> str:
+    return json.dumps(decode_countries(data))
+
+
+def pack_save(game_data: Dict) -> bytes:
+    """Pack a save as produced by ``GameSave.save_game``. ``save_timestamp`` is kept
+    to the second."""
+    saved_at = datetime.fromisoformat(game_data['save_timestamp'])
+    header = _SAVE_HEADER.pack(
+        SAVE_VERSION,
+        DIFFICULTY_CODES.index(game_data['difficulty_level']),
+        STATUS_CODES.index(game_data['status']),
+        game_data['session_id'] or 0,
+        game_data['starting_airport_id'] or 0,
+        game_data['boss_airport_id'] or 0,
+        game_data['current_airport_id'] or 0,
+        game_data['battery_level'],
+        game_data['puzzles_solved'],
+        game_data['score'],
+        int(saved_at.timestamp()),
+        game_data['boss_country_code'].encode('ascii'),
+    )
+    return header + encode_countries(game_data['countries_guessed'])
+
+
+def unpack_save(data: bytes) -> Dict:
+    if not data or data[0] != SAVE_VERSION:
+        raise ValueError(f"Unsupported save encoding version {data[0] if data else None}")
+    (_, difficulty, status, session_id, starting_airport_id, boss_airport_id, current_airport_id,
+     battery_level, puzzles_solved, score, saved_at, boss_country_code) = _SAVE_HEADER.unpack_from(data)
+    return {
+        'session_id': session_id,
+        'difficulty_level': DIFFICULTY_CODES[difficulty],
+        'starting_airport_id': starting_airport_id,
+        'boss_airport_id': boss_airport_id,
+        'boss_country_code': boss_country_code.decode('ascii'),
+        'current_airport_id': current_airport_id,
+        'battery_level': battery_level,
+        'puzzles_solved': puzzles_solved,
+        'countries_guessed': decode_countries(data[_SAVE_HEADER.size:]),
+        'status': STATUS_CODES[status],
+        'score': score,
+        'save_timestamp': datetime.fromtimestamp(saved_at).isoformat(),
+    }
+
+
+def save_from_json(text: str) -> bytes:
+    game_data = json.loads(text)
+    # Saves written before the packed format could hold CountryDto dicts.
+    game_data['countries_guessed'] = [country['code'] if isinstance(country, dict) else country
+                                      for country in game_data.get('countries_guessed') or []]
+    return pack_save(game_data)
+
+
+def save_to_json(data: bytes) -> str:
+    return json.dumps(unpack_save(data))
+
+
+def migrate(db, batch_size: int = 500) -> Dict[str, int]:
+    """Fill countries_bitset and game_data_packed wherever they are still NULL."""
+    counts = {'game_session': 0, 'game_save': 0}
+    sessions = list(db.iter_query("""SELECT id, countries_guessed
+                                     FROM game_session
+                                     WHERE countries_bitset IS NULL""", batch_size=batch_size))
+    with db.transaction():
+        for row in sessions:
+            counts['game_session'] += db.execute_update(
+                "UPDATE game_session SET countries_bitset = %s WHERE id = %s",
+                (countries_from_json(row['countries_guessed']), row['id']))
+
+    saves = list(db.iter_query("""SELECT id, game_data
+                                  FROM game_save
+                                  WHERE game_data_packed IS NULL AND game_data IS NOT NULL""",
+                               batch_size=batch_size))
+    with db.transaction():
+        for row in saves:
+            counts['game_save'] += db.execute_update(
+                "UPDATE game_save SET game_data_packed = %s WHERE id = %s",
+                (save_from_json(row['game_data']), row['id']))
+    return counts
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Backfill the compact game_session and game_save encodings")
+    parser.add_argument('command', choices=('migrate',))
+    parser.add_argument('--batch-size', type=int, default=500)
+    args = parser.parse_args(argv)
+
+    from models import DatabaseConnection
+    db = DatabaseConnection()
+    connection_result = db.connect()
+    if connection_result.is_error():
+        print(connection_result.error, file=sys.stderr)
+        return 1
+    try:
+        counts = migrate(db, args.batch_size)
+    finally:
+        db.disconnect()
+    print(f"game_session: {counts['game_session']} rows, game_save: {counts['game_save']} rows")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,4 +1,5 @@
 import os
+import secrets
 from dotenv import load_dotenv
 from data import Difficulty
 
@@ -12,6 +13,69 @@ class Config:
     DB_NAME = os.getenv('DB_NAME', 'project_03')
     DB_PORT = int(os.getenv('DB_PORT', '3306'))
 
+    # 'mysql', or 'sqlite' for an embedded WAL-mode database file built from db.sql on first use.
+    DB_BACKEND = os.getenv('DB_BACKEND', 'mysql').lower()
+    SQLITE_PATH = os.getenv('SQLITE_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bossflight.sqlite3'))
+    SQLITE_SCHEMA_PATH = os.getenv('SQLITE_SCHEMA_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'db.sql'))
+
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '10'))
+    DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '5'))
+    DB_POOL_PING_ON_BORROW = os.getenv('DB_POOL_PING_ON_BORROW', 'true').lower() == 'true'
+    DB_POOL_IDLE_TIMEOUT = float(os.getenv('DB_POOL_IDLE_TIMEOUT', '300'))
+    # Server-side prepared statements cached per connection; 0 disables (SQLite caches its own).
+    # Off until benchmarks/bench_statement_cache.py has been run against MySQL/MariaDB.
+    DB_STATEMENT_CACHE_SIZE = int(os.getenv('DB_STATEMENT_CACHE_SIZE', '0'))
+    ASYNC_DB_POOL_SIZE = int(os.getenv('ASYNC_DB_POOL_SIZE', '50'))
+
+    AIRPORTS_CACHE_MAX_AGE = int(os.getenv('AIRPORTS_CACHE_MAX_AGE', '3600'))
+
+    PROXIMITY_MATRIX_MAX_AIRPORTS = int(os.getenv('PROXIMITY_MATRIX_MAX_AIRPORTS', '4000'))
+
+    SPATIAL_MAX_RESULTS = int(os.getenv('SPATIAL_MAX_RESULTS', '100'))
+
+    GAME_STATES_PAGE_SIZE = int(os.getenv('GAME_STATES_PAGE_SIZE', '50'))
+    GAME_STATES_MAX_PAGE_SIZE = int(os.getenv('GAME_STATES_MAX_PAGE_SIZE', '200'))
+
+    CHALLENGE_DECK_CACHE_SIZE = int(os.getenv('CHALLENGE_DECK_CACHE_SIZE', '1024'))
+
+    # Signs challenge tokens. Set it in production: the random fallback differs per
+    # process unless the app is preloaded before workers fork.
+    SECRET_KEY = os.getenv('SECRET_KEY') or secrets.token_hex(32)
+    CHALLENGE_TOKEN_MAX_AGE = int(os.getenv('CHALLENGE_TOKEN_MAX_AGE', '3600'))
+    ANSWER_FUZZY_MAX_DISTANCE = int(os.getenv('ANSWER_FUZZY_MAX_DISTANCE', '2'))
+
+    LEADERBOARD_WINDOW_DAYS = int(os.getenv('LEADERBOARD_WINDOW_DAYS', '7'))
+    LEADERBOARD_PAGE_SIZE = int(os.getenv('LEADERBOARD_PAGE_SIZE', '10'))
+    LEADERBOARD_MAX_PAGE_SIZE = int(os.getenv('LEADERBOARD_MAX_PAGE_SIZE', '100'))
+    # How often a background thread rebuilds the boards from the database so workers
+    # converge; 0 keeps only the in-memory updates.
+    LEADERBOARD_REFRESH_SECONDS = int(os.getenv('LEADERBOARD_REFRESH_SECONDS', '300'))
+
+    # Bearer token for /export; the route is disabled while it is empty.
+    EXPORT_TOKEN = os.getenv('EXPORT_TOKEN', '')
+    EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', '500'))
+
+    # Write-behind session cache. Only enable when a session is always served by the
+    # same process (single worker or sticky routing); SESSION_FLUSH_INTERVAL is how many
+    # seconds of moves can be lost if the process dies.
+    SESSION_CACHE_ENABLED = os.getenv('SESSION_CACHE_ENABLED', 'false').lower() == 'true'
+    SESSION_CACHE_SIZE = int(os.getenv('SESSION_CACHE_SIZE', '10000'))
+    SESSION_CACHE_TTL = float(os.getenv('SESSION_CACHE_TTL', '1800'))
+    SESSION_FLUSH_INTERVAL = float(os.getenv('SESSION_FLUSH_INTERVAL', '5'))
+
+    PORT = int(os.getenv('PORT', '5000'))
+    FLASK_DEBUG = os.getenv('FLASK_DEBUG', 'false').lower() == 'true'
+    WEB_WORKERS = int(os.getenv('WEB_WORKERS', '2'))
+    WEB_THREADS = int(os.getenv('WEB_THREADS', '8'))
+    WEB_KEEPALIVE = int(os.getenv('WEB_KEEPALIVE', '5'))
+    WEB_TIMEOUT = int(os.getenv('WEB_TIMEOUT', '30'))
+    WEB_GRACEFUL_TIMEOUT = int(os.getenv('WEB_GRACEFUL_TIMEOUT', '30'))
+
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+    SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', '200'))
+
+    RANDOM_SEED = int(os.getenv('RANDOM_SEED')) if os.getenv('RANDOM_SEED') else None
+
     # Game settings ?
     DEFAULT_BATTERY = int(os.getenv('DEFAULT_BATTERY', '100'))
 
@@ -42,6 +106,13 @@ class Config:
         Difficulty.HARD: int(os.getenv('BATTERY_PENALTY_HARD', '30')),
     }
 
+    SCORE_WIN_BONUS_BY_DIFFICULTY = {
+        Difficulty.EASY: int(os.getenv('SCORE_WIN_BONUS_EASY', '100')),
+        Difficulty.MEDIUM: int(os.getenv('SCORE_WIN_BONUS_MEDIUM', '200')),
+        Difficulty.HARD: int(os.getenv('SCORE_WIN_BONUS_HARD', '300')),
+    }
+    SCORE_PER_COUNTRY = int(os.getenv('SCORE_PER_COUNTRY', '10'))
+
     SHOW_CORRECT_CONTINENT_BY_DIFFICULTY = {
         Difficulty.EASY: os.getenv('SHOW_CORRECT_CONTINENT_EASY', 'true').lower() == 'true',
         Difficulty.MEDIUM: os.getenv('SHOW_CORRECT_CONTINENT_MEDIUM', 'false').lower() == 'true',
@@ -68,6 +139,10 @@ class Config:
     def get_battery_reward(cls, difficulty: Difficulty) -> int:
         return cls.BATTERY_REWARD_PER_PUZZLE_BY_DIFFICULTY.get(difficulty, 15)
 
+    @classmethod
+    def get_win_bonus(cls, difficulty: Difficulty) -> int:
+        return cls.SCORE_WIN_BONUS_BY_DIFFICULTY.get(difficulty, 100)
+
     @classmethod
     def get_battery_penalty(cls, difficulty: Difficulty) -> int:
         return cls.BATTERY_PENALTY_PER_WRONG_ANSWER_BY_DIFFICULTY.get(difficulty, 0)
@@ -92,3 +167,12 @@ class Config:
             'collation': 'utf8mb4_unicode_ci',
             'autocommit': True
         }
+
+    @classmethod
+    def get_pool_config(cls):
+        return {
+            'size': cls.DB_POOL_SIZE,
+            'timeout': cls.DB_POOL_TIMEOUT,
+            'ping_on_borrow': cls.DB_POOL_PING_ON_BORROW,
+            'idle_timeout': cls.DB_POOL_IDLE_TIMEOUT
+        }
@@ -1,10 +1,12 @@
 from dataclasses import dataclass
 from enum import Enum, auto
-from typing import Generic, TypeVar, Optional
+from typing import ClassVar, Generic, Iterable, Optional, Tuple, TypeVar
 
 T = TypeVar('T')
 
 class Result(Generic[T]):
+    __slots__ = ('value', 'error')
+
     def __init__(self, value: Optional[T] = None, error: Optional[str] = None):
         self.value = value
         self.error = error
@@ -24,6 +26,8 @@ class Result(Generic[T]):
         return cls(error=error)
 
 class ResultNoValue:
+    __slots__ = ('error',)
+
     def __init__(self, error: Optional[str] = None):
         self.error = error
 
@@ -71,31 +75,56 @@ class ChallengeType(Enum):
     OPEN_QUESTION = 'open_question'
     MULTIPLE_CHOICE = 'multiple_choice'
 
-@dataclass
+@dataclass(slots=True)
 class OpenQuestion:
     question: str
     answer: str
     type: str = ChallengeType.OPEN_QUESTION.value
 
-@dataclass
+@dataclass(slots=True)
 class MultipleChoiceOption:
     name: str
     is_correct: bool
 
-@dataclass
+@dataclass(slots=True)
 class MultipleChoiceQuestion:
     question: str
     options: list[MultipleChoiceOption]
     type: str = ChallengeType.MULTIPLE_CHOICE.value
 
+@dataclass(slots=True)
+class ChallengeDto:
+    token: str
+    question: str
+    type: str
+    options: list[str] | None = None
+
 class FlightResult(Enum):
     CORRECT_AIRPORT = 'correct_airport'
     CORRECT_COUNTRY = 'correct_country'
     CORRECT_CONTINENT = 'correct_continent'
     INCORRECT = 'incorrect'
 
-@dataclass
-class AirportDto:
+class RowDto:
+    """Base for frozen, slotted DTOs that are built in bulk from database rows."""
+    __slots__ = ()
+    # Fields that must not be empty; from_rows rejects rows missing any of them.
+    required: ClassVar[Tuple[str, ...]] = ()
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple]) -> list:
+        """One DTO per row tuple, fields in declaration order."""
+        dtos = []
+        for row in rows:
+            dto = cls(*row)
+            if not all(getattr(dto, name) for name in cls.required):
+                raise ValueError(f"Invalid {cls.__name__} data: {row!r}")
+            dtos.append(dto)
+        return dtos
+
+
+@dataclass(frozen=True, slots=True)
+class AirportDto(RowDto):
     id: int
     icao_code: str
     iata_code: str
@@ -107,80 +136,25 @@ class AirportDto:
     elevation_ft: int
     continent: str
 
-    @classmethod
-    def create(cls, Dict):
-        id = Dict.get('id', 0)
-        icao_code = Dict.get('icao_code', '')
-        iata_code = Dict.get('iata_code', '')
-        name = Dict.get('name', '')
-        city = Dict.get('city', '')
-        country_code = Dict.get('country_code', '')
-        latitude = Dict.get('latitude', 0.0)
-        longitude = Dict.get('longitude', 0.0)
-        elevation_ft = Dict.get('elevation_ft', 0)
-        continent = Dict.get('continent', '')
-
-        if not id or not icao_code or not iata_code or not name or not city or not country_code or not continent:
-            raise ValueError("Invalid airport data")
-
-        return cls(
-            id=id,
-            icao_code=icao_code,
-            iata_code=iata_code,
-            name=name,
-            city=city,
-            country_code=country_code,
-            latitude=latitude,
-            longitude=longitude,
-            elevation_ft=elevation_ft,
-            continent=continent
-        )
-
-@dataclass
-class CountryDto:
+    required: ClassVar[Tuple[str, ...]] = ('id', 'icao_code', 'iata_code', 'name', 'city', 'country_code', 'continent')
+
+@dataclass(frozen=True, slots=True)
+class CountryDto(RowDto):
     code: str
     name: str
     continent: str
 
-    @classmethod
-    def create(cls, Dict):
-        code = Dict.get('code', '')
-        name = Dict.get('name', '')
-        continent = Dict.get('continent', '')
-
-        if not code or not name or not continent:
-            raise ValueError("Invalid country data")
+    required: ClassVar[Tuple[str, ...]] = ('code', 'name', 'continent')
 
-        return cls(
-            code=code,
-            name=name,
-            continent=continent
-        )
 
-
-@dataclass
-class PlayerDto:
+@dataclass(frozen=True, slots=True)
+class PlayerDto(RowDto):
     id: int
     name: str
 
-    @classmethod
-    def create(cls, Dict) -> 'PlayerDto':
-        return cls(
-            id=Dict.get('id', 0),
-            name=Dict.get('name', ''),
-        )
 
-
-@dataclass
-class GameSaveDto:
+@dataclass(frozen=True, slots=True)
+class GameSaveDto(RowDto):
     id: int
     player_id: int
-    save_name: str
-
-    @classmethod
-    def create(cls, Dict) -> 'GameSaveDto':
-        return cls(
-            id=Dict.get('id', 0),
-            player_id=Dict.get('player_id', 0),
-            save_name=Dict.get('save_name', ''),
-        )
\ No newline at end of file
+    save_name: str
\ No newline at end of file
@@ -276,7 +276,8 @@ CREATE TABLE `game_save` (
   `id` int(11) NOT NULL,
   `player_id` int(11) NOT NULL,
   `save_name` varchar(100) NOT NULL DEFAULT 'autosave',
-  `game_data` longtext CHARACTER SET utf8mb4 COLLATE utf8mb4_bin NOT NULL CHECK (json_valid(`game_data`)),
+  `game_data` longtext CHARACTER SET utf8mb4 COLLATE utf8mb4_bin DEFAULT NULL CHECK (json_valid(`game_data`)),
+  `game_data_packed` varbinary(255) DEFAULT NULL,
   `created_at` timestamp NOT NULL DEFAULT current_timestamp(),
   `updated_at` timestamp NOT NULL DEFAULT current_timestamp() ON UPDATE current_timestamp()
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
@@ -305,10 +306,15 @@ CREATE TABLE `game_session` (
   `battery_level` int(11) DEFAULT 100,
   `puzzles_solved` int(11) DEFAULT 0,
   `countries_guessed` longtext CHARACTER SET utf8mb4 COLLATE utf8mb4_bin DEFAULT NULL CHECK (json_valid(`countries_guessed`)),
+  `countries_bitset` varbinary(86) DEFAULT NULL,
   `status` enum('active','won','lost','abandoned') DEFAULT 'active',
   `score` int(11) DEFAULT 0,
   `started_at` timestamp NOT NULL DEFAULT current_timestamp(),
-  `completed_at` timestamp NULL DEFAULT NULL
+  `completed_at` timestamp NULL DEFAULT NULL,
+  `challenge_seed` int(11) DEFAULT NULL,
+  `challenge_cursor` int(11) NOT NULL DEFAULT 0,
+  `answered_cursor` int(11) NOT NULL DEFAULT 0,
+  `version` int(11) NOT NULL DEFAULT 0
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 --
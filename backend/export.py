@@ -0,0 +1,152 @@
+import argparse
+import sys
+from datetime import datetime
+from typing import Iterable, Iterator
+from codec import countries_to_json, save_to_json
+from config import Config
+from data import Result, SessionStatus
+from models import DatabaseConnection
+from serialization import dumps
+
+# table -> (columns, timestamp column used for the time-range filter, has a status column)
+EXPORT_TABLES = {
+    'game_session': ("""id, player_id, difficulty_level, starting_airport_id, boss_airport_id, boss_country_code,
+                        current_airport_id, battery_level, puzzles_solved, countries_guessed, countries_bitset,
+                        status, score, started_at, completed_at""", 'started_at', True),
+    'player': ("""id, name, current_airport_id, battery_level, difficulty_level, total_score,
+                  games_played, games_won, created_at, last_login""", 'created_at', False),
+    'game_save': ("id, player_id, save_name, game_data, game_data_packed, created_at, updated_at", 'updated_at', False),
+}
+
+# table -> (binary column, the JSON column it replaces, decoder); exports keep the JSON shape
+EXPORT_DECODERS = {
+    'game_session': ('countries_bitset', 'countries_guessed', countries_to_json),
+    'game_save': ('game_data_packed', 'game_data', save_to_json),
+}
+
+
+def build_export_query(table: str, since: datetime | None = None, until: datetime | None = None,
+                       status: SessionStatus | None = None) -> tuple[str, tuple]:
+    columns, time_column, has_status = EXPORT_TABLES[table]
+    conditions = []
+    params = []
+    if since is not None:
+        conditions.append(f"{time_column} >= %s")
+        params.append(since)
+    if until is not None:
+        conditions.append(f"{time_column} < %s")
+        params.append(until)
+    if status is not None:
+        if not has_status:
+            raise ValueError(f"{table} has no status column")
+        conditions.append("status = %s")
+        params.append(status.value)
+
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    return f"SELECT {columns} FROM {table}{where} ORDER BY id", tuple(params)
+
+
+def parse_export_filters(table: str, since: str | None, until: str | None,
+                         status: str | None) -> Result[tuple[str, tuple]]:
+    if table not in EXPORT_TABLES:
+        return Result.failure(f"Unknown export table, choose from: {', '.join(EXPORT_TABLES)}")
+    try:
+        since = datetime.fromisoformat(since) if since else None
+        until = datetime.fromisoformat(until) if until else None
+    except ValueError:
+        return Result.failure("since and until must be ISO 8601 dates")
+    try:
+        status = SessionStatus(status.strip().lower()) if status else None
+    except ValueError:
+        return Result.failure("Invalid session status, choose from : 'active', 'won', 'lost', 'abandoned'")
+
+    try:
+        return Result.success(build_export_query(table, since, until, status))
+    except ValueError as ex:
+        return Result.failure(str(ex))
+
+
+def decode_rows(table: str, rows: Iterable[dict]) -> Iterator[dict]:
+    binary_column, json_column, decode = EXPORT_DECODERS[table]
+    for row in rows:
+        packed = row.pop(binary_column)
+        if packed is not None:
+            row[json_column] = decode(bytes(packed))
+        yield row
+
+
+def to_ndjson(rows: Iterable[dict]) -> Iterator[bytes]:
+    for row in rows:
+        yield dumps(row) + b'\n'
+
+
+class ExportStream:
+    """NDJSON lines of one export. Iterating to the end releases the connection; so
+    does close(), which also covers a stream closed before its first line."""
+
+    def __init__(self, db: DatabaseConnection, lines: Iterator[bytes]):
+        self._db = db
+        self._lines = lines
+
+    def __iter__(self) -> 'ExportStream':
+        return self
+
+    def __next__(self) -> bytes:
+        try:
+            return next(self._lines)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self):
+        self._lines.close()
+        self._db.disconnect()
+
+
+def stream_export(table: str, since: str | None = None, until: str | None = None,
+                  status: str | None = None) -> Result[ExportStream]:
+    statement = parse_export_filters(table, since, until, status)
+    if statement.is_error():
+        return Result.failure(statement.error)
+
+    db = DatabaseConnection()
+    connection_result = db.connect()
+    if connection_result.is_error():
+        return Result.failure(f"Database connection failed: {connection_result.error}")
+
+    def generate() -> Iterator[bytes]:
+        rows = db.iter_query(*statement.value, batch_size=Config.EXPORT_BATCH_SIZE)
+        if table in EXPORT_DECODERS:
+            rows = decode_rows(table, rows)
+        yield from to_ndjson(rows)
+
+    return Result.success(ExportStream(db, generate()))
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Export a table as newline-delimited JSON")
+    parser.add_argument('table', choices=sorted(EXPORT_TABLES))
+    parser.add_argument('--since', help="ISO 8601 start (inclusive)")
+    parser.add_argument('--until', help="ISO 8601 end (exclusive)")
+    parser.add_argument('--status', help="game_session status filter")
+    parser.add_argument('-o', '--output', help="output file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    result = stream_export(args.table, args.since, args.until, args.status)
+    if result.is_error():
+        print(result.error, file=sys.stderr)
+        return 1
+
+    output = open(args.output, 'wb') if args.output else sys.stdout.buffer
+    try:
+        for line in result.value:
+            output.write(line)
+    finally:
+        result.value.close()
+        if args.output:
+            output.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,45 @@
+# Production server: gunicorn -c gunicorn.conf.py run_api:app
+import gc
+import api
+import models
+from config import Config
+from sampler import reseed_sampler
+
+bind = f"0.0.0.0:{Config.PORT}"
+worker_class = 'gthread'
+workers = Config.WEB_WORKERS
+threads = Config.WEB_THREADS
+keepalive = Config.WEB_KEEPALIVE
+timeout = Config.WEB_TIMEOUT
+graceful_timeout = Config.WEB_GRACEFUL_TIMEOUT
+
+# Import run_api (and load the reference catalog) once in the master so workers
+# share those pages copy-on-write instead of each loading their own copy.
+preload_app = True
+
+
+def when_ready(server):
+    # Connections opened while preloading must not be inherited by the workers.
+    models.reset_pool()
+    gc.freeze()
+
+
+def on_reload(server):
+    # kill -HUP <master>: reload the reference data here, so the workers that replace
+    # the old ones fork with the new catalog and question bank.
+    reload_result = api.reload_reference_data()
+    if reload_result.is_error():
+        server.log.error("Reference data not reloaded: %s", reload_result.error)
+    models.reset_pool()
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    models.reset_pool()
+    # Only the module-level random is reseeded after a fork, not the sampler's own Random.
+    if Config.RANDOM_SEED is None:
+        reseed_sampler()
+
+
+def worker_exit(server, worker):
+    models.close_session_cache()
@@ -0,0 +1,20 @@
+import gzip
+import hashlib
+from dataclasses import dataclass
+from serialization import dumps
+
+
+@dataclass(frozen=True)
+class EncodedPayload:
+    body: bytes
+    gzipped: bytes
+    etag: str
+
+
+def encode_payload(value) -> EncodedPayload:
+    body = dumps(value)
+    return EncodedPayload(
+        body=body,
+        gzipped=gzip.compress(body, compresslevel=9, mtime=0),
+        etag=hashlib.sha256(body).hexdigest()[:32],
+    )
@@ -0,0 +1,144 @@
+import bisect
+import json
+import logging
+import re
+import threading
+from contextvars import ContextVar, Token
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Tuple
+from config import Config
+
+slow_query_log = logging.getLogger('bossflight.slow_query')
+
+# Longest slowest-statement fingerprint sent in the Server-Timing header.
+SERVER_TIMING_DESC_LENGTH = 100
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+@dataclass
+class RequestStats:
+    route: str
+    query_count: int = 0
+    db_time: float = 0.0
+    slowest_time: float = 0.0
+    slowest_statement: str = ""
+
+    def server_timing(self, total_time: float) -> str:
+        slowest = f'db-slowest;dur={self.slowest_time * 1000:.1f}'
+        if self.slowest_statement:
+            slowest += f';desc="{_timing_description(self.slowest_statement)}"'
+        return (f'db;dur={self.db_time * 1000:.1f};desc="{self.query_count} queries", {slowest}, '
+                f'app;dur={total_time * 1000:.1f}')
+
+
+def _timing_description(text: str) -> str:
+    """A quoted-string body for a Server-Timing desc: printable ASCII, escaped, truncated."""
+    if len(text) > SERVER_TIMING_DESC_LENGTH:
+        text = text[:SERVER_TIMING_DESC_LENGTH - 3] + '...'
+    text = ''.join(char if ' ' <= char <= '~' else '?' for char in text)
+    return text.replace('\\', '\\\\').replace('"', '\\"')
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+_current: ContextVar[RequestStats | None] = ContextVar('request_stats', default=None)
+_histograms: Dict[Tuple[str, str], Histogram] = {}
+_histograms_lock = threading.Lock()
+
+_LITERALS = re.compile(r"'(?:[^'\\]|\\.)*'|\b\d+(?:\.\d+)?\b")
+_IN_LISTS = re.compile(r"\bIN\s*\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=1024)
+def fingerprint(statement: str) -> str:
+    """Normalize a statement so every execution of the same query shape shares one metric."""
+    statement = _LITERALS.sub('?', statement)
+    statement = _IN_LISTS.sub('IN (...)', statement)
+    return _WHITESPACE.sub(' ', statement).strip()
+
+
+def _observe(metric: str, label: str, value: float):
+    key = (metric, label)
+    with _histograms_lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = Histogram()
+        histogram.observe(value)
+
+
+def start_request(route: str) -> Token:
+    return _current.set(RequestStats(route))
+
+
+def finish_request(token: Token, total_time: float) -> RequestStats | None:
+    stats = _current.get()
+    _current.reset(token)
+    if stats is not None:
+        _observe('request', stats.route, total_time)
+    return stats
+
+
+def record_query(statement: str, elapsed: float):
+    shape = fingerprint(statement)
+    _observe('query', shape, elapsed)
+
+    stats = _current.get()
+    if stats is not None:
+        stats.query_count += 1
+        stats.db_time += elapsed
+        if elapsed > stats.slowest_time:
+            stats.slowest_time = elapsed
+            stats.slowest_statement = shape
+
+    if elapsed * 1000 >= Config.SLOW_QUERY_MS:
+        slow_query_log.warning(json.dumps({
+            'event': 'slow_query',
+            'duration_ms': round(elapsed * 1000, 2),
+            'route': stats.route if stats is not None else None,
+            'fingerprint': shape,
+        }))
+
+
+def _label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render_metrics() -> str:
+    """Prometheus text exposition of the request and query histograms of this process."""
+    names = {
+        'request': ('bossflight_request_duration_seconds', 'route', 'HTTP request latency by route'),
+        'query': ('bossflight_db_query_duration_seconds', 'fingerprint', 'SQL statement latency by fingerprint'),
+    }
+    with _histograms_lock:
+        snapshot = {key: (list(h.counts), h.total, h.count) for key, h in _histograms.items()}
+
+    lines = []
+    for metric, (name, label_name, help_text) in names.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        for (kind, label), (counts, total, count) in sorted(snapshot.items()):
+            if kind != metric:
+                continue
+            label = f'{label_name}="{_label(label)}"'
+            cumulative = 0
+            for bound, bucket_count in zip(LATENCY_BUCKETS, counts):
+                cumulative += bucket_count
+                lines.append(f'{name}_bucket{{{label},le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{{label},le="+Inf"}} {count}')
+            lines.append(f'{name}_sum{{{label}}} {total}')
+            lines.append(f'{name}_count{{{label}}} {count}')
+    return "\n".join(lines) + "\n"
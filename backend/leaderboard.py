@@ -0,0 +1,202 @@
+import logging
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import Counter, deque
+from datetime import datetime, timedelta
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_BOARD = 'global'
+RECENT_BOARD = 'recent'
+BOARDS = (GLOBAL_BOARD, RECENT_BOARD, *Config.DIFFICULTY_LEVELS)
+
+FINISHED_STATUSES = ('won', 'lost')
+
+
+class Board:
+    """Player scores kept sorted as ``(-score, player_id)`` keys, so a rank is one
+    bisect and the top K is a slice. Tied scores share a rank."""
+
+    def __init__(self):
+        self._scores: Dict[int, int] = {}
+        self._keys: List[Tuple[int, int]] = []
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, player_id: int, delta: int):
+        score = self._scores.get(player_id)
+        if score is not None:
+            del self._keys[bisect_left(self._keys, (-score, player_id))]
+        score = (score or 0) + delta
+        self._scores[player_id] = score
+        insort(self._keys, (-score, player_id))
+
+    def remove(self, player_id: int):
+        score = self._scores.pop(player_id, None)
+        if score is not None:
+            del self._keys[bisect_left(self._keys, (-score, player_id))]
+
+    def score(self, player_id: int) -> Optional[int]:
+        return self._scores.get(player_id)
+
+    def rank(self, player_id: int) -> Optional[int]:
+        score = self._scores.get(player_id)
+        if score is None:
+            return None
+        return bisect_left(self._keys, (-score,)) + 1
+
+    def top(self, limit: int) -> List[Tuple[int, int, int]]:
+        """(rank, player_id, score) for the best ``limit`` players."""
+        entries = []
+        for index, (negative_score, player_id) in enumerate(self._keys[:limit]):
+            if index and entries[-1][2] == -negative_score:
+                rank = entries[-1][0]
+            else:
+                rank = index + 1
+            entries.append((rank, player_id, -negative_score))
+        return entries
+
+
+class Leaderboard:
+    """Global, per-difficulty and rolling-window boards built from the database once
+    and then updated in memory as sessions finish."""
+
+    def __init__(self, window: timedelta):
+        self.window = window
+        self.boards: Dict[str, Board] = {board: Board() for board in BOARDS}
+        self.names: Dict[int, str] = {}
+        self._recent_games: Counter = Counter()
+        self._recent_events: Deque[Tuple[datetime, int, int]] = deque()
+        self._lock = threading.Lock()
+
+    def record(self, player_id: int, player_name: str, difficulty: str, score: int,
+               completed_at: Optional[datetime] = None):
+        with self._lock:
+            self.names[player_id] = player_name
+            self.boards[GLOBAL_BOARD].add(player_id, score)
+            if difficulty in self.boards:
+                self.boards[difficulty].add(player_id, score)
+            self._add_recent(player_id, score, completed_at or datetime.now())
+
+    def _add_recent(self, player_id: int, score: int, completed_at: datetime):
+        if completed_at < datetime.now() - self.window:
+            return
+        self._recent_events.append((completed_at, player_id, score))
+        self._recent_games[player_id] += 1
+        self.boards[RECENT_BOARD].add(player_id, score)
+
+    def _expire_recent(self):
+        cutoff = datetime.now() - self.window
+        board = self.boards[RECENT_BOARD]
+        while self._recent_events and self._recent_events[0][0] < cutoff:
+            _, player_id, score = self._recent_events.popleft()
+            self._recent_games[player_id] -= 1
+            if self._recent_games[player_id]:
+                board.add(player_id, -score)
+            else:
+                del self._recent_games[player_id]
+                board.remove(player_id)
+
+    def _entry(self, rank: int, player_id: int, score: int) -> Dict:
+        return {'rank': rank, 'player_id': player_id, 'name': self.names.get(player_id, ""), 'score': score}
+
+    def standings(self, board: str, limit: int, player_id: Optional[int] = None) -> Dict:
+        with self._lock:
+            if board == RECENT_BOARD:
+                self._expire_recent()
+            ranked = self.boards[board]
+            me = None
+            if player_id is not None and ranked.rank(player_id) is not None:
+                me = self._entry(ranked.rank(player_id), player_id, ranked.score(player_id))
+            return {
+                'board': board,
+                'players': len(ranked),
+                'entries': [self._entry(*entry) for entry in ranked.top(limit)],
+                'me': me,
+            }
+
+
+def _read_leaderboard(db) -> Leaderboard:
+    leaderboard = Leaderboard(timedelta(days=Config.LEADERBOARD_WINDOW_DAYS))
+    players = db.execute_query("SELECT id, name, total_score, games_played FROM player")
+    by_difficulty = db.execute_query("""SELECT player_id, difficulty_level, SUM(score) AS score
+                                        FROM game_session
+                                        WHERE status IN (%s, %s)
+                                        GROUP BY player_id, difficulty_level""", FINISHED_STATUSES)
+    recent = db.execute_query("""SELECT player_id, score, completed_at
+                                 FROM game_session
+                                 WHERE status IN (%s, %s) AND completed_at >= %s
+                                 ORDER BY completed_at""",
+                              (*FINISHED_STATUSES, datetime.now() - leaderboard.window))
+    if players is None or by_difficulty is None or recent is None:
+        raise RuntimeError("Failed to load leaderboard")
+
+    for row in players:
+        leaderboard.names[row['id']] = row['name']
+        if row['games_played']:
+            leaderboard.boards[GLOBAL_BOARD].add(row['id'], row['total_score'] or 0)
+    for row in by_difficulty:
+        leaderboard.boards[row['difficulty_level']].add(row['player_id'], int(row['score'] or 0))
+    for row in recent:
+        leaderboard._add_recent(row['player_id'], row['score'] or 0, row['completed_at'])
+    return leaderboard
+
+
+_leaderboard: Leaderboard | None = None
+_leaderboard_lock = threading.Lock()
+
+
+def get_leaderboard(db) -> Leaderboard:
+    """Loads the boards on first use; pass ``db=None`` once they are loaded. They are
+    never rebuilt on a request, only by the background refresh."""
+    global _leaderboard
+    if _leaderboard is None:
+        with _leaderboard_lock:
+            if _leaderboard is None:
+                _leaderboard = _read_leaderboard(db)
+    return _leaderboard
+
+
+def leaderboard_loaded() -> bool:
+    return _leaderboard is not None
+
+
+def reload_leaderboard(db) -> Leaderboard:
+    global _leaderboard
+    leaderboard = _read_leaderboard(db)
+    with _leaderboard_lock:
+        _leaderboard = leaderboard
+    return leaderboard
+
+
+_refresh_thread: threading.Thread | None = None
+
+
+def start_refresh(refresh: Callable[[], None]):
+    """Call ``refresh`` (which should end in ``reload_leaderboard``) every
+    ``LEADERBOARD_REFRESH_SECONDS`` on a background thread, so workers converge on the
+    results recorded by the others. Safe to call per request; a forked worker starts its own."""
+    global _refresh_thread
+    if Config.LEADERBOARD_REFRESH_SECONDS <= 0:
+        return
+    thread = _refresh_thread
+    if thread is not None and thread.is_alive():
+        return
+    with _leaderboard_lock:
+        if _refresh_thread is None or not _refresh_thread.is_alive():
+            _refresh_thread = threading.Thread(target=_refresh_periodically, args=(refresh,),
+                                               name='leaderboard-refresh', daemon=True)
+            _refresh_thread.start()
+
+
+def _refresh_periodically(refresh: Callable[[], None]):
+    while True:
+        time.sleep(Config.LEADERBOARD_REFRESH_SECONDS)
+        try:
+            refresh()
+        except Exception:
+            logger.exception("Leaderboard refresh failed")
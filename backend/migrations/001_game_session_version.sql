@@ -0,0 +1,6 @@
+--
+-- Optimistic concurrency counter for game_session, bumped by every flush
+-- from GameSession.commit().
+--
+ALTER TABLE `game_session`
+  ADD COLUMN `version` int(11) NOT NULL DEFAULT 0 AFTER `completed_at`;
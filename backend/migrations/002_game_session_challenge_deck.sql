@@ -0,0 +1,7 @@
+--
+-- Per-session challenge deck: the shuffle seed and how far into the deck the
+-- session has drawn.  Sessions without a seed fall back to their id.
+--
+ALTER TABLE `game_session`
+  ADD COLUMN `challenge_seed` int(11) DEFAULT NULL AFTER `completed_at`,
+  ADD COLUMN `challenge_cursor` int(11) NOT NULL DEFAULT 0 AFTER `challenge_seed`;
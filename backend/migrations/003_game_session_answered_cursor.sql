@@ -0,0 +1,10 @@
+--
+-- Challenges are graded server-side; answered_cursor is one past the last deck
+-- position the session has answered, so each served challenge is graded once.
+-- Challenges served before this migration were graded by the client, so existing
+-- sessions start with nothing left to answer.
+--
+ALTER TABLE `game_session`
+  ADD COLUMN `answered_cursor` int(11) NOT NULL DEFAULT 0 AFTER `challenge_cursor`;
+
+UPDATE `game_session` SET `answered_cursor` = `challenge_cursor`;
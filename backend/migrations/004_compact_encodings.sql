@@ -0,0 +1,12 @@
+--
+-- Compact encodings (see codec.py): guessed countries as a bitset over the
+-- two-letter code space, and saves as a packed struct.  The JSON columns are
+-- kept for rows written before this migration; run `python codec.py migrate`
+-- to backfill the new columns from them.
+--
+ALTER TABLE `game_session`
+  ADD COLUMN `countries_bitset` varbinary(86) DEFAULT NULL AFTER `countries_guessed`;
+
+ALTER TABLE `game_save`
+  MODIFY `game_data` longtext CHARACTER SET utf8mb4 COLLATE utf8mb4_bin DEFAULT NULL CHECK (json_valid(`game_data`)),
+  ADD COLUMN `game_data_packed` varbinary(255) DEFAULT NULL AFTER `game_data`;
@@ -1,52 +1,230 @@
-import mysql.connector
+import atexit
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+from functools import lru_cache
 from datetime import datetime
-from typing import List, Dict, Optional, Tuple
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 import json
+import logging
+import time
+from answers import issue_token
+from catalog import get_catalog
+from codec import decode_countries, encode_countries, pack_save, unpack_save
 from config import Config
 from data import *
+from instrumentation import record_query
+from pool import ConnectionPool, PooledConnection, PoolStats, PoolTimeoutError
+from proximity import get_proximity_engine
+from question_bank import get_question_bank
+from sampler import get_sampler, HUB_AIRPORTS
+from session_cache import CachedSession, SessionCache, SessionWrite
+from statement_cache import StatementCache
+from storage import get_storage
+
+logger = logging.getLogger(__name__)
+
+_pool: ConnectionPool | None = None
+_pool_lock = threading.Lock()
+_session_cache: SessionCache | None = None
+_session_cache_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(get_storage().connect, **Config.get_pool_config())
+    return _pool
+
+
+def reset_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+        _pool = None
+
+
+def close_session_cache():
+    if _session_cache is not None:
+        _session_cache.close()
+
+
+def get_session_cache() -> SessionCache | None:
+    global _session_cache
+    if not Config.SESSION_CACHE_ENABLED:
+        return None
+    if _session_cache is None:
+        with _session_cache_lock:
+            if _session_cache is None:
+                _session_cache = SessionCache(Config.SESSION_CACHE_SIZE, Config.SESSION_CACHE_TTL,
+                                              Config.SESSION_FLUSH_INTERVAL, GameSession.write_batch)
+                atexit.register(_session_cache.close)
+    _session_cache.start()
+    return _session_cache
+
+
+ROW_DICT = 'dict'
+ROW_TUPLE = 'tuple'
+ROW_NAMEDTUPLE = 'namedtuple'
+
+
+class DatabaseError(Exception):
+    pass
+
+
+class QueryError(DatabaseError):
+    def __init__(self, query: str, cause: Exception):
+        super().__init__(f"Query failed: {cause}")
+        self.query = query
+        self.cause = cause
+
+
+@lru_cache(maxsize=128)
+def _named_row_type(columns: Tuple[str, ...]):
+    return namedtuple('Row', columns, rename=True)
 
 
 class DatabaseConnection:
     def __init__(self):
         self.connection = None
         self.cursor = None
+        self._pooled: PooledConnection | None = None
+        self._in_transaction: bool = False
+        self._on_rollback: List[Callable[[], None]] = []
+
+    @staticmethod
+    def pool_stats() -> PoolStats:
+        return get_pool().stats()
 
     def connect(self) -> ResultNoValue:
         try:
-            self.connection = mysql.connector.connect(**Config.get_db_config())
+            self._pooled = get_pool().borrow()
+            self.connection = self._pooled.raw
             self.cursor = self.connection.cursor(dictionary=True)
+            if (self._pooled.statement_cache is None and Config.DB_STATEMENT_CACHE_SIZE > 0
+                    and get_storage().supports_prepared):
+                self._pooled.statement_cache = StatementCache(self.connection, Config.DB_STATEMENT_CACHE_SIZE)
             return ResultNoValue().success()
-        except mysql.connector.Error as e:
+        except get_storage().errors as e:
+            self.disconnect(broken=True)
+            return ResultNoValue.failure(f"Database connection error: {e}")
+        except PoolTimeoutError as e:
             return ResultNoValue.failure(f"Database connection error: {e}")
 
-    def disconnect(self):
+    def disconnect(self, broken: bool = False):
         if self.cursor:
-            self.cursor.close()
-        if self.connection:
-            self.connection.close()
+            try:
+                self.cursor.close()
+            except get_storage().errors:
+                broken = True
+        if self._pooled:
+            get_pool().release(self._pooled, broken=broken)
+        self.cursor = None
+        self.connection = None
+        self._pooled = None
+
+    def _cursor_for(self, query: str, params: tuple):
+        statements = self._pooled.statement_cache if self._pooled else None
+        if params and statements is not None:
+            return statements.cursor(query)
+        return self.cursor
+
+    def _discard_statement(self, query: str):
+        if self._pooled and self._pooled.statement_cache is not None:
+            self._pooled.statement_cache.discard(query)
 
     def execute_query(self, query: str, params: tuple = None):
+        started = time.perf_counter()
         try:
+            cursor = self._cursor_for(query, params)
             if params:
-                self.cursor.execute(query, params)
+                cursor.execute(query, params)
             else:
-                self.cursor.execute(query)
-            return self.cursor.fetchall()
-        except mysql.connector.Error as e:
-            print(f"Query exec error: {e}")
+                cursor.execute(query)
+            return cursor.fetchall()
+        except get_storage().errors as e:
+            self._discard_statement(query)
+            logger.error("Query exec error: %s", e)
             return None
+        finally:
+            record_query(query, time.perf_counter() - started)
+
+    def iter_query(self, query: str, params: tuple = None, batch_size: int = 500,
+                   row_type: str = ROW_DICT) -> Iterator:
+        """Yield rows lazily from an unbuffered cursor, fetching batch_size at a time, as dicts,
+        plain tuples or namedtuples. Errors raise QueryError instead of returning None.
+        The connection cannot run other queries until the iterator is exhausted or closed."""
+        if self.connection is None:
+            raise DatabaseError("Not connected to the database")
+        try:
+            cursor = self.connection.cursor(dictionary=row_type == ROW_DICT, buffered=False)
+        except get_storage().errors as e:
+            raise DatabaseError(f"Could not open cursor: {e}") from e
+
+        started = time.perf_counter()
+        try:
+            cursor.execute(query, params or ())
+            record_query(query, time.perf_counter() - started)
+            make_row = _named_row_type(tuple(cursor.column_names))._make if row_type == ROW_NAMEDTUPLE else None
+            while rows := cursor.fetchmany(batch_size):
+                if make_row is None:
+                    yield from rows
+                else:
+                    yield from map(make_row, rows)
+        except get_storage().errors as e:
+            raise QueryError(query, e) from e
+        finally:
+            try:
+                cursor.close()
+            except get_storage().errors:
+                self.disconnect(broken=True)
 
     def execute_update(self, query: str, params: tuple = None):
+        started = time.perf_counter()
         try:
+            cursor = self._cursor_for(query, params)
             if params:
-                self.cursor.execute(query, params)
+                cursor.execute(query, params)
             else:
-                self.cursor.execute(query)
-            self.connection.commit()
-            return self.cursor.rowcount
-        except mysql.connector.Error as e:
-            print(f"Update execution error: {e}")
+                cursor.execute(query)
+            if not self._in_transaction:
+                self.connection.commit()
+            return cursor.rowcount
+        except get_storage().errors as e:
+            self._discard_statement(query)
+            if self._in_transaction:
+                raise
+            logger.error("Update execution error: %s", e)
             return 0
+        finally:
+            record_query(query, time.perf_counter() - started)
+
+    @contextmanager
+    def transaction(self):
+        if self._in_transaction:
+            yield self
+            return
+
+        self.connection.start_transaction()
+        self._in_transaction = True
+        try:
+            yield self
+            self.connection.commit()
+        except Exception:
+            self.connection.rollback()
+            for callback in self._on_rollback:
+                callback()
+            raise
+        finally:
+            self._in_transaction = False
+            self._on_rollback.clear()
+
+    def on_rollback(self, callback: Callable[[], None]):
+        """Call ``callback`` if the enclosing transaction rolls back."""
+        self._on_rollback.append(callback)
 
 
 class Player:
@@ -84,6 +262,18 @@ class Player:
             return ResultNoValue().success()
         return ResultNoValue.failure("Player not found")
 
+    @staticmethod
+    def prepare_game_result(player_id: int, score: int, won: bool) -> Tuple[str, tuple]:
+        query = """UPDATE player
+                   SET total_score = COALESCE(total_score, 0) + %s,
+                       games_played = COALESCE(games_played, 0) + 1,
+                       games_won = COALESCE(games_won, 0) + %s
+                   WHERE id = %s"""
+        return query, (score, int(won), player_id)
+
+    def record_game_result(self, player_id: int, score: int, won: bool) -> bool:
+        return self.db.execute_update(*self.prepare_game_result(player_id, score, won)) == 1
+
     def add_battery(self, amount: int):
         self.battery_level = max(0, min(100, self.battery_level + amount))
         query = "UPDATE player SET battery_level = %s WHERE id = %s"
@@ -114,19 +304,13 @@ class Country:
         self.db = db
 
     def get_all_countries(self) -> List[CountryDto]:
-        query = "SELECT * FROM country ORDER BY name"
-        results = self.db.execute_query(query)
-        return [CountryDto.create(row) for row in results] if results else []
+        return list(get_catalog(self.db).countries)
 
     def get_country_by_name(self, name: str) -> Optional[CountryDto]:
-        query = "SELECT * FROM country WHERE LOWER(name) = LOWER(%s)"
-        result = self.db.execute_query(query, (name,))
-        return CountryDto.create(result[0]) if result else None
+        return get_catalog(self.db).get_country_by_name(name)
 
     def get_country_by_code(self, code: str) -> Optional[CountryDto]:
-        query = "SELECT * FROM country WHERE code = %s"
-        result = self.db.execute_query(query, (code,))
-        return CountryDto.create(result[0]) if result else None
+        return get_catalog(self.db).get_country(code)
 
 
 class Airport:
@@ -134,49 +318,36 @@ class Airport:
         self.db = db
 
     def get_all_airports(self) -> List[Dict]:
-        query = """SELECT * FROM airport"""
-        return self.db.execute_query(query)
+        return list(get_catalog(self.db).airport_rows)
 
     def get_airports_by_country(self, country: CountryDto) -> List[AirportDto]:
-        query = """SELECT a.*, c.name as country_name
-                   FROM airport a
-                            JOIN country c ON a.country_code = c.code
-                   WHERE a.country_code = %s
-                   ORDER BY a.is_major_hub DESC, a.name"""
-        results = self.db.execute_query(query, (country.code,))
-        return [AirportDto.create(row) for row in results] if results else []
+        return list(get_catalog(self.db).airports_by_country.get(country.code, ()))
 
     def get_airport_by_name(self, name: str) -> Optional[AirportDto]:
-        query = """SELECT a.*, c.name as country_name, c.continent
-                   FROM airport a
-                            JOIN country c ON a.country_code = c.code
-                   WHERE LOWER(a.name) = LOWER(%s)"""
-        result = self.db.execute_query(query, (name,))
-        return AirportDto.create(result[0]) if result else None
+        return get_catalog(self.db).get_airport_by_name(name)
 
     def get_airport_by_id(self, airport_id: int) -> Optional[AirportDto]:
-        query = """SELECT a.*, c.name as country_name, c.continent
-                   FROM airport a
-                            JOIN country c ON a.country_code = c.code
-                   WHERE a.id = %s"""
-        result = self.db.execute_query(query, (airport_id,))
-        return AirportDto.create(result[0]) if result else None
+        return get_catalog(self.db).get_airport(airport_id)
 
     def get_random_airport(self) -> Optional[AirportDto]:
-        query = """SELECT a.*, c.name as country_name, c.continent
-                   FROM airport a
-                            JOIN country c ON a.country_code = c.code
-                   WHERE a.is_major_hub = true
-                   ORDER BY RAND() LIMIT 1"""
-        result = self.db.execute_query(query)
-        return AirportDto.create(result[0]) if result else None
+        airport_id = get_sampler(self.db).pick(HUB_AIRPORTS)
+        return get_catalog(self.db).get_airport(airport_id) if airport_id else None
+
+    def get_random_airport_outside_country(self, country_code: str) -> Optional[AirportDto]:
+        airport_id = get_sampler(self.db).pick_excluding(HUB_AIRPORTS, country_code)
+        return get_catalog(self.db).get_airport(airport_id) if airport_id else None
 
 
 class GameSession:
+    SESSION_SELECT = """SELECT gs.*, p.name AS player_name
+                        FROM game_session gs
+                                 LEFT JOIN player p ON p.id = gs.player_id"""
+
     def __init__(self, db: DatabaseConnection):
         self.db: DatabaseConnection = db
         self.id: int | None = None
         self.player_id: int | None = None
+        self.player_name: str = ""
         self.difficulty_level: Difficulty = Difficulty.EASY
         self.starting_airport_id: int | None = None
         self.boss_airport_id: int | None = None
@@ -186,52 +357,123 @@ class GameSession:
         self.puzzles_solved: int = 0
         self.countries_guessed: List[CountryDto] = []
         self.status: SessionStatus = SessionStatus.ACTIVE
+        self.score: int = 0
+        self.completed_at: datetime | None = None
+        self.challenge_seed: int = 0
+        self.challenge_cursor: int = 0
+        self.answered_cursor: int = 0
+        self.version: int = 0
+        self._dirty: set[str] = set()
 
     def get_guessed_country_codes(self) -> List[str]:
         return [country.code for country in self.countries_guessed] if self.countries_guessed else []
 
 
     def load_session(self, session_id: int) -> bool:
-        query = "SELECT * FROM game_session WHERE id = %s"
+        if self.load_cached(session_id):
+            return True
+
+        query = f"{self.SESSION_SELECT} WHERE gs.id = %s"
         result = self.db.execute_query(query, (session_id,))
         if result:
-            self._set_session(result[0])
+            self.set_loaded(result[0])
             return True
         return False
 
-    def create_new_session(self, player_id: int, difficulty: Difficulty, boss_airport: AirportDto) -> bool:
-        airport_model = Airport(self.db)
-
-        while True:
-            starting_airport = airport_model.get_random_airport()
-            if not starting_airport or starting_airport.country_code != boss_airport.country_code:
-                break
-
-        if not starting_airport:
+    @classmethod
+    def prepare_page(cls, session_ids: Optional[List[int]] = None, status: Optional[SessionStatus] = None,
+                     difficulty: Optional[Difficulty] = None, after_id: int = 0,
+                     limit: int = 50) -> Optional[Tuple[str, tuple]]:
+        """None when ``session_ids`` is empty and there is nothing to select."""
+        conditions = ["gs.id > %s"]
+        params: list = [after_id]
+        if session_ids is not None:
+            if not session_ids:
+                return None
+            conditions.append(f"gs.id IN ({', '.join(['%s'] * len(session_ids))})")
+            params.extend(session_ids)
+        if status is not None:
+            conditions.append("gs.status = %s")
+            params.append(status.value)
+        if difficulty is not None:
+            conditions.append("gs.difficulty_level = %s")
+            params.append(difficulty.value)
+
+        query = f"{cls.SESSION_SELECT} WHERE {' AND '.join(conditions)} ORDER BY gs.id LIMIT %s"
+        return query, (*params, limit)
+
+    @classmethod
+    def sessions_from_rows(cls, db: DatabaseConnection | None, rows: List[Dict]) -> List['GameSession']:
+        cache = get_session_cache()
+        sessions = []
+        for row in rows:
+            game_session = cls(db)
+            cached = cache.get(row['id']) if cache is not None else None
+            game_session._set_session(cached if cached is not None else row)
+            sessions.append(game_session)
+        return sessions
+
+    @classmethod
+    def load_page(cls, db: DatabaseConnection, session_ids: Optional[List[int]] = None,
+                  status: Optional[SessionStatus] = None, difficulty: Optional[Difficulty] = None,
+                  after_id: int = 0, limit: int = 50) -> List['GameSession']:
+        statement = cls.prepare_page(session_ids, status, difficulty, after_id, limit)
+        if statement is None:
+            return []
+        rows = db.execute_query(*statement)
+        if rows is None:
+            raise RuntimeError("Failed to load game sessions")
+        return cls.sessions_from_rows(db, rows)
+
+    def load_cached(self, session_id: int) -> bool:
+        cache = get_session_cache()
+        cached = cache.get(session_id) if cache is not None else None
+        if cached is None:
             return False
+        self._set_session(cached)
+        return True
+
+    def set_loaded(self, session_data: Dict):
+        self._set_session(session_data)
+        cache = get_session_cache()
+        if cache is not None:
+            cache.put(session_data)
+
+    def prepare_new_session(self, player_id: int, difficulty: Difficulty,
+                            boss_airport: AirportDto) -> Optional[Tuple[str, tuple]]:
+        starting_airport = Airport(self.db).get_random_airport_outside_country(boss_airport.country_code)
+        if not starting_airport:
+            return None
 
         query = """INSERT INTO game_session
                    (player_id, difficulty_level, starting_airport_id, boss_airport_id,
-                    boss_country_code, current_airport_id, battery_level, countries_guessed)
-                   VALUES (%s, %s, %s, %s, %s, %s, %s, %s)"""
+                    boss_country_code, current_airport_id, battery_level, countries_bitset,
+                    challenge_seed)
+                   VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)"""
+
+        return query, (
+            player_id, difficulty.value, starting_airport.id, boss_airport.id,
+            boss_airport.country_code, starting_airport.id,
+            Config.DEFAULT_BATTERY, encode_countries([]), get_sampler(self.db).new_seed()
+        )
 
-        countries_json = json.dumps([])
+    def create_new_session(self, player_id: int, difficulty: Difficulty, boss_airport: AirportDto) -> bool:
+        statement = self.prepare_new_session(player_id, difficulty, boss_airport)
+        if statement is None:
+            return False
 
-        if self.db.execute_update(query, (
-                player_id, difficulty.value, starting_airport.id, boss_airport.id,
-                boss_airport.country_code, starting_airport.id,
-                Config.DEFAULT_BATTERY, countries_json
-        )):
-            query = "SELECT * FROM game_session WHERE player_id = %s ORDER BY id DESC LIMIT 1"
+        if self.db.execute_update(*statement):
+            query = f"{self.SESSION_SELECT} WHERE gs.player_id = %s ORDER BY gs.id DESC LIMIT 1"
             result = self.db.execute_query(query, (player_id,))
             if result:
-                self._set_session(result[0])
+                self.set_loaded(result[0])
                 return True
         return False
 
     def _set_session(self, session_data: Dict):
         self.id = session_data['id']
         self.player_id = session_data['player_id']
+        self.player_name = session_data.get('player_name') or ""
         self.difficulty_level = Difficulty(session_data['difficulty_level'])
         self.starting_airport_id = session_data['starting_airport_id']
         self.boss_airport_id = session_data['boss_airport_id']
@@ -239,112 +481,261 @@ class GameSession:
         self.current_airport_id = session_data['current_airport_id']
         self.battery_level = session_data['battery_level']
         self.puzzles_solved = session_data['puzzles_solved']
-        countries_json = session_data['countries_guessed']
-        guessed_countries_codes = json.loads(countries_json) if countries_json else []
-        country_model = Country(self.db)
-        self.countries_guessed = [country_model.get_country_by_code(code) for code in guessed_countries_codes if country_model.get_country_by_code(code)]
+        countries_bitset = session_data.get('countries_bitset')
+        if countries_bitset is not None:
+            guessed_countries_codes = decode_countries(countries_bitset)
+        else:
+            countries_json = session_data['countries_guessed']
+            guessed_countries_codes = json.loads(countries_json) if countries_json else []
+        catalog = get_catalog(self.db)
+        countries = (catalog.get_country(code) for code in guessed_countries_codes)
+        self.countries_guessed = [country for country in countries if country]
         self.status = SessionStatus(session_data['status'])
         self.score = session_data['score']
+        self.completed_at = session_data.get('completed_at')
+        self.challenge_seed = session_data.get('challenge_seed') or self.id
+        self.challenge_cursor = session_data.get('challenge_cursor') or 0
+        self.answered_cursor = session_data.get('answered_cursor') or 0
+        self.version = session_data.get('version', 0)
+        self._dirty.clear()
+
+    def get_player_info(self) -> PlayerDto:
+        if self.player_name == "":
+            return PlayerDto(id=-1, name="Unknown")
+        return PlayerDto(id=self.player_id, name=self.player_name)
 
     def get_game_state(self) -> Dict:
-        airport_model = Airport(self.db)
-        country_model = Country(self.db)
-        player_model = Player(self.db)
-        player_model.get_player_by_id(self.player_id)
+        catalog = get_catalog(self.db)
+        proximity = get_proximity_engine(self.db)
+        current_airport = catalog.get_airport(self.current_airport_id)
+        boss_airport = catalog.get_airport(self.boss_airport_id)
+        distance = proximity.distance_km(self.current_airport_id, self.boss_airport_id)
+        flight_result = proximity.classify_for_difficulty(current_airport, boss_airport, self.difficulty_level) \
+            if current_airport and boss_airport else None
         return {
             'session_id': self.id,
             'difficulty_level': self.difficulty_level.value,
-            'starting_airport': airport_model.get_airport_by_id(self.starting_airport_id),
-            'boss_airport': airport_model.get_airport_by_id(self.boss_airport_id),
-            'boss_country': country_model.get_country_by_code(self.boss_country_code),
-            'current_airport': airport_model.get_airport_by_id(self.current_airport_id),
+            'starting_airport': catalog.get_airport(self.starting_airport_id),
+            'boss_airport': boss_airport,
+            'boss_country': catalog.get_country(self.boss_country_code),
+            'current_airport': current_airport,
+            'distance_to_boss_km': round(distance, 1) if distance is not None else None,
+            'flight_result': flight_result.value if flight_result else None,
             'battery_level': self.battery_level,
             'puzzles_solved': self.puzzles_solved,
             'countries_guessed': [country for country in self.countries_guessed],
             'status': self.status.value,
             'score': self.score,
-            'player': player_model.get_player_info()
+            'player': self.get_player_info()
         }
 
+    def apply_move(self, airport: AirportDto) -> ResultNoValue:
+        if self.status is not SessionStatus.ACTIVE:
+            return ResultNoValue.failure("Game session is not active")
+        self.forfeit_unanswered()
+        self.update_current_airport(airport)
+        self.increment_puzzles_solved()
+        country = get_catalog(self.db).get_country(airport.country_code)
+        if country:
+            self.add_guessed_country(country)
+        return ResultNoValue.success()
+
+    def forfeit_unanswered(self):
+        """Moving on settles every challenge issued since the last answer; each one left
+        unanswered costs the wrong-answer penalty."""
+        unanswered = self.challenge_cursor - self.answered_cursor
+        if unanswered > 0:
+            self.answered_cursor = self.challenge_cursor
+            self._dirty.add('answered_cursor')
+            self.deduct_battery(unanswered * Config.get_battery_penalty(self.difficulty_level))
+
+    def record_answer(self, cursor: int, correct: bool) -> ResultNoValue:
+        if self.status is not SessionStatus.ACTIVE:
+            return ResultNoValue.failure("Game session is not active")
+        if cursor < self.answered_cursor:
+            return ResultNoValue.failure("Challenge has already been answered")
+        if cursor >= self.challenge_cursor:
+            return ResultNoValue.failure("Challenge was not issued to this session")
+
+        # Challenges issued before this one and never answered cost the penalty, as on a move.
+        skipped = cursor - self.answered_cursor
+        if skipped:
+            self.deduct_battery(skipped * Config.get_battery_penalty(self.difficulty_level))
+        self.answered_cursor = cursor + 1
+        self._dirty.add('answered_cursor')
+        if correct:
+            self.add_battery(Config.get_battery_reward(self.difficulty_level))
+        else:
+            self.deduct_battery(Config.get_battery_penalty(self.difficulty_level))
+        return ResultNoValue.success()
+
+    def has_reached_end(self) -> bool:
+        return self.battery_level <= 0 or self.current_airport_id == self.boss_airport_id
+
     def add_guessed_country(self, country: CountryDto):
         if country not in self.countries_guessed:
             self.countries_guessed.append(country)
-            query = "UPDATE game_session SET countries_guessed = %s WHERE id = %s"
-            guessed_countries_codes = [c.code for c in self.countries_guessed]
-            self.db.execute_update(query, (json.dumps(guessed_countries_codes), self.id))
+            self._dirty.add('countries_bitset')
 
     def update_current_airport(self, airport: AirportDto):
         self.current_airport_id = airport.id
-        query = "UPDATE game_session SET current_airport_id = %s WHERE id = %s"
-        self.db.execute_update(query, (airport.id, self.id))
+        self._dirty.add('current_airport_id')
 
     def add_battery(self, amount: int):
         self.battery_level = max(0, min(100, self.battery_level + amount))
-        query = "UPDATE game_session SET battery_level = %s WHERE id = %s"
-        self.db.execute_update(query, (self.battery_level, self.id))
+        self._dirty.add('battery_level')
 
     def deduct_battery(self, amount: int):
         self.battery_level = max(0, min(100, self.battery_level - amount))
-        query = "UPDATE game_session SET battery_level = %s WHERE id = %s"
-        self.db.execute_update(query, (self.battery_level, self.id))
+        self._dirty.add('battery_level')
 
     def increment_puzzles_solved(self):
         self.puzzles_solved += 1
-        query = "UPDATE game_session SET puzzles_solved = %s WHERE id = %s"
-        self.db.execute_update(query, (self.puzzles_solved, self.id))
+        self._dirty.add('puzzles_solved')
 
-    def update_status(self, status: SessionStatus):
+    def advance_challenge_cursor(self):
+        self.challenge_cursor += 1
+        self._dirty.add('challenge_cursor')
+
+    def update_status(self, status: SessionStatus) -> ResultNoValue:
+        """Only an active session can change status, so a result is recorded once. Won
+        and lost sessions are scored here; the caller records the result with the commit."""
+        if self.status is not SessionStatus.ACTIVE:
+            return ResultNoValue.failure("Game session has already finished")
         self.status = status
-        completed_at = datetime.now() if status is SessionStatus.WON or SessionStatus.LOST or SessionStatus.ABANDONED else None
-        if completed_at:
-            query = "UPDATE game_session SET status = %s, completed_at = %s WHERE id = %s"
-            self.db.execute_update(query, (status.value, completed_at, self.id))
-        else:
-            query = "UPDATE game_session SET status = %s WHERE id = %s"
-            self.db.execute_update(query, (status.value, self.id))
+        self._dirty.add('status')
+        if status in (SessionStatus.WON, SessionStatus.LOST, SessionStatus.ABANDONED):
+            self.completed_at = datetime.now()
+            self._dirty.add('completed_at')
+        if self.has_result():
+            self.score = self.calculate_score()
+            self._dirty.add('score')
+        return ResultNoValue.success()
+
+    def has_result(self) -> bool:
+        return self.status in (SessionStatus.WON, SessionStatus.LOST)
+
+    def calculate_score(self) -> int:
+        score = Config.SCORE_PER_COUNTRY * len(self.countries_guessed)
+        if self.status is SessionStatus.WON:
+            score += Config.get_win_bonus(self.difficulty_level) + self.battery_level
+        return score
+
+    def _column_value(self, column: str):
+        match column:
+            case 'countries_bitset':
+                return encode_countries(self.get_guessed_country_codes())
+            case 'status':
+                return self.status.value
+            case _:
+                return getattr(self, column)
+
+    def _dirty_values(self) -> Dict:
+        return {column: self._column_value(column) for column in sorted(self._dirty)}
+
+    def pending_update(self) -> Optional[Tuple[str, tuple]]:
+        if not self._dirty:
+            return None
+        values = self._dirty_values()
+        assignments = ", ".join(f"{column} = %s" for column in values)
+        query = f"UPDATE game_session SET {assignments}, version = version + 1 WHERE id = %s AND version = %s"
+        return query, (*values.values(), self.id, self.version)
+
+    def commit(self) -> ResultNoValue:
+        statement = self.pending_update()
+        if statement is None:
+            return ResultNoValue.success()
+
+        cache = get_session_cache()
+        if cache is not None and self.is_finishing():
+            detached = cache.detach(self.id, self.version)
+            if detached.is_error():
+                return ResultNoValue.failure(detached.error)
+            entry = detached.value
+            with self.db.transaction():
+                if entry is not None:
+                    self.db.on_rollback(lambda: cache.restore(entry))
+                updated = self.db.execute_update(*self.write_through_update(entry))
+            return self.mark_committed(updated)
+
+        cached = self.commit_cached()
+        if cached is not None:
+            return cached
+
+        with self.db.transaction():
+            updated = self.db.execute_update(*statement)
+        return self.mark_committed(updated)
+
+    def is_finishing(self) -> bool:
+        """A commit that ends the session writes through the session cache, so it lands in
+        the caller's transaction with the player's totals instead of in a later flush."""
+        return 'status' in self._dirty and self.status is not SessionStatus.ACTIVE
+
+    def write_through_update(self, cached: Optional[CachedSession]) -> Tuple[str, tuple]:
+        """The UPDATE for a write-through commit, carrying the cached entry's unwritten changes."""
+        values = self._dirty_values()
+        db_version = self.version
+        if cached is not None:
+            values = {**{column: cached.row[column] for column in sorted(cached.dirty)}, **values}
+            db_version = cached.db_version
+        assignments = ", ".join(f"{column} = %s" for column in values)
+        query = f"UPDATE game_session SET {assignments}, version = %s WHERE id = %s AND version = %s"
+        return query, (*values.values(), self.version + 1, self.id, db_version)
+
+    def commit_cached(self) -> ResultNoValue | None:
+        cache = get_session_cache()
+        if cache is None or not self._dirty:
+            return None
+        cached = cache.apply(self.id, self.version, self._dirty_values())
+        if cached is not None and cached.is_success():
+            self.version += 1
+            self._dirty.clear()
+        return cached
+
+    def mark_committed(self, updated_rows: int) -> ResultNoValue:
+        if updated_rows != 1:
+            return ResultNoValue.failure("Game session was modified by another request, reload and retry")
+        self.version += 1
+        self._dirty.clear()
+        return ResultNoValue.success()
+
+    @staticmethod
+    def write_batch(writes: List[SessionWrite]) -> List[int]:
+        db = DatabaseConnection()
+        connection_result = db.connect()
+        if connection_result.is_error():
+            raise RuntimeError(connection_result.error)
+
+        conflicts = []
+        try:
+            with db.transaction():
+                for session_id, db_version, new_version, changes in writes:
+                    assignments = ", ".join(f"{column} = %s" for column in changes)
+                    query = f"UPDATE game_session SET {assignments}, version = %s WHERE id = %s AND version = %s"
+                    if db.execute_update(query, (*changes.values(), new_version, session_id, db_version)) != 1:
+                        conflicts.append(session_id)
+            return conflicts
+        finally:
+            db.disconnect()
 
 
 class Challenge:
     def __init__(self, db: DatabaseConnection):
         self.db = db
 
-    def get_random_open_question(self, difficulty: Difficulty) -> Optional[OpenQuestion]:
-        query = """SELECT * \
-                   FROM question_task
-                   WHERE difficulty_level = %s
-                   ORDER BY RAND() LIMIT 1"""
-        result = self.db.execute_query(query, (difficulty.value,))
-        if result:
-            question_data = result[0]
-            return OpenQuestion(
-                question=question_data['question'],
-                answer=question_data['correct_answer']
-            )
-        return None
-
-    def get_random_multiple_choice(self, difficulty: Difficulty) -> Optional[MultipleChoiceQuestion]:
-        query = """SELECT * \
-                   FROM multiple_choice_question
-                   WHERE difficulty_level = %s
-                   ORDER BY RAND() LIMIT 1"""
-        result = self.db.execute_query(query, (difficulty.value,))
-
-        if not result:
+    def get_next_for_session(self, session: 'GameSession') -> Optional[ChallengeDto]:
+        bank = get_question_bank(self.db)
+        cursor = session.challenge_cursor
+        entry = bank.draw_entry(session.difficulty_level, session.challenge_seed, cursor)
+        challenge = bank.question_for_entry(entry, session.challenge_seed, cursor) if entry is not None else None
+        if challenge is None:
             return None
+        session.advance_challenge_cursor()
 
-        question = result[0]
-
-        query = """SELECT * \
-                   FROM multiple_choice_answer
-                   WHERE question_id = %s
-                   ORDER BY RAND()"""
-        answers = self.db.execute_query(query, (question['id'],))
-
-        options = [MultipleChoiceOption(name=ans['answer'], is_correct=ans['is_correct']) for ans in answers] if answers else []
-        return MultipleChoiceQuestion(
-            question=question['question'],
-            options=options
-        )
+        options = [option.name for option in challenge.options] \
+            if isinstance(challenge, MultipleChoiceQuestion) else None
+        return ChallengeDto(token=issue_token(session.id, cursor, entry), question=challenge.question,
+                            type=challenge.type, options=options)
 
 
 class GameSave:
@@ -354,60 +745,50 @@ class GameSave:
     def save_game(self, player_id: int, session: GameSession, save_name: str = "autosave") -> bool:
         game_data = {
             'session_id': session.id,
-            'difficulty_level': session.difficulty_level,
+            'difficulty_level': session.difficulty_level.value,
             'starting_airport_id': session.starting_airport_id,
             'boss_airport_id': session.boss_airport_id,
             'boss_country_code': session.boss_country_code,
             'current_airport_id': session.current_airport_id,
             'battery_level': session.battery_level,
             'puzzles_solved': session.puzzles_solved,
-            'countries_guessed': session.countries_guessed,
-            'status': session.status,
+            'countries_guessed': session.get_guessed_country_codes(),
+            'status': session.status.value,
             'score': session.score,
             'save_timestamp': datetime.now().isoformat()
         }
+        packed = pack_save(game_data)
 
         query = "SELECT id FROM game_save WHERE player_id = %s AND save_name = %s"
         existing = self.db.execute_query(query, (player_id, save_name))
 
         if existing:
             query = """UPDATE game_save
-                       SET game_data  = %s, \
-                           updated_at = CURRENT_TIMESTAMP
+                       SET game_data        = NULL, \
+                           game_data_packed = %s, \
+                           updated_at       = CURRENT_TIMESTAMP
                        WHERE player_id = %s \
                          AND save_name = %s"""
-            return self.db.execute_update(query, (json.dumps(game_data), player_id, save_name)) > 0
+            return self.db.execute_update(query, (packed, player_id, save_name)) > 0
         else:
-            query = """INSERT INTO game_save (player_id, save_name, game_data)
+            query = """INSERT INTO game_save (player_id, save_name, game_data_packed)
                        VALUES (%s, %s, %s)"""
-            return self.db.execute_update(query, (player_id, save_name, json.dumps(game_data))) > 0
+            return self.db.execute_update(query, (player_id, save_name, packed)) > 0
 
     def get_player_saves(self, player_id: int) -> List[GameSaveDto]:
-        query = """SELECT id, save_name, created_at, updated_at, game_data
+        query = """SELECT id, player_id, save_name
                    FROM game_save
                    WHERE player_id = %s
                    ORDER BY updated_at DESC"""
-        saves = self.db.execute_query(query, (player_id,))
-
-        if saves:
-            for save in saves:
-                try:
-                    game_data = json.loads(save['game_data'])
-                    save['preview'] = {
-                        'difficulty': game_data.get('difficulty_level', 'unknown'),
-                        'battery': game_data.get('battery_level', 0),
-                        'puzzles_solved': game_data.get('puzzles_solved', 0),
-                        'countries_guessed': len(game_data.get('countries_guessed', [])),
-                        'status': game_data.get('status', 'unknown')
-                    }
-                except json.JSONDecodeError:
-                    save['preview'] = {'error': 'Invalid save data'}
-
-        return [GameSaveDto.create(s) for s in saves] if saves else []
+        try:
+            return GameSaveDto.from_rows(self.db.iter_query(query, (player_id,), row_type=ROW_TUPLE))
+        except DatabaseError as e:
+            logger.error("Query exec error: %s", e)
+            return []
 
     def load_game(self, save: GameSaveDto) -> Optional[Dict]:
         """Load and return the game data from a save"""
-        query = """SELECT game_data \
+        query = """SELECT game_data, game_data_packed \
                    FROM game_save
                    WHERE player_id = %s \
                      AND save_name = %s"""
@@ -415,8 +796,10 @@ class GameSave:
 
         if result:
             try:
+                if result[0]['game_data_packed'] is not None:
+                    return unpack_save(bytes(result[0]['game_data_packed']))
                 return json.loads(result[0]['game_data'])
-            except json.JSONDecodeError:
+            except (ValueError, TypeError):
                 return None
         return None
 
@@ -428,15 +811,18 @@ class GameSave:
         session = GameSession(db)
 
         session.id = save_data.get('session_id')
-        session.difficulty_level = save_data.get('difficulty_level', 'easy')
+        session.difficulty_level = Difficulty(save_data.get('difficulty_level', 'easy'))
         session.starting_airport_id = save_data.get('starting_airport_id')
         session.boss_airport_id = save_data.get('boss_airport_id')
         session.boss_country_code = save_data.get('boss_country_code')
         session.current_airport_id = save_data.get('current_airport_id')
         session.battery_level = save_data.get('battery_level', 100)
         session.puzzles_solved = save_data.get('puzzles_solved', 0)
-        session.countries_guessed = save_data.get('countries_guessed', [])
-        session.status = save_data.get('status', 'active')
+        catalog = get_catalog(db)
+        codes = (country['code'] if isinstance(country, dict) else country
+                 for country in save_data.get('countries_guessed', []))
+        session.countries_guessed = [country for country in map(catalog.get_country, codes) if country]
+        session.status = SessionStatus(save_data.get('status', 'active'))
         session.score = save_data.get('score', 0)
 
         return session
\ No newline at end of file
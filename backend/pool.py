@@ -0,0 +1,164 @@
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable
+
+
+class PoolTimeoutError(Exception):
+    pass
+
+
+@dataclass
+class PoolStats:
+    size: int
+    idle: int
+    in_use: int
+    waiting: int
+    created: int
+    recycled: int
+    borrowed: int
+    timeouts: int
+
+
+class PooledConnection:
+    def __init__(self, raw):
+        self.raw = raw
+        self.created_at: float = time.monotonic()
+        self.last_used_at: float = self.created_at
+        # Per-connection prepared statements, created and used by models.DatabaseConnection.
+        self.statement_cache = None
+
+
+class ConnectionPool:
+    """Bounded, process-wide pool; idle connections are health-checked on borrow
+    and evicted after ``idle_timeout`` seconds so a server-side wait_timeout never
+    hands out a dead socket."""
+
+    def __init__(self, factory: Callable, size: int, timeout: float,
+                 ping_on_borrow: bool = True, idle_timeout: float = 0):
+        self._factory = factory
+        self._size = size
+        self._timeout = timeout
+        self._ping_on_borrow = ping_on_borrow
+        self._idle_timeout = idle_timeout
+
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+        self._idle: deque[PooledConnection] = deque()
+        self._open = 0
+        self._in_use = 0
+        self._waiting = 0
+        self._created = 0
+        self._recycled = 0
+        self._borrowed = 0
+        self._timeouts = 0
+
+    def borrow(self) -> PooledConnection:
+        deadline = time.monotonic() + self._timeout
+        while True:
+            pooled = self._take_idle_or_reserve(deadline)
+            if pooled is None:
+                break
+            # The health check may be a network round trip, so it runs without the lock;
+            # the popped connection still counts towards the pool size meanwhile.
+            if self._is_usable(pooled):
+                with self._available:
+                    self._in_use += 1
+                    self._borrowed += 1
+                return pooled
+            self._discard(pooled)
+
+        # Opening a connection is the slow part, so do it without holding the lock.
+        try:
+            pooled = PooledConnection(self._factory())
+        except Exception:
+            with self._available:
+                self._open -= 1
+                self._available.notify()
+            raise
+
+        with self._available:
+            self._created += 1
+            self._in_use += 1
+            self._borrowed += 1
+        return pooled
+
+    def _take_idle_or_reserve(self, deadline: float) -> PooledConnection | None:
+        """An idle connection to check, or None once a slot for a new one is reserved."""
+        with self._available:
+            while True:
+                if self._idle:
+                    return self._idle.pop()
+
+                if self._open < self._size:
+                    self._open += 1
+                    return None
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeoutError(f"No free database connection after {self._timeout}s "
+                                           f"(pool size {self._size})")
+                self._waiting += 1
+                try:
+                    self._available.wait(remaining)
+                finally:
+                    self._waiting -= 1
+
+    def release(self, pooled: PooledConnection, broken: bool = False):
+        with self._available:
+            self._in_use -= 1
+            if not broken:
+                pooled.last_used_at = time.monotonic()
+                self._idle.append(pooled)
+                self._available.notify()
+        if broken:
+            self._discard(pooled)
+
+    def close(self):
+        with self._available:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._open -= len(idle)
+            self._available.notify_all()
+        for pooled in idle:
+            self._close_raw(pooled)
+
+    def stats(self) -> PoolStats:
+        with self._lock:
+            return PoolStats(
+                size=self._size,
+                idle=len(self._idle),
+                in_use=self._in_use,
+                waiting=self._waiting,
+                created=self._created,
+                recycled=self._recycled,
+                borrowed=self._borrowed,
+                timeouts=self._timeouts,
+            )
+
+    def _is_usable(self, pooled: PooledConnection) -> bool:
+        if self._idle_timeout and time.monotonic() - pooled.last_used_at > self._idle_timeout:
+            return False
+        if self._ping_on_borrow:
+            try:
+                return pooled.raw.is_connected()
+            except Exception:
+                return False
+        return True
+
+    def _discard(self, pooled: PooledConnection):
+        """Close a connection that is out of the idle list and free its slot; called without the lock."""
+        self._close_raw(pooled)
+        with self._available:
+            self._open -= 1
+            self._recycled += 1
+            self._available.notify()
+
+    @staticmethod
+    def _close_raw(pooled: PooledConnection):
+        try:
+            pooled.raw.close()
+        except Exception:
+            pass
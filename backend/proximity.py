@@ -0,0 +1,78 @@
+import threading
+from array import array
+from typing import Optional, Sequence
+from catalog import Catalog, get_catalog
+from config import Config
+from data import AirportDto, Difficulty, FlightResult
+from geo import haversine_km
+
+
+class ProximityEngine:
+    """Airport-to-airport distances precomputed into a flat float32 matrix over the
+    catalog, so scoring a move is an index lookup rather than trigonometry."""
+
+    def __init__(self, catalog: Catalog, max_matrix_airports: int):
+        self.catalog = catalog
+        self._airports: Sequence[AirportDto] = catalog.airports
+        self._positions = {airport.id: index for index, airport in enumerate(self._airports)}
+        self._coordinates = [(float(a.latitude), float(a.longitude)) for a in self._airports]
+        self._size = len(self._airports)
+        self._matrix: array | None = None
+        if self._size <= max_matrix_airports:
+            self._matrix = self._build_matrix()
+
+    def _build_matrix(self) -> array:
+        n = self._size
+        matrix = array('f', bytes(4 * n * n))
+        for i in range(n):
+            lat1, lon1 = self._coordinates[i]
+            for j in range(i + 1, n):
+                distance = haversine_km(lat1, lon1, *self._coordinates[j])
+                matrix[i * n + j] = distance
+                matrix[j * n + i] = distance
+        return matrix
+
+    def distance_km(self, from_airport_id: int, to_airport_id: int) -> Optional[float]:
+        i = self._positions.get(from_airport_id)
+        j = self._positions.get(to_airport_id)
+        if i is None or j is None:
+            return None
+        if self._matrix is not None:
+            return self._matrix[i * self._size + j]
+        return haversine_km(*self._coordinates[i], *self._coordinates[j])
+
+    @staticmethod
+    def classify(airport: AirportDto, boss_airport: AirportDto) -> FlightResult:
+        if airport.id == boss_airport.id:
+            return FlightResult.CORRECT_AIRPORT
+        if airport.country_code == boss_airport.country_code:
+            return FlightResult.CORRECT_COUNTRY
+        if airport.continent == boss_airport.continent:
+            return FlightResult.CORRECT_CONTINENT
+        return FlightResult.INCORRECT
+
+    @classmethod
+    def classify_for_difficulty(cls, airport: AirportDto, boss_airport: AirportDto,
+                                difficulty: Difficulty) -> FlightResult:
+        result = cls.classify(airport, boss_airport)
+        if result is FlightResult.CORRECT_COUNTRY and not Config.allow_show_correct_country(difficulty):
+            result = FlightResult.CORRECT_CONTINENT
+        if result is FlightResult.CORRECT_CONTINENT and not Config.allow_show_correct_continent(difficulty):
+            result = FlightResult.INCORRECT
+        return result
+
+
+_engine: ProximityEngine | None = None
+_engine_lock = threading.Lock()
+
+
+def get_proximity_engine(db) -> ProximityEngine:
+    global _engine
+    catalog = get_catalog(db)
+    engine = _engine
+    if engine is None or engine.catalog is not catalog:
+        with _engine_lock:
+            if _engine is None or _engine.catalog is not catalog:
+                _engine = ProximityEngine(catalog, Config.PROXIMITY_MATRIX_MAX_AIRPORTS)
+            engine = _engine
+    return engine
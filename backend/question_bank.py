@@ -0,0 +1,111 @@
+import random
+import threading
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+from answers import AnswerIndex
+from config import Config
+from data import Difficulty, OpenQuestion, MultipleChoiceQuestion, MultipleChoiceOption
+
+# Deck entries are packed as ``question_id << 1 | kind`` so a whole deck is a tuple of ints.
+OPEN_QUESTION_KIND = 0
+MULTIPLE_CHOICE_KIND = 1
+
+
+class QuestionBank:
+    """Every challenge question and answer, loaded in one pass. A session's deck is a
+    seeded permutation of the entries for its difficulty, reshuffled once per pass."""
+
+    def __init__(self, open_rows: list, choice_rows: list, answer_rows: list):
+        self.open_questions: Dict[int, OpenQuestion] = {
+            row['id']: OpenQuestion(question=row['question'], answer=row['correct_answer'])
+            for row in open_rows
+        }
+
+        answers: Dict[int, List[MultipleChoiceOption]] = {}
+        for row in answer_rows:
+            answers.setdefault(row['question_id'], []).append(
+                MultipleChoiceOption(name=row['answer'], is_correct=bool(row['is_correct'])))
+        self.multiple_choice: Dict[int, Tuple[str, Tuple[MultipleChoiceOption, ...]]] = {
+            row['id']: (row['question'], tuple(answers.get(row['id'], ())))
+            for row in choice_rows
+        }
+
+        self.answers = AnswerIndex()
+        for row in open_rows:
+            self.answers.add(row['id'] << 1 | OPEN_QUESTION_KIND, [row['correct_answer']], fuzzy=True)
+        for question_id, (_, options) in self.multiple_choice.items():
+            self.answers.add(question_id << 1 | MULTIPLE_CHOICE_KIND,
+                             [option.name for option in options if option.is_correct], fuzzy=False)
+
+        self.entries: Dict[str, Tuple[int, ...]] = {}
+        for difficulty in Config.DIFFICULTY_LEVELS:
+            entries = [row['id'] << 1 | OPEN_QUESTION_KIND
+                       for row in open_rows if row['difficulty_level'] == difficulty]
+            entries += [row['id'] << 1 | MULTIPLE_CHOICE_KIND
+                        for row in choice_rows if row['difficulty_level'] == difficulty]
+            self.entries[difficulty] = tuple(sorted(entries))
+
+        self._deck = lru_cache(maxsize=Config.CHALLENGE_DECK_CACHE_SIZE)(self._shuffle_deck)
+
+    def get_open_question(self, question_id: int) -> Optional[OpenQuestion]:
+        return self.open_questions.get(question_id)
+
+    def get_multiple_choice(self, question_id: int,
+                            shuffle: Callable[[list], None] = random.shuffle) -> Optional[MultipleChoiceQuestion]:
+        question = self.multiple_choice.get(question_id)
+        if question is None:
+            return None
+        text, options = question
+        options = list(options)
+        shuffle(options)
+        return MultipleChoiceQuestion(question=text, options=options)
+
+    def draw_entry(self, difficulty: Difficulty, seed: int, cursor: int) -> Optional[int]:
+        entries = self.entries.get(difficulty.value, ())
+        if not entries:
+            return None
+        epoch, position = divmod(cursor, len(entries))
+        return self._deck(difficulty.value, seed, epoch)[position]
+
+    def question_for_entry(self, entry: int, seed: int,
+                           cursor: int) -> Optional[OpenQuestion | MultipleChoiceQuestion]:
+        if entry & 1 == MULTIPLE_CHOICE_KIND:
+            return self.get_multiple_choice(entry >> 1, random.Random(f"{seed}:{cursor}").shuffle)
+        return self.get_open_question(entry >> 1)
+
+    def _shuffle_deck(self, difficulty: str, seed: int, epoch: int) -> Tuple[int, ...]:
+        deck = list(self.entries[difficulty])
+        random.Random(f"{seed}:{epoch}").shuffle(deck)
+        return tuple(deck)
+
+
+_bank: QuestionBank | None = None
+_bank_lock = threading.Lock()
+
+
+def _read_question_bank(db) -> QuestionBank:
+    open_rows = db.execute_query("SELECT id, question, correct_answer, difficulty_level FROM question_task")
+    choice_rows = db.execute_query("SELECT id, question, difficulty_level FROM multiple_choice_question")
+    answer_rows = db.execute_query("""SELECT question_id, answer, is_correct
+                                      FROM multiple_choice_answer
+                                      ORDER BY question_id, id""")
+    if open_rows is None or choice_rows is None or answer_rows is None:
+        raise RuntimeError("Failed to load question bank")
+    return QuestionBank(open_rows, choice_rows, answer_rows)
+
+
+def get_question_bank(db) -> QuestionBank:
+    global _bank
+    if _bank is None:
+        with _bank_lock:
+            if _bank is None:
+                _bank = _read_question_bank(db)
+    return _bank
+
+
+def reload_question_bank(db) -> QuestionBank:
+    global _bank
+    bank = _read_question_bank(db)
+    with _bank_lock:
+        _bank = bank
+    return bank
@@ -1,38 +1,141 @@
 # python
-from flask import Flask, request, jsonify
+import hmac
+import logging
+import time
+from flask import Flask, Response, g, request, jsonify, stream_with_context
 from flask_cors import CORS
+from config import Config
+from serialization import FastJSONProvider
+from validation import validate_answer, validate_coordinates, validate_game_states, validate_new_game, validate_update_state
 import api
+import export
+import instrumentation
 
 
+logging.basicConfig(level=Config.LOG_LEVEL, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+logger = logging.getLogger(__name__)
+
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 CORS(app)
 
+preload_result = api.preload_reference_data()
+if preload_result.is_error():
+    logger.warning("Reference data not preloaded, loading on first use: %s", preload_result.error)
+
+
+@app.before_request
+def start_instrumentation():
+    g.request_started = time.perf_counter()
+    g.instrumentation_token = instrumentation.start_request(request.url_rule.rule if request.url_rule else 'unmatched')
+
+
+@app.after_request
+def finish_instrumentation(response):
+    if 'instrumentation_token' in g:
+        total_time = time.perf_counter() - g.request_started
+        stats = instrumentation.finish_request(g.pop('instrumentation_token'), total_time)
+        if stats is not None:
+            response.headers['Server-Timing'] = stats.server_timing(total_time)
+    return response
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return Response(instrumentation.render_metrics(), status=200, mimetype='text/plain; version=0.0.4')
+
 
 @app.route('/airports', methods=['GET'])
 def airports():
-    result = api.get_available_airports()
+    fields = request.args.get('fields')
+    fields = [field.strip() for field in fields.split(',') if field.strip()] if fields else None
+
+    unknown = set(fields or ()) - set(api.AIRPORT_FIELDS)
+    if unknown:
+        return jsonify({"error": f"Unknown airport fields: {', '.join(sorted(unknown))}"}), 400
+
+    result = api.get_airports_payload(fields)
+    if result.is_error():
+        return jsonify({"error": result.error}), 500
+    payload = result.value
+
+    if request.if_none_match.contains_weak(payload.etag):
+        response = Response(status=304)
+    elif request.accept_encodings['gzip']:
+        response = Response(payload.gzipped, status=200, mimetype='application/json')
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = Response(payload.body, status=200, mimetype='application/json')
+
+    response.set_etag(payload.etag, weak=True)
+    response.headers['Cache-Control'] = f"public, max-age={Config.AIRPORTS_CACHE_MAX_AGE}"
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+@app.route('/airports/nearest', methods=['GET'])
+def nearest_airports():
+    latitude, longitude, error = validate_coordinates(request.args)
+    k = request.args.get('k', default=5, type=int)
+    if k is None or k < 1:
+        error += "k must be a positive integer. \n"
+
+    if error:
+        return jsonify({"error": error}), 400
+
+    result = api.find_nearest_airports(latitude, longitude, k)
     if result.is_error():
         return jsonify({"error": result.error}), 500
     return jsonify(result.value), 200
 
 
-@app.route('/new_game', methods=['POST'])
-def new_game():
-    data = request.get_json(force=True)
-    difficulty = data.get('difficulty')
-    player_name = data.get('player_name')
+@app.route('/airports/within', methods=['GET'])
+def airports_within():
+    latitude, longitude, error = validate_coordinates(request.args)
+    radius_km = request.args.get('radius_km', type=float)
+    if radius_km is None or radius_km < 0:
+        error += "radius_km must be a non-negative number. \n"
+
+    if error:
+        return jsonify({"error": error}), 400
+
+    result = api.find_airports_within(latitude, longitude, radius_km)
+    if result.is_error():
+        return jsonify({"error": result.error}), 500
+    return jsonify(result.value), 200
 
-    error: str = ""
 
-    if not difficulty:
-        error += "difficulty required. \n"
-    if not player_name:
-        error += "player_name required. \n"
+@app.route('/export/<table>', methods=['GET'])
+def export_table(table):
+    if not Config.EXPORT_TOKEN:
+        return jsonify({"error": "Export is disabled"}), 404
+    token = request.headers.get('Authorization', '').removeprefix('Bearer ')
+    if not hmac.compare_digest(token, Config.EXPORT_TOKEN):
+        return jsonify({"error": "Invalid export token"}), 401
+
+    result = export.stream_export(table, request.args.get('since'), request.args.get('until'),
+                                  request.args.get('status'))
+    if result.is_error():
+        return jsonify({"error": result.error}), 400
+    return Response(stream_with_context(result.value), status=200, mimetype='application/x-ndjson')
 
+
+@app.route('/pool_stats', methods=['GET'])
+def pool_stats():
+    result = api.get_pool_stats()
+    if result.is_error():
+        return jsonify({"error": result.error}), 500
+    return jsonify(result.value), 200
+
+
+@app.route('/new_game', methods=['POST'])
+def new_game():
+    data = request.get_json(force=True)
+    error = validate_new_game(data)
     if error:
         return jsonify({"error": error}), 400
 
-    configuration_result = api.configure_new_game(str(difficulty), str(player_name))
+    configuration_result = api.configure_new_game(str(data['difficulty']), str(data['player_name']))
     if configuration_result.is_error():
         return jsonify({"error": configuration_result.error}), 400
 
@@ -50,35 +153,56 @@ def challenge(session_id):
 @app.route('/update_state', methods=['POST'])
 def update_state():
     data = request.get_json(force=True)
-    session_id = data.get('session_id')
-    current_airport_id = data.get('current_airport_id')
-    passed_challenge = data.get('passed_challenge')
-
-    error: str = ""
-
-    if session_id is None:
-        error += "session_id required. \n"
-    if current_airport_id is None:
-        error += "current_airport_id required. \n"
-    if passed_challenge is None:
-        error += "passed_challenge required. \n"
-
-    if not isinstance(passed_challenge, bool):
-        error += "passed_challenge must be a boolean. \n"
-    if not isinstance(current_airport_id, int):
-        error += "current_airport_id must be an integer. \n"
-    if not isinstance(session_id, int):
-        error += "session_id must be an integer. \n"
+    error = validate_update_state(data)
+    if error:
+        return jsonify({"error": error}), 400
+
+    result = api.update_game_state(data['session_id'], data['current_airport_id'])
+    if result.is_error():
+        return jsonify({"error": result.error}), 404
+    return jsonify(result.value), 200
+
 
+@app.route('/answer', methods=['POST'])
+def answer():
+    data = request.get_json(force=True)
+    error = validate_answer(data)
     if error:
         return jsonify({"error": error}), 400
 
-    result = api.update_game_state(session_id, current_airport_id, passed_challenge)
+    result = api.answer_challenge(data['session_id'], data['token'], str(data['answer']))
     if result.is_error():
         return jsonify({"error": result.error}), 404
     return jsonify(result.value), 200
 
 
+@app.route('/move', methods=['POST'])
+def move():
+    data = request.get_json(force=True)
+    error = validate_update_state(data)
+    if error:
+        return jsonify({"error": error}), 400
+
+    result = api.make_move(data['session_id'], data['current_airport_id'])
+    if result.is_error():
+        return jsonify({"error": result.error}), 404
+    return jsonify(result.value), 200
+
+
+@app.route('/game_states', methods=['POST'])
+def game_states():
+    data = request.get_json(force=True)
+    error = validate_game_states(data)
+    if error:
+        return jsonify({"error": error}), 400
+
+    result = api.get_game_states(data.get('session_ids'), data.get('status'), data.get('difficulty'),
+                                 data.get('cursor', 0), data.get('limit'))
+    if result.is_error():
+        return jsonify({"error": result.error}), 400
+    return jsonify(result.value), 200
+
+
 @app.route('/game_state/<int:session_id>', methods=['GET'])
 def game_state(session_id):
     result = api.get_game_state(session_id)
@@ -87,6 +211,19 @@ def game_state(session_id):
     return jsonify(result.value), 200
 
 
+@app.route('/leaderboard', methods=['GET'])
+def leaderboard():
+    limit = request.args.get('limit', type=int)
+    if limit is not None and limit < 1:
+        return jsonify({"error": "limit must be a positive integer. \n"}), 400
+
+    result = api.get_leaderboard_standings(request.args.get('board', 'global'), limit,
+                                          request.args.get('player_id', type=int))
+    if result.is_error():
+        return jsonify({"error": result.error}), 400
+    return jsonify(result.value), 200
+
+
 @app.route('/update_status/<int:session_id>', methods=['POST'])
 def update_status(session_id):
     data = request.get_json(force=True)
@@ -102,4 +239,4 @@ def update_status(session_id):
 
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    app.run(host='0.0.0.0', port=Config.PORT, debug=Config.FLASK_DEBUG)
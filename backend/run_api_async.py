@@ -0,0 +1,236 @@
+import asyncio
+import logging
+import time
+from quart import Quart, Response, g, request, jsonify
+from quart_cors import cors
+from config import Config
+from serialization import FastJSONProvider
+from validation import validate_answer, validate_coordinates, validate_game_states, validate_new_game, validate_update_state
+from async_db import close_async_pool
+import api
+import async_api
+import instrumentation
+
+# Same routes and JSON contracts as run_api.py, served from an event loop (hypercorn run_api_async:app).
+# Game routes await the database. The reference-data routes answer from memory: serving
+# only starts once preload has succeeded, so they never fall back to a blocking load.
+
+logging.basicConfig(level=Config.LOG_LEVEL, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+
+app = cors(Quart(__name__))
+app.json = FastJSONProvider(app)
+
+
+@app.before_serving
+async def preload():
+    preload_result = await asyncio.to_thread(api.preload_reference_data)
+    if preload_result.is_error():
+        raise RuntimeError(f"Reference data not preloaded: {preload_result.error}")
+
+
+@app.after_serving
+async def shutdown():
+    await close_async_pool()
+
+
+@app.before_request
+async def start_instrumentation():
+    g.request_started = time.perf_counter()
+    g.instrumentation_token = instrumentation.start_request(request.url_rule.rule if request.url_rule else 'unmatched')
+
+
+@app.after_request
+async def finish_instrumentation(response):
+    if 'instrumentation_token' in g:
+        total_time = time.perf_counter() - g.request_started
+        stats = instrumentation.finish_request(g.pop('instrumentation_token'), total_time)
+        if stats is not None:
+            response.headers['Server-Timing'] = stats.server_timing(total_time)
+    return response
+
+
+@app.route('/metrics', methods=['GET'])
+async def metrics():
+    return Response(instrumentation.render_metrics(), status=200, mimetype='text/plain; version=0.0.4')
+
+
+@app.route('/airports', methods=['GET'])
+async def airports():
+    fields = request.args.get('fields')
+    fields = [field.strip() for field in fields.split(',') if field.strip()] if fields else None
+
+    unknown = set(fields or ()) - set(api.AIRPORT_FIELDS)
+    if unknown:
+        return jsonify({"error": f"Unknown airport fields: {', '.join(sorted(unknown))}"}), 400
+
+    result = api.get_airports_payload(fields)
+    if result.is_error():
+        return jsonify({"error": result.error}), 500
+    payload = result.value
+
+    if request.if_none_match.contains_weak(payload.etag):
+        response = Response(b'', status=304)
+    elif request.accept_encodings['gzip']:
+        response = Response(payload.gzipped, status=200, mimetype='application/json')
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = Response(payload.body, status=200, mimetype='application/json')
+
+    response.set_etag(payload.etag, weak=True)
+    response.headers['Cache-Control'] = f"public, max-age={Config.AIRPORTS_CACHE_MAX_AGE}"
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+@app.route('/airports/nearest', methods=['GET'])
+async def nearest_airports():
+    latitude, longitude, error = validate_coordinates(request.args)
+    k = request.args.get('k', default=5, type=int)
+    if k is None or k < 1:
+        error += "k must be a positive integer. \n"
+
+    if error:
+        return jsonify({"error": error}), 400
+
+    result = api.find_nearest_airports(latitude, longitude, k)
+    if result.is_error():
+        return jsonify({"error": result.error}), 500
+    return jsonify(result.value), 200
+
+
+@app.route('/airports/within', methods=['GET'])
+async def airports_within():
+    latitude, longitude, error = validate_coordinates(request.args)
+    radius_km = request.args.get('radius_km', type=float)
+    if radius_km is None or radius_km < 0:
+        error += "radius_km must be a non-negative number. \n"
+
+    if error:
+        return jsonify({"error": error}), 400
+
+    result = api.find_airports_within(latitude, longitude, radius_km)
+    if result.is_error():
+        return jsonify({"error": result.error}), 500
+    return jsonify(result.value), 200
+
+
+@app.route('/pool_stats', methods=['GET'])
+async def pool_stats():
+    result = api.get_pool_stats()
+    if result.is_error():
+        return jsonify({"error": result.error}), 500
+    return jsonify(result.value), 200
+
+
+@app.route('/new_game', methods=['POST'])
+async def new_game():
+    data = await request.get_json(force=True)
+    error = validate_new_game(data)
+    if error:
+        return jsonify({"error": error}), 400
+
+    configuration_result = await async_api.configure_new_game(str(data['difficulty']), str(data['player_name']))
+    if configuration_result.is_error():
+        return jsonify({"error": configuration_result.error}), 400
+
+    return jsonify({"session_id": configuration_result.value}), 201
+
+
+@app.route('/challenge/<int:session_id>', methods=['GET'])
+async def challenge(session_id):
+    result = await async_api.get_challenge(session_id)
+    if result.is_error():
+        return jsonify({"error": result.error}), 404
+    return jsonify(result.value), 200
+
+
+@app.route('/update_state', methods=['POST'])
+async def update_state():
+    data = await request.get_json(force=True)
+    error = validate_update_state(data)
+    if error:
+        return jsonify({"error": error}), 400
+
+    result = await async_api.update_game_state(data['session_id'], data['current_airport_id'])
+    if result.is_error():
+        return jsonify({"error": result.error}), 404
+    return jsonify(result.value), 200
+
+
+@app.route('/answer', methods=['POST'])
+async def answer():
+    data = await request.get_json(force=True)
+    error = validate_answer(data)
+    if error:
+        return jsonify({"error": error}), 400
+
+    result = await async_api.answer_challenge(data['session_id'], data['token'], str(data['answer']))
+    if result.is_error():
+        return jsonify({"error": result.error}), 404
+    return jsonify(result.value), 200
+
+
+@app.route('/move', methods=['POST'])
+async def move():
+    data = await request.get_json(force=True)
+    error = validate_update_state(data)
+    if error:
+        return jsonify({"error": error}), 400
+
+    result = await async_api.make_move(data['session_id'], data['current_airport_id'])
+    if result.is_error():
+        return jsonify({"error": result.error}), 404
+    return jsonify(result.value), 200
+
+
+@app.route('/game_states', methods=['POST'])
+async def game_states():
+    data = await request.get_json(force=True)
+    error = validate_game_states(data)
+    if error:
+        return jsonify({"error": error}), 400
+
+    result = await async_api.get_game_states(data.get('session_ids'), data.get('status'), data.get('difficulty'),
+                                             data.get('cursor', 0), data.get('limit'))
+    if result.is_error():
+        return jsonify({"error": result.error}), 400
+    return jsonify(result.value), 200
+
+
+@app.route('/game_state/<int:session_id>', methods=['GET'])
+async def game_state(session_id):
+    result = await async_api.get_game_state(session_id)
+    if result.is_error():
+        return jsonify({"error": result.error}), 404
+    return jsonify(result.value), 200
+
+
+@app.route('/leaderboard', methods=['GET'])
+async def leaderboard():
+    limit = request.args.get('limit', type=int)
+    if limit is not None and limit < 1:
+        return jsonify({"error": "limit must be a positive integer. \n"}), 400
+
+    result = api.get_leaderboard_standings(request.args.get('board', 'global'), limit,
+                                          request.args.get('player_id', type=int))
+    if result.is_error():
+        return jsonify({"error": result.error}), 400
+    return jsonify(result.value), 200
+
+
+@app.route('/update_status/<int:session_id>', methods=['POST'])
+async def update_status(session_id):
+    data = await request.get_json(force=True)
+    new_status = data.get('new_status')
+
+    if not new_status:
+        return jsonify({"error": "new_status required"}), 400
+
+    result = await async_api.update_session_status(session_id, new_status)
+    if result.is_error():
+        return jsonify({"error": result.error}), 404
+    return jsonify("successfully updated status"), 200
+
+
+if __name__ == '__main__':
+    app.run(host='0.0.0.0', port=Config.PORT, debug=Config.FLASK_DEBUG)
@@ -0,0 +1,89 @@
+import random
+import threading
+from typing import Dict, Hashable, Iterable, Optional, Tuple
+from catalog import get_catalog
+from config import Config
+
+HUB_AIRPORTS = 'hub_airports'
+
+
+class RandomSampler:
+    """Uniform O(1) picks from preloaded id arrays. Ids are stored grouped (e.g. by
+    country) so excluding a group is one draw that skips its contiguous range."""
+
+    def __init__(self, seed: Optional[int] = None):
+        self._random = random.Random(seed)
+        self._pools: Dict[Hashable, Tuple[int, ...]] = {}
+        self._group_ranges: Dict[Hashable, Dict[str, Tuple[int, int]]] = {}
+
+    def seed(self, seed: Optional[int]):
+        self._random.seed(seed)
+
+    def load(self, pool: Hashable, entries: Iterable[Tuple[int, str]]):
+        ordered = sorted(entries, key=lambda entry: (entry[1], entry[0]))
+        ranges: Dict[str, Tuple[int, int]] = {}
+        for index, (_, group) in enumerate(ordered):
+            start, _ = ranges.get(group, (index, index))
+            ranges[group] = (start, index + 1)
+        self._pools[pool] = tuple(entry_id for entry_id, _ in ordered)
+        self._group_ranges[pool] = ranges
+
+    def size(self, pool: Hashable) -> int:
+        return len(self._pools.get(pool, ()))
+
+    def pick(self, pool: Hashable) -> Optional[int]:
+        ids = self._pools.get(pool)
+        if not ids:
+            return None
+        return ids[self._random.randrange(len(ids))]
+
+    def pick_excluding(self, pool: Hashable, group: str) -> Optional[int]:
+        ids = self._pools.get(pool)
+        if not ids:
+            return None
+        start, end = self._group_ranges[pool].get(group, (0, 0))
+        remaining = len(ids) - (end - start)
+        if remaining <= 0:
+            return None
+        index = self._random.randrange(remaining)
+        if index >= start:
+            index += end - start
+        return ids[index]
+
+    def new_seed(self) -> int:
+        return self._random.getrandbits(31)
+
+
+_sampler: RandomSampler | None = None
+_sampler_lock = threading.Lock()
+
+
+def _read_sampler(db) -> RandomSampler:
+    sampler = RandomSampler(Config.RANDOM_SEED)
+    catalog = get_catalog(db)
+    sampler.load(HUB_AIRPORTS, ((a.id, a.country_code) for a in catalog.hub_airports))
+    return sampler
+
+
+def get_sampler(db) -> RandomSampler:
+    global _sampler
+    if _sampler is None:
+        with _sampler_lock:
+            if _sampler is None:
+                _sampler = _read_sampler(db)
+    return _sampler
+
+
+def reload_sampler(db) -> RandomSampler:
+    global _sampler
+    sampler = _read_sampler(db)
+    with _sampler_lock:
+        _sampler = sampler
+    return sampler
+
+
+def reseed_sampler():
+    """Fresh OS entropy for the loaded sampler. A forked worker inherits the master's
+    generator state, so without this every worker draws the same games in lockstep."""
+    if _sampler is not None:
+        _sampler.seed(None)
@@ -0,0 +1,77 @@
+import dataclasses
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Callable, Dict
+from flask.json.provider import JSONProvider
+from data import AirportDto, ChallengeDto, CountryDto, GameSaveDto, PlayerDto
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_encoders: Dict[type, Callable] = {}
+
+
+def compile_encoder(cls: type) -> Callable:
+    """Build ``lambda value: {'field': value.field, ...}`` for a dataclass once,
+    instead of reflecting over its fields on every response."""
+    fields = [field.name for field in dataclasses.fields(cls)]
+    source = "lambda value: {" + ", ".join(f"{name!r}: value.{name}" for name in fields) + "}"
+    return eval(compile(source, f"<{cls.__name__} encoder>", 'eval'), {})
+
+
+def register_encoder(cls: type, encoder: Callable | None = None):
+    _encoders[cls] = encoder or compile_encoder(cls)
+
+
+for _dto in (AirportDto, CountryDto, PlayerDto, GameSaveDto, ChallengeDto):
+    register_encoder(_dto)
+
+
+def default(value):
+    encoder = _encoders.get(type(value))
+    if encoder is not None:
+        return encoder(value)
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        register_encoder(type(value))
+        return _encoders[type(value)](value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    def dumps(value) -> bytes:
+        # OPT_PASSTHROUGH_DATACLASS routes DTOs through the compiled encoders above, so both
+        # paths emit the same fields.
+        return orjson.dumps(value, default=default,
+                            option=orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_NON_STR_KEYS)
+else:
+    _encoder = json.JSONEncoder(default=default, separators=(',', ':'))
+
+    def dumps(value) -> bytes:
+        return _encoder.encode(value).encode('utf-8')
+
+
+class FastJSONProvider(JSONProvider):
+    """``app.json`` for the Flask and Quart apps: jsonify goes through ``dumps``."""
+    mimetype = 'application/json'
+
+    def dumps(self, obj, **kwargs) -> str:
+        return dumps(obj).decode('utf-8')
+
+    def loads(self, s: str | bytes, **kwargs):
+        return orjson.loads(s) if orjson is not None else json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        if args and kwargs:
+            raise TypeError("jsonify() behavior undefined when passed both args and kwargs")
+        obj = args[0] if len(args) == 1 else (args or kwargs)
+        return self._app.response_class(dumps(obj) + b'\n', mimetype=self.mimetype)
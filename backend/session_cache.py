@@ -0,0 +1,173 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from data import Result, ResultNoValue
+
+logger = logging.getLogger(__name__)
+
+# (session id, version currently in the database, new version, changed columns)
+SessionWrite = Tuple[int, int, int, Dict]
+
+
+class CachedSession:
+    __slots__ = ('row', 'db_version', 'dirty', 'touched_at')
+
+    def __init__(self, row: Dict):
+        self.row = row
+        self.db_version: int = row.get('version', 0)
+        self.dirty: set[str] = set()
+        self.touched_at: float = time.monotonic()
+
+
+class SessionCache:
+    """LRU/TTL cache of ``game_session`` rows. Commits land here and a background
+    thread writes them in batches every ``flush_interval`` seconds. Dirty rows are
+    never evicted before being written."""
+
+    def __init__(self, capacity: int, ttl: float, flush_interval: float,
+                 writer: Callable[[List[SessionWrite]], Iterable[int]]):
+        self._capacity = capacity
+        self._ttl = ttl
+        self._flush_interval = flush_interval
+        self._writer = writer
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._entries: OrderedDict[int, CachedSession] = OrderedDict()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopped.clear()
+                self._thread = threading.Thread(target=self._run, name='session-cache-flush', daemon=True)
+                self._thread.start()
+
+    def close(self):
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=self._flush_interval + 5)
+        self.flush()
+
+    def get(self, session_id: int) -> Optional[Dict]:
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None:
+                return None
+            if not entry.dirty and time.monotonic() - entry.touched_at > self._ttl:
+                del self._entries[session_id]
+                return None
+            entry.touched_at = time.monotonic()
+            self._entries.move_to_end(session_id)
+            return dict(entry.row)
+
+    def put(self, row: Dict):
+        with self._lock:
+            entry = self._entries.get(row['id'])
+            if entry is not None and entry.dirty:
+                return
+            self._entries[row['id']] = CachedSession(dict(row))
+            self._entries.move_to_end(row['id'])
+            self._evict()
+
+    def apply(self, session_id: int, expected_version: int, values: Dict) -> ResultNoValue | None:
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None:
+                return None
+            if entry.row.get('version', 0) != expected_version:
+                return ResultNoValue.failure("Game session was modified by another request, reload and retry")
+            entry.row.update(values)
+            entry.row['version'] = expected_version + 1
+            entry.dirty.update(values)
+            entry.touched_at = time.monotonic()
+            self._entries.move_to_end(session_id)
+        return ResultNoValue.success()
+
+    def detach(self, session_id: int, expected_version: int) -> Result[Optional[CachedSession]]:
+        """Take a session out of the cache so its next write goes straight to the database,
+        along with the entry's unwritten changes. Hand the entry to ``restore`` if that
+        write is rolled back."""
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None:
+                return Result.success(None)
+            if entry.row.get('version', 0) != expected_version:
+                return Result.failure("Game session was modified by another request, reload and retry")
+            del self._entries[session_id]
+            return Result.success(entry)
+
+    def restore(self, entry: CachedSession):
+        with self._lock:
+            current = self._entries.get(entry.row['id'])
+            if current is None or not current.dirty:
+                self._entries[entry.row['id']] = entry
+                self._entries.move_to_end(entry.row['id'])
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                writes: List[SessionWrite] = []
+                for session_id, entry in self._entries.items():
+                    if entry.dirty:
+                        changes = {column: entry.row[column] for column in sorted(entry.dirty)}
+                        writes.append((session_id, entry.db_version, entry.row['version'], changes))
+                        entry.dirty.clear()
+            if not writes:
+                with self._lock:
+                    self._expire()
+                return
+
+            try:
+                conflicts = set(self._writer(writes))
+            except Exception as ex:
+                logger.warning("Session cache flush failed, will retry: %s", ex)
+                with self._lock:
+                    for session_id, _, _, changes in writes:
+                        entry = self._entries.get(session_id)
+                        if entry is not None:
+                            entry.dirty.update(changes)
+                return
+
+            with self._lock:
+                for session_id, _, new_version, _ in writes:
+                    entry = self._entries.get(session_id)
+                    if entry is None:
+                        continue
+                    if session_id in conflicts:
+                        # Changed in the database behind this process: drop our copy and reload next time.
+                        logger.warning("Session %s changed outside the cache, discarding cached writes", session_id)
+                        del self._entries[session_id]
+                    else:
+                        entry.db_version = new_version
+                self._expire()
+                self._evict()
+
+    def _evict(self):
+        if len(self._entries) <= self._capacity:
+            return
+        for session_id in list(self._entries):
+            if len(self._entries) <= self._capacity:
+                break
+            if not self._entries[session_id].dirty:
+                del self._entries[session_id]
+        if len(self._entries) > self._capacity:
+            self._wake.set()
+
+    def _expire(self):
+        now = time.monotonic()
+        expired = [session_id for session_id, entry in self._entries.items()
+                   if not entry.dirty and now - entry.touched_at > self._ttl]
+        for session_id in expired:
+            del self._entries[session_id]
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wake.wait(self._flush_interval)
+            self._wake.clear()
+            self.flush()
@@ -0,0 +1,128 @@
+import heapq
+import threading
+from typing import Iterable, List, Tuple
+from catalog import Catalog, get_catalog
+from geo import chord_to_km, km_to_chord, to_unit_vector
+
+LEAF_SIZE = 16
+
+
+class SpatialIndex:
+    """k-d tree over points on the unit sphere.
+
+    Straight-line (chord) distance between unit vectors grows monotonically with
+    great-circle distance, so nearest-neighbour and radius searches can prune on
+    plain Euclidean bounds and convert to kilometres only for the results."""
+
+    def __init__(self, points: Iterable[Tuple[int, float, float]]):
+        self._ids: List[int] = []
+        self._xyz: List[Tuple[float, float, float]] = []
+        for point_id, lat, lon in points:
+            self._ids.append(point_id)
+            self._xyz.append(to_unit_vector(float(lat), float(lon)))
+
+        # Each node is (start, end, axis, split, left, right); leaves have axis -1.
+        self._order: List[int] = list(range(len(self._ids)))
+        self._nodes: List[Tuple[int, int, int, float, int, int]] = []
+        self._root = self._build(0, len(self._order)) if self._order else -1
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _build(self, start: int, end: int) -> int:
+        node = len(self._nodes)
+        self._nodes.append((start, end, -1, 0.0, -1, -1))
+        if end - start <= LEAF_SIZE:
+            return node
+
+        section = self._order[start:end]
+        spreads = []
+        for axis in range(3):
+            values = [self._xyz[i][axis] for i in section]
+            spreads.append(max(values) - min(values))
+        axis = spreads.index(max(spreads))
+        section.sort(key=lambda i: self._xyz[i][axis])
+        self._order[start:end] = section
+
+        middle = (start + end) // 2
+        split = self._xyz[self._order[middle]][axis]
+        left = self._build(start, middle)
+        right = self._build(middle, end)
+        self._nodes[node] = (start, end, axis, split, left, right)
+        return node
+
+    def nearest(self, lat: float, lon: float, k: int) -> List[Tuple[int, float]]:
+        if self._root < 0 or k <= 0:
+            return []
+        query = to_unit_vector(lat, lon)
+        heap: List[Tuple[float, int]] = []
+        self._search_nearest(self._root, query, k, heap)
+        return [(self._ids[i], chord_to_km(d2 ** 0.5)) for d2, i in sorted((-d2, i) for d2, i in heap)]
+
+    def _search_nearest(self, node: int, query, k: int, heap: list):
+        start, end, axis, split, left, right = self._nodes[node]
+        if axis < 0:
+            qx, qy, qz = query
+            for i in self._order[start:end]:
+                x, y, z = self._xyz[i]
+                d2 = (x - qx) ** 2 + (y - qy) ** 2 + (z - qz) ** 2
+                if len(heap) < k:
+                    heapq.heappush(heap, (-d2, i))
+                elif d2 < -heap[0][0]:
+                    heapq.heapreplace(heap, (-d2, i))
+            return
+
+        diff = query[axis] - split
+        near, far = (left, right) if diff < 0 else (right, left)
+        self._search_nearest(near, query, k, heap)
+        if len(heap) < k or diff * diff < -heap[0][0]:
+            self._search_nearest(far, query, k, heap)
+
+    def within(self, lat: float, lon: float, radius_km: float) -> List[Tuple[int, float]]:
+        if self._root < 0 or radius_km < 0:
+            return []
+        query = to_unit_vector(lat, lon)
+        limit = km_to_chord(radius_km) ** 2
+        found: List[Tuple[float, int]] = []
+        self._search_within(self._root, query, limit, found)
+        found.sort()
+        return [(self._ids[i], chord_to_km(d2 ** 0.5)) for d2, i in found]
+
+    def _search_within(self, node: int, query, limit: float, found: list):
+        start, end, axis, split, left, right = self._nodes[node]
+        if axis < 0:
+            qx, qy, qz = query
+            for i in self._order[start:end]:
+                x, y, z = self._xyz[i]
+                d2 = (x - qx) ** 2 + (y - qy) ** 2 + (z - qz) ** 2
+                if d2 <= limit:
+                    found.append((d2, i))
+            return
+
+        diff = query[axis] - split
+        near, far = (left, right) if diff < 0 else (right, left)
+        self._search_within(near, query, limit, found)
+        if diff * diff <= limit:
+            self._search_within(far, query, limit, found)
+
+
+class AirportIndex(SpatialIndex):
+    def __init__(self, catalog: Catalog):
+        self.catalog = catalog
+        super().__init__((a.id, a.latitude, a.longitude) for a in catalog.airports)
+
+
+_index: AirportIndex | None = None
+_index_lock = threading.Lock()
+
+
+def get_airport_index(db) -> AirportIndex:
+    global _index
+    catalog = get_catalog(db)
+    index = _index
+    if index is None or index.catalog is not catalog:
+        with _index_lock:
+            if _index is None or _index.catalog is not catalog:
+                _index = AirportIndex(catalog)
+            index = _index
+    return index
@@ -0,0 +1,69 @@
+import threading
+from collections import OrderedDict
+from typing import Dict
+
+_totals = {'hits': 0, 'misses': 0, 'evictions': 0}
+_totals_lock = threading.Lock()
+
+
+def _count(counter: str):
+    with _totals_lock:
+        _totals[counter] += 1
+
+
+def statement_cache_stats() -> Dict[str, int]:
+    """Hit/miss/eviction counts summed over every connection in this process."""
+    with _totals_lock:
+        return dict(_totals)
+
+
+class StatementCache:
+    """Per-connection LRU of server-side prepared cursors keyed by SQL text. A prepared
+    cursor re-executes its statement by id with binary-protocol parameters and results,
+    so a cache hit skips sending and parsing the SQL again."""
+
+    def __init__(self, connection, capacity: int):
+        self._connection = connection
+        self._capacity = capacity
+        self._cursors: OrderedDict[str, object] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._cursors)
+
+    def cursor(self, query: str):
+        cursor = self._cursors.get(query)
+        if cursor is not None:
+            self._cursors.move_to_end(query)
+            self.hits += 1
+            _count('hits')
+            return cursor
+
+        self.misses += 1
+        _count('misses')
+        cursor = self._connection.cursor(prepared=True, dictionary=True)
+        self._cursors[query] = cursor
+        if len(self._cursors) > self._capacity:
+            _, evicted = self._cursors.popitem(last=False)
+            self.evictions += 1
+            _count('evictions')
+            self._close(evicted)
+        return cursor
+
+    def discard(self, query: str):
+        cursor = self._cursors.pop(query, None)
+        if cursor is not None:
+            self._close(cursor)
+
+    def close(self):
+        while self._cursors:
+            self._close(self._cursors.popitem()[1])
+
+    @staticmethod
+    def _close(cursor):
+        try:
+            cursor.close()
+        except Exception:
+            pass
@@ -0,0 +1,298 @@
+import os
+import re
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, Tuple
+from config import Config
+
+
+class StorageBackend(ABC):
+    """Opens raw connections for the pool. Connections expose the subset of the
+    mysql-connector API that ``DatabaseConnection`` uses; ``errors`` are the driver
+    exceptions it should treat as query failures."""
+    name: str = ""
+    errors: Tuple[type, ...] = ()
+    supports_prepared: bool = False
+
+    @abstractmethod
+    def connect(self):
+        ...
+
+
+class MySQLBackend(StorageBackend):
+    name = 'mysql'
+    supports_prepared = True
+
+    def __init__(self):
+        import mysql.connector
+        self._connector = mysql.connector
+        self.errors = (mysql.connector.Error,)
+
+    def connect(self):
+        return self._connector.connect(**Config.get_db_config())
+
+
+# ---- SQLite ----------------------------------------------------------------
+
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(' '))
+sqlite3.register_converter('TIMESTAMP', lambda value: datetime.fromisoformat(value.decode()))
+
+_PLACEHOLDER = re.compile(r"%(s|%)")
+
+
+@lru_cache(maxsize=512)
+def to_qmark(query: str) -> str:
+    """Rewrite mysql-connector ``%s`` placeholders as SQLite ``?`` (and ``%%`` as ``%``)."""
+    return _PLACEHOLDER.sub(lambda m: '?' if m.group(1) == 's' else '%', query)
+
+
+class SQLiteCursor:
+    def __init__(self, cursor: sqlite3.Cursor, dictionary: bool):
+        self._cursor = cursor
+        self._dictionary = dictionary
+
+    @property
+    def column_names(self) -> Tuple[str, ...]:
+        description = self._cursor.description
+        return tuple(column[0] for column in description) if description else ()
+
+    @property
+    def rowcount(self) -> int:
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    def execute(self, query: str, params: tuple = ()):
+        self._cursor.execute(to_qmark(query), params or ())
+
+    def _rows(self, rows: list) -> list:
+        if not self._dictionary:
+            return rows
+        columns = self.column_names
+        return [dict(zip(columns, row)) for row in rows]
+
+    def fetchall(self) -> list:
+        return self._rows(self._cursor.fetchall())
+
+    def fetchmany(self, size: int) -> list:
+        return self._rows(self._cursor.fetchmany(size))
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    def __init__(self, path: str, timeout: float):
+        self._raw = sqlite3.connect(path, timeout=timeout, isolation_level=None,
+                                    check_same_thread=False, detect_types=sqlite3.PARSE_DECLTYPES)
+        self._raw.execute("PRAGMA foreign_keys = ON")
+        self._raw.execute("PRAGMA synchronous = NORMAL")
+
+    def cursor(self, dictionary: bool = False, buffered: bool | None = None) -> SQLiteCursor:
+        return SQLiteCursor(self._raw.cursor(), dictionary)
+
+    def start_transaction(self):
+        # Take the write lock up front: a deferred BEGIN that reads and then writes fails
+        # with "database is locked" instead of waiting out the busy timeout.
+        self._raw.execute("BEGIN IMMEDIATE")
+
+    def commit(self):
+        if self._raw.in_transaction:
+            self._raw.execute("COMMIT")
+
+    def rollback(self):
+        if self._raw.in_transaction:
+            self._raw.execute("ROLLBACK")
+
+    def is_connected(self) -> bool:
+        try:
+            self._raw.execute("SELECT 1")
+            return True
+        except sqlite3.Error:
+            return False
+
+    def close(self):
+        self._raw.close()
+
+
+class SQLiteBackend(StorageBackend):
+    """Embedded database file in WAL mode, created from ``db.sql`` on first use."""
+    name = 'sqlite'
+    errors = (sqlite3.Error,)
+
+    def __init__(self, path: str, schema_path: str, timeout: float):
+        self.path = path
+        self.schema_path = schema_path
+        self.timeout = timeout
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def connect(self) -> SQLiteConnection:
+        if not self._initialized:
+            with self._init_lock:
+                if not self._initialized:
+                    self._ensure_database()
+                    self._initialized = True
+        return SQLiteConnection(self.path, self.timeout)
+
+    def _ensure_database(self):
+        if not os.path.exists(self.path):
+            # Build next to the target and rename, so concurrent workers never see a half-loaded file.
+            staging = f"{self.path}.{os.getpid()}.tmp"
+            with open(self.schema_path, encoding='utf-8') as schema:
+                script = mysql_dump_to_sqlite(schema.read())
+            raw = sqlite3.connect(staging, isolation_level=None)
+            try:
+                raw.executescript(f"BEGIN;\n{script}\nCOMMIT;")
+            finally:
+                raw.close()
+            os.replace(staging, self.path)
+
+        raw = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+        try:
+            raw.execute("PRAGMA journal_mode = WAL")
+        finally:
+            raw.close()
+
+
+# ---- db.sql translation ----------------------------------------------------
+
+_MYSQL_ESCAPES = {'n': '\n', 'r': '\r', 't': '\t', '0': '\0', 'Z': '\x1a', 'b': '\b'}
+
+
+def _split_statements(dump: str) -> List[str]:
+    """Split a MySQL dump into statements, dropping comments and rewriting backtick
+    identifiers and backslash-escaped string literals into SQLite syntax."""
+    statements = []
+    current: List[str] = []
+    i, n = 0, len(dump)
+    while i < n:
+        char = dump[i]
+        if char == "'":
+            value = []
+            i += 1
+            while i < n:
+                char = dump[i]
+                if char == '\\' and i + 1 < n:
+                    value.append(_MYSQL_ESCAPES.get(dump[i + 1], dump[i + 1]))
+                    i += 2
+                elif char == "'" and dump[i + 1:i + 2] == "'":
+                    value.append("'")
+                    i += 2
+                elif char == "'":
+                    i += 1
+                    break
+                else:
+                    value.append(char)
+                    i += 1
+            current.append("'" + ''.join(value).replace("'", "''") + "'")
+        elif char == '`':
+            end = dump.index('`', i + 1)
+            current.append('"' + dump[i + 1:end] + '"')
+            i = end + 1
+        elif dump.startswith('--', i) and (i + 2 >= n or dump[i + 2] in ' \t\r\n'):
+            end = dump.find('\n', i)
+            i = n if end < 0 else end
+        elif dump.startswith('/*', i):
+            end = dump.find('*/', i + 2)
+            i = n if end < 0 else end + 2
+        elif char == ';':
+            statements.append(''.join(current).strip())
+            current = []
+            i += 1
+        else:
+            current.append(char)
+            i += 1
+    statements.append(''.join(current).strip())
+    return [statement for statement in statements if statement]
+
+
+_COLUMN = re.compile(r'^\s*"(?P<name>\w+)"\s+(?P<type>\w+)(?:\((?P<args>[^)]*)\))?(?P<rest>.*?),?\s*$')
+_TYPES = {'int': 'INTEGER', 'tinyint': 'INTEGER', 'smallint': 'INTEGER', 'bigint': 'INTEGER',
+          'decimal': 'REAL', 'float': 'REAL', 'double': 'REAL', 'varbinary': 'BLOB', 'blob': 'BLOB',
+          'timestamp': 'TIMESTAMP', 'datetime': 'TIMESTAMP'}
+
+
+def _translate_column(line: str) -> Tuple[str, str]:
+    match = _COLUMN.match(line)
+    if match is None:
+        raise ValueError(f"Unsupported column definition in db.sql: {line.strip()}")
+    name, mysql_type, args, rest = match.group('name', 'type', 'args', 'rest')
+    sql_type = _TYPES.get(mysql_type.lower(), 'TEXT')
+
+    rest = re.sub(r"CHARACTER SET \w+|COLLATE \w+|ON UPDATE current_timestamp\(\)", '', rest, flags=re.IGNORECASE)
+    rest = re.sub(r"CHECK \(json_valid\([^)]*\)\)", '', rest, flags=re.IGNORECASE)
+    rest = re.sub(r"current_timestamp\(\)", 'CURRENT_TIMESTAMP', rest, flags=re.IGNORECASE)
+    rest = ' '.join(rest.split())
+    if mysql_type.lower() == 'enum':
+        rest += f' CHECK ("{name}" IN ({args}))'
+    return name, f'"{name}" {sql_type} {rest}'.rstrip()
+
+
+def mysql_dump_to_sqlite(dump: str) -> str:
+    tables: Dict[str, Dict] = {}
+    inserts: List[str] = []
+    indexes: List[str] = []
+
+    for statement in _split_statements(dump):
+        keyword = statement.split(None, 1)[0].upper()
+        if keyword == 'CREATE':
+            name = re.match(r'CREATE TABLE "(\w+)"', statement).group(1)
+            body = statement[statement.index('(') + 1:statement.rindex(')')]
+            columns = dict(_translate_column(line) for line in body.splitlines() if line.strip())
+            tables[name] = {'columns': columns, 'primary_key': None, 'autoincrement': False, 'foreign_keys': []}
+        elif keyword == 'INSERT':
+            inserts.append(statement)
+        elif keyword == 'ALTER':
+            name = re.match(r'ALTER TABLE "(\w+)"', statement).group(1)
+            table = tables[name]
+            for clause in statement.split('\n')[1:]:
+                clause = clause.strip().rstrip(',')
+                if match := re.match(r'ADD PRIMARY KEY \(([^)]*)\)', clause):
+                    table['primary_key'] = match.group(1)
+                elif match := re.match(r'ADD (UNIQUE )?KEY "(\w+)" \(([^)]*)\)', clause):
+                    unique, index, columns = match.groups()
+                    indexes.append(f'CREATE {unique or ""}INDEX "{name}_{index}" ON "{name}" ({columns})')
+                elif match := re.match(r'ADD CONSTRAINT "\w+" (FOREIGN KEY .*)', clause):
+                    table['foreign_keys'].append(match.group(1))
+                elif 'AUTO_INCREMENT' in clause and clause.startswith('MODIFY'):
+                    table['autoincrement'] = True
+
+    script = []
+    for name, table in tables.items():
+        definitions = dict(table['columns'])
+        key = table['primary_key']
+        constraints = []
+        single_key = key.strip('"') if key and ',' not in key else None
+        if single_key and table['autoincrement']:
+            definitions[single_key] = f'"{single_key}" INTEGER PRIMARY KEY AUTOINCREMENT'
+        elif key:
+            constraints.append(f'PRIMARY KEY ({key})')
+        constraints += table['foreign_keys']
+        script.append(f'CREATE TABLE "{name}" (\n  ' + ',\n  '.join([*definitions.values(), *constraints]) + '\n);')
+    script += [f'{statement};' for statement in inserts]
+    script += [f'{statement};' for statement in indexes]
+    return '\n'.join(script)
+
+
+_storage: StorageBackend | None = None
+_storage_lock = threading.Lock()
+
+
+def get_storage() -> StorageBackend:
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                if Config.DB_BACKEND == 'sqlite':
+                    _storage = SQLiteBackend(Config.SQLITE_PATH, Config.SQLITE_SCHEMA_PATH, Config.DB_POOL_TIMEOUT)
+                elif Config.DB_BACKEND == 'mysql':
+                    _storage = MySQLBackend()
+                else:
+                    raise ValueError(f"Unknown DB_BACKEND {Config.DB_BACKEND!r}, choose 'mysql' or 'sqlite'")
+    return _storage
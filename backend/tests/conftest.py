@@ -0,0 +1,28 @@
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import models
+import storage
+from config import Config
+
+
+@pytest.fixture(scope='session')
+def app(tmp_path_factory):
+    """The Flask app on a throwaway SQLite database built from db.sql."""
+    Config.DB_BACKEND = 'sqlite'
+    Config.SQLITE_PATH = str(tmp_path_factory.mktemp('db') / 'bossflight.sqlite3')
+    Config.SESSION_CACHE_ENABLED = False
+    storage._storage = None
+    models.reset_pool()
+
+    import run_api
+    yield run_api.app
+    models.reset_pool()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
@@ -0,0 +1,15 @@
+import pytest
+from answers import normalize
+
+
+@pytest.mark.parametrize('given, expected', [
+    ('Zürich', 'zurich'),
+    ('12.0', '12'),
+    ('twelve', '12'),
+    ('1,000', '1000'),
+    ('2.50', '2.5'),
+    ('1e100', '1e100'),
+    ('1' * 40, '1' * 40),
+])
+def test_normalize(given, expected):
+    assert normalize(given) == expected
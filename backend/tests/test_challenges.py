@@ -0,0 +1,29 @@
+import api
+from answers import read_token
+from config import Config, Difficulty
+from models import DatabaseConnection
+from question_bank import get_question_bank
+
+
+def correct_answer(token: str) -> str:
+    _, _, entry = read_token(token)
+    return get_question_bank(DatabaseConnection()).answers.display(entry)
+
+
+def test_answering_a_later_challenge_charges_the_skipped_ones(client):
+    session_id = api.configure_new_game('medium', 'skipper').value
+    battery = client.get(f'/game_state/{session_id}').get_json()['battery_level']
+    skipped = client.get(f'/challenge/{session_id}').get_json()['token']
+    answered = client.get(f'/challenge/{session_id}').get_json()['token']
+
+    response = client.post('/answer', json={'session_id': session_id, 'token': answered,
+                                            'answer': correct_answer(answered)})
+
+    assert response.status_code == 200
+    assert response.get_json()['correct']
+    expected = (battery - Config.get_battery_penalty(Difficulty.MEDIUM) + Config.get_battery_reward(Difficulty.MEDIUM))
+    assert response.get_json()['state']['battery_level'] == min(100, expected)
+
+    response = client.post('/answer', json={'session_id': session_id, 'token': skipped,
+                                            'answer': correct_answer(skipped)})
+    assert response.status_code == 404
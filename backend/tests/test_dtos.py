@@ -0,0 +1,18 @@
+import pytest
+from data import AirportDto, CountryDto
+
+HELSINKI = (1, 'EFHK', 'HEL', 'Helsinki-Vantaa', 'Vantaa', 'FI', 60.3, 24.9, 179, 'EU')
+
+
+def test_from_rows_builds_one_dto_per_row():
+    airport, = AirportDto.from_rows([HELSINKI])
+    assert (airport.iata_code, airport.latitude, airport.continent) == ('HEL', 60.3, 'EU')
+
+
+@pytest.mark.parametrize('dto, row', [
+    (AirportDto, HELSINKI[:2] + ('',) + HELSINKI[3:]),
+    (CountryDto, ('FI', 'Finland', None)),
+])
+def test_from_rows_rejects_rows_missing_a_required_field(dto, row):
+    with pytest.raises(ValueError):
+        dto.from_rows([row])
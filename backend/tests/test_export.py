@@ -0,0 +1,17 @@
+import json
+import export
+from models import DatabaseConnection
+
+
+def test_closing_an_unstarted_export_releases_its_connection(app):
+    in_use = DatabaseConnection.pool_stats().in_use
+    for _ in range(3):
+        export.stream_export('player').value.close()
+    assert DatabaseConnection.pool_stats().in_use == in_use
+
+
+def test_reading_an_export_to_the_end_releases_its_connection(app):
+    in_use = DatabaseConnection.pool_stats().in_use
+    lines = list(export.stream_export('player').value)
+    assert all('name' in json.loads(line) for line in lines)
+    assert DatabaseConnection.pool_stats().in_use == in_use
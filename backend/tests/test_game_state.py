@@ -0,0 +1,37 @@
+import re
+import pytest
+import api
+from catalog import get_catalog
+from models import DatabaseConnection, GameSession
+
+
+def query_count(response) -> int:
+    return int(re.search(r'desc="(\d+) queries"', response.headers['Server-Timing']).group(1))
+
+
+def new_session_with_guesses(guessed: int) -> int:
+    created = api.configure_new_game('easy', f'query-count-{guessed}')
+    assert created.is_success(), created.error
+
+    db = DatabaseConnection()
+    assert db.connect().is_success()
+    try:
+        game_session = GameSession(db)
+        assert game_session.load_session(created.value)
+        for country in get_catalog(db).countries[:guessed]:
+            game_session.add_guessed_country(country)
+        assert game_session.commit().is_success()
+    finally:
+        db.disconnect()
+    return created.value
+
+
+@pytest.mark.parametrize('guessed', [0, 1, 50])
+def test_game_state_runs_one_query_however_many_countries_are_guessed(client, guessed):
+    session_id = new_session_with_guesses(guessed)
+
+    response = client.get(f'/game_state/{session_id}')
+
+    assert response.status_code == 200
+    assert len(response.get_json()['countries_guessed']) == guessed
+    assert query_count(response) == 1
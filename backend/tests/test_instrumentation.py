@@ -0,0 +1,32 @@
+import re
+from instrumentation import SERVER_TIMING_DESC_LENGTH, RequestStats, fingerprint
+
+
+def slowest_description(header: str) -> str:
+    return re.search(r'db-slowest;dur=[\d.]+;desc="((?:[^"\\]|\\.)*)"', header).group(1)
+
+
+def test_server_timing_names_the_slowest_statement():
+    stats = RequestStats('/game_state', 1, 0.002, 0.002, fingerprint("SELECT * FROM game_session WHERE id = 7"))
+
+    assert slowest_description(stats.server_timing(0.01)) == "SELECT * FROM game_session WHERE id = ?"
+
+
+def test_slowest_statement_is_escaped_and_truncated():
+    statement = 'SELECT "name" FROM player WHERE note = \\ ' + 'x' * 200
+    stats = RequestStats('/export', 1, 0.002, 0.002, statement)
+
+    description = slowest_description(stats.server_timing(0.01))
+    assert description.startswith('SELECT \\"name\\" FROM player WHERE note = \\\\ x')
+    assert description.endswith('...')
+    assert len(description.replace('\\', '')) <= SERVER_TIMING_DESC_LENGTH
+
+
+def test_no_description_without_queries():
+    assert 'desc' not in RequestStats('/metrics').server_timing(0.01).split(', ')[1]
+
+
+def test_response_header_carries_the_slowest_statement(client):
+    response = client.get('/game_state/1')
+
+    assert 'game_session' in slowest_description(response.headers['Server-Timing'])
@@ -0,0 +1,30 @@
+import pytest
+import api
+from catalog import get_catalog
+from models import DatabaseConnection
+
+
+@pytest.fixture
+def lost_session(app):
+    session_id = api.configure_new_game('medium', 'finished').value
+    assert api.update_session_status(session_id, 'lost').is_success()
+    return session_id
+
+
+@pytest.mark.parametrize('route', ['/move', '/update_state'])
+def test_a_finished_game_cannot_move(client, lost_session, route):
+    before = api.get_game_state(lost_session).value
+    airport = get_catalog(DatabaseConnection()).airports[0]
+
+    response = client.post(route, json={'session_id': lost_session, 'current_airport_id': airport.id})
+
+    assert response.status_code == 404
+    assert response.get_json()['error'] == "Game session is not active"
+    assert api.get_game_state(lost_session).value == before
+
+
+def test_a_finished_game_gets_no_challenge(client, lost_session):
+    response = client.get(f'/challenge/{lost_session}')
+
+    assert response.status_code == 404
+    assert response.get_json()['error'] == "Game session is not active"
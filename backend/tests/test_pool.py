@@ -0,0 +1,52 @@
+import threading
+from pool import ConnectionPool
+
+
+class FakeConnection:
+    def __init__(self, alive: bool = True):
+        self.alive = alive
+        self.pinging = threading.Event()
+        self.resume = threading.Event()
+        self.closed = False
+
+    def is_connected(self) -> bool:
+        self.pinging.set()
+        self.resume.wait(5)
+        return self.alive
+
+    def close(self):
+        self.closed = True
+
+
+def test_health_check_runs_without_the_pool_lock():
+    slow, other = FakeConnection(), FakeConnection()
+    connections = iter([slow, other])
+    pool = ConnectionPool(lambda: next(connections), size=2, timeout=1)
+    first, second = pool.borrow(), pool.borrow()
+    pool.release(second)
+    pool.release(first)
+    other.resume.set()
+
+    borrower = threading.Thread(target=pool.borrow)
+    borrower.start()
+    assert slow.pinging.wait(5)
+    # Another borrow, and stats, go ahead while the first borrower's ping is in flight.
+    assert pool.borrow().raw is other
+    assert pool.stats().in_use == 1
+    slow.resume.set()
+    borrower.join(5)
+    assert pool.stats().in_use == 2
+
+
+def test_dead_connection_is_closed_and_replaced():
+    dead, fresh = FakeConnection(), FakeConnection()
+    connections = iter([dead, fresh])
+    pool = ConnectionPool(lambda: next(connections), size=1, timeout=1)
+    pool.release(pool.borrow())
+    dead.alive = False
+    dead.resume.set()
+
+    assert pool.borrow().raw is fresh
+    assert dead.closed
+    stats = pool.stats()
+    assert (stats.in_use, stats.recycled, stats.created) == (1, 1, 2)
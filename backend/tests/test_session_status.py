@@ -0,0 +1,62 @@
+import pytest
+import api
+import models
+from catalog import get_catalog
+from config import Config
+from models import DatabaseConnection, Player
+
+
+@pytest.fixture
+def session_cache(app, monkeypatch):
+    """The write-behind session cache, with flushes far enough apart that only the code
+    under test writes to the database."""
+    monkeypatch.setattr(Config, 'SESSION_CACHE_ENABLED', True)
+    monkeypatch.setattr(Config, 'SESSION_FLUSH_INTERVAL', 3600)
+    monkeypatch.setattr(models, '_session_cache', None)
+    cache = models.get_session_cache()
+    yield cache
+    cache.close()
+
+
+def database_row(query: str, params: tuple) -> dict:
+    db = DatabaseConnection()
+    assert db.connect().is_success()
+    try:
+        return db.execute_query(query, params)[0]
+    finally:
+        db.disconnect()
+
+
+def moved_session(player_name: str) -> tuple[int, int]:
+    session_id = api.configure_new_game('easy', player_name).value
+    airport = get_catalog(DatabaseConnection()).airports[0]
+    assert api.make_move(session_id, airport.id).is_success()
+    return session_id, airport.id
+
+
+def test_finishing_writes_the_session_and_the_totals_through_the_cache(session_cache):
+    session_id, airport_id = moved_session('write-through')
+    assert database_row("SELECT current_airport_id FROM game_session WHERE id = %s",
+                        (session_id,))['current_airport_id'] != airport_id
+
+    assert api.update_session_status(session_id, 'lost').is_success()
+
+    session = database_row("SELECT player_id, status, current_airport_id, score FROM game_session WHERE id = %s",
+                           (session_id,))
+    assert (session['status'], session['current_airport_id']) == ('lost', airport_id)
+    player = database_row("SELECT total_score, games_played FROM player WHERE id = %s", (session['player_id'],))
+    assert (player['total_score'], player['games_played']) == (session['score'], 1)
+
+
+def test_totals_that_touch_no_player_roll_the_status_back(session_cache, monkeypatch):
+    session_id, airport_id = moved_session('no-player')
+    monkeypatch.setattr(Player, 'record_game_result', lambda self, player_id, score, won: False)
+
+    assert api.update_session_status(session_id, 'lost').is_error()
+
+    assert database_row("SELECT status FROM game_session WHERE id = %s", (session_id,))['status'] == 'active'
+    state = api.get_game_state(session_id).value
+    assert (state['status'], state['current_airport'].id) == ('active', airport_id)
+    session_cache.flush()
+    assert database_row("SELECT current_airport_id FROM game_session WHERE id = %s",
+                        (session_id,))['current_airport_id'] == airport_id
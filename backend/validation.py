@@ -0,0 +1,89 @@
+from typing import Mapping
+from config import Config
+
+
+def validate_new_game(data: Mapping) -> str:
+    error: str = ""
+
+    if not data.get('difficulty'):
+        error += "difficulty required. \n"
+    if not data.get('player_name'):
+        error += "player_name required. \n"
+    return error
+
+
+def validate_update_state(data: Mapping) -> str:
+    session_id = data.get('session_id')
+    current_airport_id = data.get('current_airport_id')
+
+    error: str = ""
+
+    if session_id is None:
+        error += "session_id required. \n"
+    if current_airport_id is None:
+        error += "current_airport_id required. \n"
+
+    if not isinstance(current_airport_id, int):
+        error += "current_airport_id must be an integer. \n"
+    if not isinstance(session_id, int):
+        error += "session_id must be an integer. \n"
+    return error
+
+
+def validate_answer(data: Mapping) -> str:
+    session_id = data.get('session_id')
+    token = data.get('token')
+    answer = data.get('answer')
+
+    error: str = ""
+
+    if not isinstance(session_id, int):
+        error += "session_id must be an integer. \n"
+    if not token or not isinstance(token, str):
+        error += "token required. \n"
+    if answer is None:
+        error += "answer required. \n"
+    elif not isinstance(answer, (str, int, float)) or isinstance(answer, bool):
+        error += "answer must be a string or a number. \n"
+    return error
+
+
+def validate_game_states(data: Mapping) -> str:
+    session_ids = data.get('session_ids')
+    cursor = data.get('cursor', 0)
+    limit = data.get('limit')
+
+    error: str = ""
+
+    if session_ids is not None and (not isinstance(session_ids, list)
+                                    or not all(isinstance(i, int) for i in session_ids)):
+        error += "session_ids must be a list of integers. \n"
+    elif session_ids is not None and len(session_ids) > Config.GAME_STATES_MAX_PAGE_SIZE:
+        error += f"session_ids must have at most {Config.GAME_STATES_MAX_PAGE_SIZE} entries. \n"
+    if not isinstance(cursor, int) or cursor < 0:
+        error += "cursor must be a non-negative integer. \n"
+    if limit is not None and (not isinstance(limit, int) or limit < 1):
+        error += "limit must be a positive integer. \n"
+    for field in ('status', 'difficulty'):
+        if data.get(field) is not None and not isinstance(data.get(field), str):
+            error += f"{field} must be a string. \n"
+    return error
+
+
+def validate_coordinates(args: Mapping) -> tuple[float | None, float | None, str]:
+    error: str = ""
+    try:
+        latitude = float(args.get('lat', ''))
+        if not -90 <= latitude <= 90:
+            error += "lat must be between -90 and 90. \n"
+    except ValueError:
+        latitude = None
+        error += "lat required. \n"
+    try:
+        longitude = float(args.get('lon', ''))
+        if not -180 <= longitude <= 180:
+            error += "lon must be between -180 and 180. \n"
+    except ValueError:
+        longitude = None
+        error += "lon required. \n"
+    return latitude, longitude, error
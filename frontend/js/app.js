@@ -30,12 +30,13 @@ let currentAirportMarker = null;
 let currentChallengeResolved = false;
 let hideChallengeTimer = null;
 let gameEnded = false;
-let pendingChallengeSuccess = false;
 let lastKnownState = null;
 
+const AIRPORT_MAP_FIELDS = 'id,name,city,country_code,latitude,longitude,iata_code,icao_code';
+
 async function fetchAirports() {
    try{
-    const response = await fetch(`${API_URL}airports`);
+    const response = await fetch(`${API_URL}airports?fields=${AIRPORT_MAP_FIELDS}`);
     if (!response.ok) {
             throw new Error('Failed to fetch airport');
         }
@@ -117,6 +118,10 @@ async function loadChallenge(){
         console.log('Failed to load challenge')
         return
     }
+    showNextChallenge(challenge)
+}
+
+function showNextChallenge(challenge){
     currentChallenge = challenge
     currentChallengeResolved = false;
     if(hideChallengeTimer){
@@ -127,12 +132,12 @@ async function loadChallenge(){
 
 }
 
-async function updateGameState(sessionId, currentAirportId, passedChallenge){
+async function submitMove(sessionId, currentAirportId){
     if(gameEnded){
         return null
     }
     try{
-        const response = await fetch(`${API_URL}update_state`,{
+        const response = await fetch(`${API_URL}move`,{
             method: "POST",
             headers: {
                 'Content-Type': 'application/json'
@@ -140,20 +145,16 @@ async function updateGameState(sessionId, currentAirportId, passedChallenge){
             body: JSON.stringify({
                 session_id: sessionId,
                 current_airport_id: currentAirportId,
-                passed_challenge: passedChallenge,
-
             })
         });
         if(!response.ok) {
             const error = await response.json();
-            throw new Error(error.error || 'Failed to update gamestate');
-
+            throw new Error(error.error || 'Failed to move');
         }
-        const data = await response.json();
-        return data
+        return await response.json()
     }
     catch (error) {
-        console.error('error: Updating gamestate', error,);
+        console.error('error: Moving to airport', error,);
         return null}
 }
 
@@ -257,12 +258,14 @@ function updatePlayerDataFromState(state){
     const difficulty = getCurrentDifficulty();
 
     if (currentAirport && bossAirport) {
-        const distance = calculateDistance(
-            currentAirport.latitude, 
-            currentAirport.longitude,
-            bossAirport.latitude,
-            bossAirport.longitude
-        );
+        const distance = typeof state.distance_to_boss_km === 'number'
+            ? state.distance_to_boss_km
+            : calculateDistance(
+                currentAirport.latitude,
+                currentAirport.longitude,
+                bossAirport.latitude,
+                bossAirport.longitude
+            );
         distanceToBoss.textContent = Math.round(distance) + ' km';
 
         const bearing = calculateBearing(
@@ -338,7 +341,7 @@ window.flyToAirport = async function(airportId){
         return
     }
 
-    const state = await fetchGameState(sessionId)
+    const state = lastKnownState?.current_airport ? lastKnownState : await fetchGameState(sessionId)
     if(!state){
         return
     }
@@ -378,16 +381,13 @@ const flightLine = L.polyline(
                 map.removeLayer(flightLine);
             }
         }, 30);
-        const passedPreviousChallenge = pendingChallengeSuccess;
-        const result = await updateGameState(sessionId, Number(targetAirport.id), passedPreviousChallenge);
+        const result = await submitMove(sessionId, Number(targetAirport.id));
         if (result) {
-            pendingChallengeSuccess = false;
-            await refreshGameState();
-            if(!gameEnded){
-                await loadChallenge();
+            updatePlayerDataFromState(result.state);
+            await checkForGameConclusion(result.state);
+            if(!gameEnded && result.challenge){
+                showNextChallenge(result.challenge);
             }
-        } else {
-            pendingChallengeSuccess = passedPreviousChallenge;
         }
     }, 1500);
 
@@ -440,9 +440,9 @@ function showChallenge(challenge){
         answerOptions.innerHTML = "";
         challenge.options.forEach(option=>{
             const button = document.createElement("button")
-            button.textContent = option.name
+            button.textContent = option
             button.className = "answer-option"
-            button.onclick = () => submitMultiplechoiceAnswer(option.is_correct)
+            button.onclick = () => submitMultiplechoiceAnswer(option)
             answerOptions.appendChild(button)
 
         })
@@ -501,19 +501,6 @@ function getCurrentDifficulty(){
     return 'medium'
 }
 
-function getChallengeRewardAmount(){
-    const difficulty = getCurrentDifficulty()
-    switch(difficulty){
-        case 'easy':
-            return 20
-        case 'hard':
-            return 10
-        case 'medium':
-        default:
-            return 15
-    }
-}
-
 function clampBattery(value){
     return Math.max(0, Math.min(100, value))
 }
@@ -617,79 +604,84 @@ async function setSessionStatus(sessionIdentifier, newStatus){
     }
 }
 
-async function submitMultiplechoiceAnswer(isCorrect){
-    if(currentChallengeResolved || gameEnded){
-        return;
+async function submitAnswer(answer){
+    if(!currentChallenge || !currentChallenge.token){
+        return null
     }
-    currentChallengeResolved = true;
-    const answerOptions = document.getElementById('answer-options')
-    if(answerOptions){
-        const buttons = answerOptions.querySelectorAll("button")
-        buttons.forEach(btn => btn.disabled = true)
+    try{
+        const response = await fetch(`${API_URL}answer`,{
+            method: "POST",
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify({
+                session_id: sessionId,
+                token: currentChallenge.token,
+                answer: answer,
+            })
+        });
+        if(!response.ok) {
+            const error = await response.json();
+            throw new Error(error.error || 'Failed to submit answer');
+        }
+        return await response.json()
     }
+    catch (error) {
+        console.error('error: Submitting answer', error);
+        return null}
+}
+
+async function showAnswerResult(result){
     const resultElement = document.getElementById('challenge-result')
-    if(isCorrect){
+    if(!result){
+        resultElement.textContent = "Could not check your answer, try again later."
+        resultElement.className = "challenge-result incorrect"
+        resultElement.style.display = "block"
+        finishChallengeDisplay()
+        return
+    }
+    if(result.correct){
         resultElement.textContent = "Correct answer!"
         resultElement.className = "challenge-result correct"
     } else {
-        const correctAnswer = currentChallenge && currentChallenge.options
-            ? currentChallenge.options.find(a=>a.is_correct)
-            : null
-        if(correctAnswer){
-            resultElement.textContent = "Incorrect answer! The correct answer is: " + correctAnswer.name
-        } else {
-            resultElement.textContent = "Incorrect answer!"
-        }
+        resultElement.textContent = result.correct_answer
+            ? "Incorrect answer! The correct answer is: " + result.correct_answer
+            : "Incorrect answer!"
         resultElement.className = "challenge-result incorrect"
-        // apply battery penalty for incorrect multiple-choice answers
-        try{
-            adjustBatteryLocally(-getChallengeRewardAmount())
-            await checkForGameConclusion(lastKnownState)
-        } catch (e) {
-            console.error('Error applying penalty for incorrect answer', e)
-        }
     }
     resultElement.style.display = "block"
-    pendingChallengeSuccess = Boolean(isCorrect)
-    if(pendingChallengeSuccess){
-        adjustBatteryLocally(getChallengeRewardAmount())
-        await checkForGameConclusion(lastKnownState)
-    }
+
+    const previousBattery = lastKnownState ? lastKnownState.battery_level : result.state.battery_level
+    adjustBatteryLocally(result.state.battery_level - previousBattery)
+    updatePlayerDataFromState(result.state)
+    await checkForGameConclusion(result.state)
     finishChallengeDisplay()
 }
 
+async function submitMultiplechoiceAnswer(answer){
+    if(currentChallengeResolved || gameEnded){
+        return;
+    }
+    currentChallengeResolved = true;
+    const answerOptions = document.getElementById('answer-options')
+    if(answerOptions){
+        const buttons = answerOptions.querySelectorAll("button")
+        buttons.forEach(btn => btn.disabled = true)
+    }
+    await showAnswerResult(await submitAnswer(answer))
+}
+
 window.submitOpenAnswer = async function(){
     if(currentChallengeResolved || gameEnded){
         return
     }
-    const resultElement = document.getElementById('challenge-result')
     const userAnswer = document.getElementById('answer-input').value.trim()
     if (!userAnswer){
         alert("Answer the question!")
         return
     }
-    if(!currentChallenge || !currentChallenge.answer){
-        return
-    }
-    const correctAnswer = currentChallenge.answer.toLowerCase()
-    const isCorrect = userAnswer.toLowerCase() === correctAnswer
     currentChallengeResolved = true
 
-    if(isCorrect){
-        resultElement.textContent = "Correct answer!"
-        resultElement.className = "challenge-result correct"
-    } else {
-        resultElement.textContent = "Incorrect answer! The correct answer is: " + currentChallenge.answer
-        resultElement.className = "challenge-result incorrect"
-        // apply battery penalty for incorrect open answers
-        try{
-            adjustBatteryLocally(-getChallengeRewardAmount())
-            await checkForGameConclusion(lastKnownState)
-        } catch (e) {
-            console.error('Error applying penalty for incorrect open answer', e)
-        }
-    }
-    resultElement.style.display = "block"
     const answerInput = document.getElementById('answer-input')
     const submitButton = document.getElementById('open-answer-submit')
     if(answerInput){
@@ -698,12 +690,7 @@ window.submitOpenAnswer = async function(){
     if(submitButton){
         submitButton.disabled = true
     }
-    pendingChallengeSuccess = Boolean(isCorrect)
-    if(pendingChallengeSuccess){
-        adjustBatteryLocally(getChallengeRewardAmount())
-        await checkForGameConclusion(lastKnownState)
-    }
-    finishChallengeDisplay()
+    await showAnswerResult(await submitAnswer(userAnswer))
 }
 
 